@@ -0,0 +1,107 @@
+from dataclasses import asdict
+from datetime import UTC, datetime
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.db.backup import BackupBusyError, list_backups, run_backup, verify_backup
+from app.db.retention import (
+    RetentionBusyError,
+    StorageStats,
+    read_storage_stats,
+    run_retention,
+    sqlite_database_path,
+)
+from app.db.session import get_engine
+from app.schemas.admin import (
+    BackupFile,
+    BackupReport,
+    BackupVerificationReport,
+    RetentionReport,
+    StorageReport,
+)
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def _storage_report(stats: StorageStats) -> StorageReport:
+    return StorageReport(
+        database_bytes=stats.database_bytes,
+        free_bytes=stats.free_bytes,
+        page_size=stats.page_size,
+        page_count=stats.page_count,
+        freelist_count=stats.freelist_count,
+        incremental_auto_vacuum=stats.auto_vacuum == 2,
+    )
+
+
+def _backup_file(path: Path) -> BackupFile:
+    stat = path.stat()
+    return BackupFile(
+        name=path.name,
+        size_bytes=stat.st_size,
+        compressed=path.name.endswith(".gz"),
+        created_at=datetime.fromtimestamp(stat.st_mtime, UTC),
+    )
+
+
+def _require_sqlite_path() -> str:
+    database_path = sqlite_database_path(get_engine())
+    if database_path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Backups are only available for SQLite")
+    return database_path
+
+
+@router.get("/storage", response_model=StorageReport)
+async def get_storage() -> StorageReport:
+    database_path = sqlite_database_path(get_engine())
+    if database_path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Storage stats are only available for SQLite")
+    return _storage_report(await run_in_threadpool(read_storage_stats, database_path))
+
+
+@router.post("/retention/run", response_model=RetentionReport)
+async def run_retention_now() -> RetentionReport:
+    try:
+        # An explicit run may take the exclusive VACUUM that switches an older file to incremental auto-vacuum.
+        result = await run_retention(get_engine(), switch_auto_vacuum=True)
+    except RetentionBusyError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    return RetentionReport(
+        sessions_archived=result.sessions_archived,
+        answers_trimmed=result.answers_trimmed,
+        reclaimed_bytes=result.reclaimed_bytes,
+        storage=_storage_report(result.after) if result.after else None,
+    )
+
+
+@router.get("/backups", response_model=list[BackupFile])
+async def get_backups() -> list[BackupFile]:
+    return [_backup_file(path) for path in await run_in_threadpool(list_backups, _require_sqlite_path())]
+
+
+@router.post("/backups/run", response_model=BackupReport)
+async def run_backup_now() -> BackupReport:
+    try:
+        result = await run_backup(get_engine())
+    except BackupBusyError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Backups are only available for SQLite")
+    return BackupReport(
+        backup=_backup_file(result.path),
+        page_count=result.page_count,
+        duration_ms=result.duration_ms,
+        restarts=result.restarts,
+        verification=BackupVerificationReport(**asdict(result.verification)) if result.verification else None,
+        removed=result.removed,
+    )
+
+
+@router.post("/backups/{name}/verify", response_model=BackupVerificationReport)
+async def verify_backup_file(name: str) -> BackupVerificationReport:
+    backup = next((path for path in await run_in_threadpool(list_backups, _require_sqlite_path()) if path.name == name), None)
+    if backup is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Backup not found")
+    return BackupVerificationReport(**asdict(await run_in_threadpool(verify_backup, backup)))
@@ -1,13 +1,72 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
 from datetime import UTC, datetime
-
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Annotated, Any
+from uuid import uuid4
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    WebSocketException,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import exists, insert, tuple_
 from sqlmodel import Session, select
-
-from app.db.models import QuizAnswer, QuizQuestion, QuizSession
-from app.db.session import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.deadline import deadline, remaining, request_budget
+from app.core.metrics import WS_ANSWER_DURATION
+from app.core.singleflight import SingleFlight
+from app.db.dialects import dialect_insert
+from app.db.idempotency import (
+    claim_idempotency_key,
+    complete_idempotency_key,
+    release_idempotency_key,
+    request_fingerprint,
+)
+from app.db.mastery import (
+    ReviewState,
+    due_reviews_query,
+    mastery_query,
+    record_topic_mastery,
+    reschedule_review,
+    review_state,
+    reviews_by_key_query,
+)
+from app.db.models import QuizAnswer, QuizQuestion, QuizSession, QuizSessionTopicScore
+from app.db.scores import init_session_scores, record_answer_rollup, record_answer_score
+from app.db.session import get_engine, get_session, open_session, run_with_busy_retry
+from app.quiz.active_sessions import ActiveSession, ActiveSessionCache, QuestionRecord
+from app.quiz.adaptive import (
+    combine_questions,
+    plan_topics,
+    review_question_types,
+    stored_question,
+)
 from app.quiz.evaluator import evaluate_short_answer, normalize_answer
-from app.quiz.generator import generate_questions
+from app.quiz.generator import GeneratedQuestion, generate_questions
 from app.schemas.quiz import (
+    ChannelAnswerMessage,
+    ChannelCompletedEvent,
+    ChannelErrorEvent,
+    ChannelQuestionEvent,
+    ChannelResultEvent,
+    ChannelSessionEvent,
     CreateQuizSessionRequest,
     CreateQuizSessionResponse,
     Difficulty,
@@ -15,6 +74,7 @@ from app.schemas.quiz import (
     QuizQuestionPublic,
     SessionListItem,
     SessionListResponse,
+    SessionMode,
     SessionScore,
     SessionSummaryResponse,
     SubmitAnswerRequest,
@@ -23,7 +83,14 @@ from app.schemas.quiz import (
     TopicScore,
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["quiz"])
+_answer_flights: SingleFlight[SubmitAnswerResponse] = SingleFlight()
+_creation_flights: SingleFlight[CreateQuizSessionResponse] = SingleFlight()
+# Completed-session summaries keyed by session id; entries are only served while their version matches.
+_summary_cache: LRUCache[str, tuple[int, SessionSummaryResponse]] = LRUCache(settings.summary_cache_size)
+_active_sessions = ActiveSessionCache(settings.active_session_cache_size, settings.active_session_idle_seconds)
 
 
 def _as_iso8601(value: datetime | None) -> str | None:
@@ -32,169 +99,186 @@ def _as_iso8601(value: datetime | None) -> str | None:
     return value.astimezone(UTC).isoformat().replace("+00:00", "Z")
 
 
-def _to_public_question(question: QuizQuestion) -> QuizQuestionPublic:
-    return QuizQuestionPublic(
-        id=question.id,
-        order_index=question.order_index,
-        type=question.type,
-        topic_tags=question.topic_tags,
-        difficulty=question.difficulty,
-        prompt=question.prompt,
-        options=question.options,
-    )
-
-
 def _session_config(session: QuizSession) -> CreateQuizSessionRequest:
     return CreateQuizSessionRequest(
         topics=[Topic(topic) for topic in session.topics],
         difficulty=Difficulty(session.difficulty),
         question_type=QuestionType(session.question_type),
         num_questions=session.num_questions,
+        mode=SessionMode(session.mode),
     )
 
 
-def _load_session(session_id: str, db: Session) -> QuizSession:
-    quiz_session = db.get(QuizSession, session_id)
-    if not quiz_session:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-    return quiz_session
+async def _load_reviews(db: AsyncSession, active: ActiveSession) -> None:
+    keys = {question.prompt_key for question in active.questions.values()}
+    if keys:
+        active.reviews = {review.prompt_key: review_state(review) for review in (await db.exec(reviews_by_key_query(keys))).all()}
+
 
+async def _load_active_session(session_id: str, db: AsyncSession) -> ActiveSession:
+    active = _active_sessions.get(session_id)
+    if active is not None:
+        return active
 
-def _load_question(session_id: str, question_id: str, db: Session) -> QuizQuestion:
-    question = db.get(QuizQuestion, question_id)
-    if not question or question.session_id != session_id:
+    quiz_session = await db.get(QuizSession, session_id)
+    if not quiz_session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    questions = (await db.exec(select(QuizQuestion).where(QuizQuestion.session_id == session_id))).all()
+    active = ActiveSession(session_id, (QuestionRecord(question.model_dump()) for question in questions))
+    for answer in (await db.exec(select(QuizAnswer).where(QuizAnswer.session_id == session_id))).all():
+        question = active.questions.get(answer.question_id)
+        if question is not None:
+            active.answers[question.id] = _answer_response(question, answer)
+    if quiz_session.completed_at is None:
+        await _load_reviews(db, active)
+        _active_sessions.put(active)
+    return active
+
+
+def _load_question(active: ActiveSession, question_id: str) -> QuestionRecord:
+    question = active.questions.get(question_id)
+    if question is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
     return question
 
 
-def _calc_summary(session_id: str, db: Session) -> tuple[SessionScore, list[TopicScore]]:
-    questions = db.exec(select(QuizQuestion).where(QuizQuestion.session_id == session_id)).all()
-    answers = db.exec(select(QuizAnswer).where(QuizAnswer.session_id == session_id)).all()
-    answers_by_question = {answer.question_id: answer for answer in answers}
+def _encode_cursor(session: QuizSession) -> str:
+    raw = json.dumps([session.created_at.isoformat(), session.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
-    correct_total = sum(1 for answer in answers if answer.is_correct)
-    score = SessionScore(correct=correct_total, total=len(questions))
 
-    topic_totals: dict[str, dict[str, int]] = {}
-    for question in questions:
-        topic = question.topic_tags[0]
-        if topic not in topic_totals:
-            topic_totals[topic] = {"correct": 0, "total": 0}
-        topic_totals[topic]["total"] += 1
-        answer = answers_by_question.get(question.id)
-        if answer and answer.is_correct:
-            topic_totals[topic]["correct"] += 1
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        created_at, session_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), str(session_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from None
 
-    by_topic = [
-        TopicScore(topic=Topic(topic), correct=counts["correct"], total=counts["total"])
-        for topic, counts in topic_totals.items()
-    ]
-    return score, by_topic
 
+def _weak_etag(tag: str) -> str:
+    return f'W/"{tag}"'
 
-@router.post("/quiz/sessions", response_model=CreateQuizSessionResponse, status_code=status.HTTP_201_CREATED)
-def create_quiz_session(payload: CreateQuizSessionRequest, db: Session = Depends(get_session)) -> CreateQuizSessionResponse:
-    generated_questions = generate_questions(
-        topics=payload.topics,
-        difficulty=payload.difficulty,
-        question_type=payload.question_type,
-        num_questions=payload.num_questions,
-    )
 
-    quiz_session = QuizSession(
-        topics=[topic.value for topic in payload.topics],
-        difficulty=payload.difficulty.value,
-        question_type=payload.question_type.value,
-        num_questions=payload.num_questions,
-    )
-    db.add(quiz_session)
-    db.flush()
+def _session_etag(session_id: str, version: int) -> str:
+    return _weak_etag(f"{session_id}.{version}")
 
-    stored_questions: list[QuizQuestionPublic] = []
-    for index, generated in enumerate(generated_questions, start=1):
-        question = QuizQuestion(
-            session_id=quiz_session.id,
-            order_index=index,
-            type=generated.type.value,
-            topic_tags=[topic.value for topic in generated.topic_tags],
-            difficulty=generated.difficulty.value,
-            prompt=generated.prompt,
-            options=generated.options,
-            correct_option_index=generated.correct_option_index,
-            expected_answer=generated.expected_answer,
-            acceptable_variants=generated.acceptable_variants,
-            grading_rubric=generated.grading_rubric,
-            explanation=generated.explanation,
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def _session_score(session: QuizSession) -> SessionScore:
+    return SessionScore(correct=session.correct_count, total=session.num_questions)
+
+
+def _store_session(
+    db: Session,
+    payload: CreateQuizSessionRequest,
+    generated_questions: list[GeneratedQuestion],
+) -> tuple[str, datetime, list[dict[str, Any]]]:
+    session_id = str(uuid4())
+    created_at = datetime.now(UTC)
+    # Adaptive sessions without topics record the topics they ended up covering.
+    topics = payload.topics or list(dict.fromkeys(generated.topic_tags[0] for generated in generated_questions))
+    db.exec(
+        insert(QuizSession).values(
+            id=session_id,
+            topics=[topic.value for topic in topics],
+            difficulty=payload.difficulty.value,
+            question_type=payload.question_type.value,
+            num_questions=payload.num_questions,
+            created_at=created_at,
+            mode=payload.mode.value,
         )
-        db.add(question)
-        db.flush()
-        stored_questions.append(_to_public_question(question))
+    )
 
-    db.commit()
-    return CreateQuizSessionResponse(
-        session_id=quiz_session.id,
-        created_at=_as_iso8601(quiz_session.created_at) or "",
-        config=payload,
-        questions=stored_questions,
+    question_rows = [
+        {
+            "id": str(uuid4()),
+            "session_id": session_id,
+            "order_index": index,
+            "type": generated.type.value,
+            "topic_tags": [topic.value for topic in generated.topic_tags],
+            "difficulty": generated.difficulty.value,
+            "prompt": generated.prompt,
+            "options": generated.options,
+            "correct_option_index": generated.correct_option_index,
+            "expected_answer": generated.expected_answer,
+            "acceptable_variants": generated.acceptable_variants,
+            "grading_rubric": generated.grading_rubric,
+            "explanation": generated.explanation,
+        }
+        for index, generated in enumerate(generated_questions, start=1)
+    ]
+    if question_rows:
+        db.exec(insert(QuizQuestion), params=question_rows)
+    init_session_scores(db, session_id, [generated.topic_tags[0].value for generated in generated_questions])
+
+    return session_id, created_at, question_rows
+
+
+def _public_question(row: dict[str, Any]) -> QuizQuestionPublic:
+    return QuizQuestionPublic(
+        id=row["id"],
+        order_index=row["order_index"],
+        type=QuestionType(row["type"]),
+        topic_tags=[Topic(topic) for topic in row["topic_tags"]],
+        difficulty=Difficulty(row["difficulty"]),
+        prompt=row["prompt"],
+        options=row["options"],
     )
 
 
-@router.post(
-    "/quiz/sessions/{session_id}/questions/{question_id}/answer",
-    response_model=SubmitAnswerResponse,
-    status_code=status.HTTP_200_OK,
-)
-def submit_answer(
-    session_id: str,
-    question_id: str,
-    payload: SubmitAnswerRequest,
-    db: Session = Depends(get_session),
-) -> SubmitAnswerResponse:
-    quiz_session = _load_session(session_id, db)
-    question = _load_question(session_id, question_id, db)
-
-    existing_answer = db.exec(
-        select(QuizAnswer).where(QuizAnswer.session_id == session_id, QuizAnswer.question_id == question_id)
-    ).first()
-    if existing_answer:
-        correct_answer = (
-            question.options[question.correct_option_index] if question.type == QuestionType.mcq.value else (question.expected_answer or "")
-        )
-        return SubmitAnswerResponse(
-            is_correct=existing_answer.is_correct,
-            correct_answer=correct_answer,
-            explanation=existing_answer.feedback,
-            why_others_wrong=existing_answer.why_others_wrong or [],
-            normalized_user_answer=existing_answer.normalized_user_answer,
-        )
+def _answer_query(session_id: str, question_id: str) -> SelectOfScalar[QuizAnswer]:
+    return select(QuizAnswer).where(QuizAnswer.session_id == session_id, QuizAnswer.question_id == question_id)
 
-    is_correct = False
-    rationale = question.explanation
-    trace: dict[str, str] | None = None
-    why_others_wrong: list[str] = []
 
+def _answer_response(question: QuestionRecord, answer: QuizAnswer) -> SubmitAnswerResponse:
+    return SubmitAnswerResponse(
+        is_correct=answer.is_correct,
+        correct_answer=question.correct_answer,
+        explanation=answer.feedback,
+        why_others_wrong=answer.why_others_wrong or [],
+        normalized_user_answer=answer.normalized_user_answer,
+    )
+
+
+def _validate_answer_payload(question: QuestionRecord, payload: SubmitAnswerRequest) -> None:
     if question.type == QuestionType.mcq.value:
         if payload.option_index is None:
             raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="option_index is required for MCQ")
         if question.options is None or question.correct_option_index is None:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="MCQ question is misconfigured")
+        return
+
+    if not (payload.answer or "").strip():
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="answer is required for short-answer")
+    if not question.expected_answer or question.acceptable_variants is None or not question.grading_rubric:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="short-answer question is misconfigured")
+
+
+async def _grade_answer(question: QuestionRecord, payload: SubmitAnswerRequest) -> QuizAnswer:
+    trace: dict[str, str] | None = None
+    why_others_wrong: list[str] = []
 
+    if question.type == QuestionType.mcq.value:
         is_correct = payload.option_index == question.correct_option_index
-        normalized_user_answer = normalize_answer(
-            question.options[payload.option_index] if 0 <= payload.option_index < len(question.options) else ""
+        normalized_user_answer = (
+            question.normalized_options[payload.option_index] if 0 <= payload.option_index < len(question.options) else ""
         )
-        for idx, option in enumerate(question.options):
-            if idx != question.correct_option_index:
-                why_others_wrong.append(f"'{option}' is incorrect because it does not satisfy the prompt constraints.")
-        correct_answer = question.options[question.correct_option_index]
+        why_others_wrong = list(question.why_others_wrong)
+        rationale = question.explanation
     else:
         text_answer = payload.answer or ""
-        if not text_answer.strip():
-            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="answer is required for short-answer")
-        if not question.expected_answer or question.acceptable_variants is None or not question.grading_rubric:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="short-answer question is misconfigured")
-
-        is_correct, rationale, trace = evaluate_short_answer(
+        is_correct, rationale, trace = await run_in_threadpool(
+            evaluate_short_answer,
             prompt=question.prompt,
             expected_answer=question.expected_answer,
             acceptable_variants=question.acceptable_variants,
@@ -202,11 +286,10 @@ def submit_answer(
             user_answer=text_answer,
         )
         normalized_user_answer = normalize_answer(text_answer)
-        correct_answer = question.expected_answer
 
-    answer_row = QuizAnswer(
-        session_id=session_id,
-        question_id=question_id,
+    return QuizAnswer(
+        session_id=question.session_id,
+        question_id=question.id,
         user_answer=payload.answer,
         option_index=payload.option_index,
         normalized_user_answer=normalized_user_answer,
@@ -215,54 +298,442 @@ def submit_answer(
         why_others_wrong=why_others_wrong or None,
         judge_trace=trace,
     )
-    db.add(answer_row)
-    db.flush()
 
-    answered_count = db.exec(select(QuizAnswer).where(QuizAnswer.session_id == session_id)).all()
-    if len(answered_count) >= quiz_session.num_questions and quiz_session.completed_at is None:
-        quiz_session.completed_at = datetime.now(UTC)
-        db.add(quiz_session)
 
-    db.commit()
-    return SubmitAnswerResponse(
-        is_correct=is_correct,
-        correct_answer=correct_answer,
-        explanation=rationale,
-        why_others_wrong=why_others_wrong,
-        normalized_user_answer=normalized_user_answer,
+def _store_answer(
+    db: Session, answer_row: QuizAnswer, question: QuestionRecord, review: ReviewState | None
+) -> tuple[QuizAnswer, bool, ReviewState | None]:
+    inserted = db.exec(
+        dialect_insert(db, QuizAnswer)
+        .values(**answer_row.model_dump())
+        .on_conflict_do_nothing(index_elements=["session_id", "question_id"])
+    )
+    if inserted.rowcount == 0:
+        existing_answer = db.exec(_answer_query(answer_row.session_id, answer_row.question_id)).first()
+        if existing_answer is not None:
+            return existing_answer, False, review
+    completed = record_answer_score(
+        db, session_id=answer_row.session_id, topic=question.topic, is_correct=answer_row.is_correct
+    )
+    record_answer_rollup(
+        db,
+        topic=question.topic,
+        difficulty=question.difficulty,
+        question_type=question.type,
+        answered_on=answer_row.created_at.astimezone(UTC).date(),
+        is_correct=answer_row.is_correct,
+    )
+    record_topic_mastery(
+        db,
+        topic=question.topic,
+        difficulty=question.difficulty,
+        is_correct=answer_row.is_correct,
+        answered_at=answer_row.created_at,
     )
+    rescheduled = reschedule_review(
+        db,
+        question.prompt_key,
+        review,
+        question_id=question.id,
+        session_id=question.session_id,
+        topic=question.topic,
+        difficulty=question.difficulty,
+        question_type=question.type,
+        is_correct=answer_row.is_correct,
+        answered_at=answer_row.created_at,
+    )
+    return answer_row, completed, rescheduled
 
 
-@router.get("/quiz/sessions/{session_id}/summary", response_model=SessionSummaryResponse, status_code=status.HTTP_200_OK)
-def get_session_summary(session_id: str, db: Session = Depends(get_session)) -> SessionSummaryResponse:
-    quiz_session = _load_session(session_id, db)
-    score, by_topic = _calc_summary(session_id, db)
-    return SessionSummaryResponse(
+async def _grade_and_store_answer(
+    db: AsyncSession,
+    active: ActiveSession,
+    question: QuestionRecord,
+    payload: SubmitAnswerRequest,
+) -> SubmitAnswerResponse:
+    existing_answer = None
+    if question.type != QuestionType.mcq.value:
+        # Another worker may have graded this already; one indexed lookup is cheaper than a second LLM judgement.
+        existing_answer = (await db.exec(_answer_query(question.session_id, question.id))).first()
+    completed = False
+    if existing_answer is None:
+        answer_row = await _grade_answer(question, payload)
+        review = active.reviews.get(question.prompt_key)
+        existing_answer, completed, review = await run_with_busy_retry(
+            db, lambda tx: _store_answer(tx, answer_row, question, review)
+        )
+        if review is not None:
+            active.reviews[question.prompt_key] = review
+
+    response = _answer_response(question, existing_answer)
+    active.answers[question.id] = response
+    if completed:
+        _active_sessions.evict(active.session_id)
+    return response
+
+
+def _store_session_response(
+    db: Session,
+    payload: CreateQuizSessionRequest,
+    generated_questions: list[GeneratedQuestion],
+    idempotency_key: str | None,
+    reviewed_questions: int = 0,
+) -> tuple[CreateQuizSessionResponse, list[dict[str, Any]]]:
+    session_id, created_at, question_rows = _store_session(db, payload, generated_questions)
+    response = CreateQuizSessionResponse(
+        session_id=session_id,
+        created_at=_as_iso8601(created_at) or "",
+        config=payload,
+        questions=[_public_question(row) for row in question_rows],
+        reviewed_questions=reviewed_questions,
+    )
+    if idempotency_key is not None:
+        complete_idempotency_key(db, idempotency_key, session_id, response.model_dump(mode="json"))
+    return response, question_rows
+
+
+async def _adaptive_questions(db: AsyncSession, payload: CreateQuizSessionRequest) -> tuple[list[GeneratedQuestion], int]:
+    # Due and previously missed questions come from storage; only the remainder is generated.
+    topics = payload.topics or list(Topic)
+    topic_values = [topic.value for topic in topics]
+    due = (
+        await db.exec(
+            due_reviews_query(
+                topics=topic_values,
+                difficulty=payload.difficulty.value,
+                question_types=review_question_types(payload.question_type),
+                now=datetime.now(UTC),
+                limit=payload.num_questions,
+            )
+        )
+    ).all()
+    reviewed = [stored_question(question) for _, question in due]
+    remainder = payload.num_questions - len(reviewed)
+    if remainder == 0:
+        return reviewed, len(reviewed)
+
+    mastery = {row.topic: row for row in (await db.exec(mastery_query(topics=topic_values, difficulty=payload.difficulty.value))).all()}
+    fresh = await run_in_threadpool(
+        generate_questions,
+        topics=plan_topics(topics, mastery, remainder),
+        difficulty=payload.difficulty,
+        question_type=payload.question_type,
+        num_questions=remainder,
+    )
+    return await run_in_threadpool(combine_questions, reviewed, fresh), len(reviewed)
+
+
+async def _generate_and_store_session(
+    db: AsyncSession,
+    payload: CreateQuizSessionRequest,
+    idempotency_key: str | None = None,
+) -> CreateQuizSessionResponse:
+    reviewed_questions = 0
+    if payload.mode == SessionMode.adaptive:
+        generated_questions, reviewed_questions = await _adaptive_questions(db, payload)
+    else:
+        generated_questions = await run_in_threadpool(
+            generate_questions,
+            topics=payload.topics,
+            difficulty=payload.difficulty,
+            question_type=payload.question_type,
+            num_questions=payload.num_questions,
+        )
+    response, question_rows = await run_with_busy_retry(
+        db, lambda tx: _store_session_response(tx, payload, generated_questions, idempotency_key, reviewed_questions)
+    )
+    active = ActiveSession(response.session_id, (QuestionRecord(row) for row in question_rows))
+    await _load_reviews(db, active)
+    _active_sessions.put(active)
+    return response
+
+
+async def _create_session_once(
+    db: AsyncSession,
+    payload: CreateQuizSessionRequest,
+    idempotency_key: str,
+    request_hash: str,
+) -> CreateQuizSessionResponse:
+    # The wait for another worker's generation also ends with this request's own budget.
+    budget = remaining()
+    wait_until = time.monotonic() + min(settings.idempotency_wait_seconds, settings.idempotency_wait_seconds if budget is None else budget)
+    while True:
+        existing = await run_with_busy_retry(db, lambda tx: claim_idempotency_key(tx, idempotency_key, request_hash))
+        if existing is None:
+            break
+        if existing.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request",
+            )
+        if existing.response is not None:
+            return CreateQuizSessionResponse.model_validate(existing.response)
+        # Another worker owns the key and is still generating.
+        if time.monotonic() >= wait_until:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress",
+            )
+        await asyncio.sleep(settings.idempotency_poll_interval_ms / 1000)
+
+    try:
+        return await _generate_and_store_session(db, payload, idempotency_key)
+    except BaseException:
+        # Free the key so the client can retry after a failed generation.
+        await run_with_busy_retry(db, lambda tx: release_idempotency_key(tx, idempotency_key))
+        raise
+
+
+@router.post("/quiz/sessions", response_model=CreateQuizSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_quiz_session(
+    payload: CreateQuizSessionRequest,
+    db: AsyncSession = Depends(get_session),
+    idempotency_key: Annotated[str | None, Header(alias="Idempotency-Key", min_length=1, max_length=255)] = None,
+    request_timeout_ms: Annotated[int | None, Header(alias="X-Request-Timeout-Ms", gt=0)] = None,
+) -> CreateQuizSessionResponse:
+    with deadline(request_budget(settings.create_session_budget_seconds, request_timeout_ms)):
+        if idempotency_key is None:
+            return await _generate_and_store_session(db, payload)
+
+        request_hash = request_fingerprint(payload.model_dump(mode="json"))
+        return await _creation_flights.do(
+            (idempotency_key, request_hash),
+            lambda: _create_session_once(db, payload, idempotency_key, request_hash),
+        )
+
+
+@router.post(
+    "/quiz/sessions/{session_id}/questions/{question_id}/answer",
+    response_model=SubmitAnswerResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def submit_answer(
+    session_id: str,
+    question_id: str,
+    payload: SubmitAnswerRequest,
+    db: AsyncSession = Depends(get_session),
+    request_timeout_ms: Annotated[int | None, Header(alias="X-Request-Timeout-Ms", gt=0)] = None,
+) -> SubmitAnswerResponse:
+    active = await _load_active_session(session_id, db)
+    question = _load_question(active, question_id)
+
+    existing_response = active.answers.get(question_id)
+    if existing_response is not None:
+        return existing_response
+
+    _validate_answer_payload(question, payload)
+    _summary_cache.pop(session_id)
+    with deadline(request_budget(settings.submit_answer_budget_seconds, request_timeout_ms)):
+        return await _answer_flights.do(
+            (session_id, question_id), lambda: _grade_and_store_answer(db, active, question, payload)
+        )
+
+
+@router.websocket("/quiz/sessions/{session_id}/ws")
+async def quiz_channel(websocket: WebSocket, session_id: str) -> None:
+    """Per-session socket: answers come in as messages and results are pushed as each grading finishes.
+
+    The next unanswered question is pushed as soon as an answer arrives, so the learner can go on while a short
+    answer is still being judged; a `completed` event with the summary follows the last result.
+    """
+    async with open_session(get_engine()) as db:
+        try:
+            active = await _load_active_session(session_id, db)
+        except HTTPException as exc:
+            raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=exc.detail) from None
+        questions = [
+            _public_question(question.model_dump())
+            for question in (
+                await db.exec(select(QuizQuestion).where(QuizQuestion.session_id == session_id).order_by(QuizQuestion.order_index))
+            ).all()
+        ]
+    await websocket.accept()
+
+    # Results finish out of order on separate tasks; one lock keeps their frames from interleaving.
+    send_lock = asyncio.Lock()
+    delivered: set[str] = set()
+    grading: set[asyncio.Task[None]] = set()
+    completed = False
+
+    async def send(event: BaseModel) -> None:
+        async with send_lock:
+            await websocket.send_text(event.model_dump_json())
+
+    async def push_next_question() -> None:
+        for question in questions:
+            if question.id not in active.answers and question.id not in delivered:
+                delivered.add(question.id)
+                await send(ChannelQuestionEvent(question=question))
+                return
+
+    async def push_completed() -> None:
+        nonlocal completed
+        if completed or len(active.answers) < len(active.questions):
+            return
+        completed = True
+        async with open_session(get_engine()) as db:
+            _, summary = await _build_session_summary(session_id, db)
+        await send(ChannelCompletedEvent(summary=summary))
+
+    async def answer(message: ChannelAnswerMessage) -> None:
+        started = time.perf_counter()
+        try:
+            question = _load_question(active, message.question_id)
+            response = active.answers.get(question.id)
+            if response is None:
+                _validate_answer_payload(question, message)
+                _summary_cache.pop(session_id)
+                async with open_session(get_engine()) as db:
+                    with deadline(request_budget(settings.submit_answer_budget_seconds, None)):
+                        response = await _answer_flights.do(
+                            (session_id, question.id), lambda: _grade_and_store_answer(db, active, question, message)
+                        )
+        except HTTPException as exc:
+            await send(ChannelErrorEvent(question_id=message.question_id, status=exc.status_code, detail=exc.detail))
+            return
+        except Exception:
+            # Over HTTP this would be a 500 response; here the socket stays open for the other answers.
+            logger.exception("Grading failed for question %s over the session WebSocket", message.question_id)
+            await send(
+                ChannelErrorEvent(
+                    question_id=message.question_id, status=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not grade the answer"
+                )
+            )
+            return
+        await send(ChannelResultEvent(question_id=question.id, result=response))
+        WS_ANSWER_DURATION.observe(time.perf_counter() - started, type=question.type)
+        await push_completed()
+
+    await send(ChannelSessionEvent(session_id=session_id, total=len(questions), answered=len(active.answers)))
+    for question_id, response in list(active.answers.items()):
+        await send(ChannelResultEvent(question_id=question_id, result=response))
+    await push_next_question()
+    await push_completed()
+
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                message = ChannelAnswerMessage.model_validate_json(raw)
+            except ValidationError as exc:
+                await send(ChannelErrorEvent(status=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc.errors()[0]["msg"])))
+                continue
+            delivered.add(message.question_id)
+            task = asyncio.create_task(answer(message))
+            grading.add(task)
+            task.add_done_callback(grading.discard)
+            await push_next_question()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Answers already received are still graded and stored; only their results go undelivered.
+        await asyncio.gather(*grading, return_exceptions=True)
+
+
+async def _build_session_summary(session_id: str, db: AsyncSession) -> tuple[int, SessionSummaryResponse]:
+    rows = (
+        await db.exec(
+            select(QuizSession, QuizSessionTopicScore)
+            .outerjoin(QuizSessionTopicScore, QuizSessionTopicScore.session_id == QuizSession.id)
+            .where(QuizSession.id == session_id)
+            .order_by(QuizSessionTopicScore.position)
+        )
+    ).all()
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+
+    quiz_session = rows[0][0]
+    by_topic = [
+        TopicScore(topic=Topic(topic_score.topic), correct=topic_score.correct, total=topic_score.total)
+        for _, topic_score in rows
+        if topic_score is not None
+    ]
+    summary = SessionSummaryResponse(
         session_id=quiz_session.id,
-        score=score,
+        score=_session_score(quiz_session),
         by_topic=by_topic,
         created_at=_as_iso8601(quiz_session.created_at) or "",
         completed_at=_as_iso8601(quiz_session.completed_at),
     )
+    if quiz_session.completed_at is not None:
+        _summary_cache.put(session_id, (quiz_session.version, summary))
+    return quiz_session.version, summary
+
+
+@router.get("/quiz/sessions/{session_id}/summary", response_model=SessionSummaryResponse, status_code=status.HTTP_200_OK)
+async def get_session_summary(
+    session_id: str,
+    response: Response,
+    db: AsyncSession = Depends(get_session),
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> SessionSummaryResponse | Response:
+    cached = _summary_cache.get(session_id)
+    if if_none_match is None and cached is None:
+        version, summary = await _build_session_summary(session_id, db)
+    else:
+        # Revalidation only needs the version counter, a primary-key lookup.
+        version = (await db.exec(select(QuizSession.version).where(QuizSession.id == session_id))).first()
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+        if _etag_matches(if_none_match, _session_etag(session_id, version)):
+            return _not_modified(_session_etag(session_id, version))
+        if cached is not None and cached[0] == version:
+            summary = cached[1]
+        else:
+            version, summary = await _build_session_summary(session_id, db)
+
+    response.headers["ETag"] = _session_etag(session_id, version)
+    response.headers["Cache-Control"] = "no-cache"
+    return summary
 
 
 @router.get("/quiz/sessions", response_model=SessionListResponse, status_code=status.HTTP_200_OK)
-def list_sessions(
-    limit: int = Query(default=20, ge=1, le=100),
-    offset: int = Query(default=0, ge=0),
-    db: Session = Depends(get_session),
-) -> SessionListResponse:
-    sessions = db.exec(select(QuizSession).offset(offset).limit(limit)).all()
-    items: list[SessionListItem] = []
-    for quiz_session in sessions:
-        score, _ = _calc_summary(quiz_session.id, db)
-        items.append(
-            SessionListItem(
-                session_id=quiz_session.id,
-                created_at=_as_iso8601(quiz_session.created_at) or "",
-                completed_at=_as_iso8601(quiz_session.completed_at),
-                score=score,
-                config=_session_config(quiz_session),
-            )
+async def list_sessions(
+    response: Response,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    offset: Annotated[int, Query(ge=0)] = 0,
+    cursor: Annotated[str | None, Query()] = None,
+    topic: Annotated[Topic | None, Query()] = None,
+    difficulty: Annotated[Difficulty | None, Query()] = None,
+    completed: Annotated[bool | None, Query()] = None,
+    db: AsyncSession = Depends(get_session),
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> SessionListResponse | Response:
+    statement = select(QuizSession).order_by(QuizSession.created_at.desc(), QuizSession.id.desc())
+    if topic is not None:
+        statement = statement.where(
+            exists().where(QuizSessionTopicScore.session_id == QuizSession.id, QuizSessionTopicScore.topic == topic.value)
         )
-    return SessionListResponse(limit=limit, offset=offset, items=items)
+    if difficulty is not None:
+        statement = statement.where(QuizSession.difficulty == difficulty.value)
+    if completed is True:
+        statement = statement.where(QuizSession.completed_at.is_not(None))
+    elif completed is False:
+        statement = statement.where(QuizSession.completed_at.is_(None))
+    if cursor is not None:
+        statement = statement.where(tuple_(QuizSession.created_at, QuizSession.id) < tuple_(*_decode_cursor(cursor)))
+    elif offset:
+        statement = statement.offset(offset)
+
+    sessions = (await db.exec(statement.limit(limit + 1))).all()
+    next_cursor = _encode_cursor(sessions[limit - 1]) if len(sessions) > limit else None
+    page_state = json.dumps(
+        [limit, offset, next_cursor, [(quiz_session.id, quiz_session.version) for quiz_session in sessions[:limit]]],
+        separators=(",", ":"),
+    )
+    etag = _weak_etag(hashlib.sha1(page_state.encode()).hexdigest())
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    items = [
+        SessionListItem(
+            session_id=quiz_session.id,
+            created_at=_as_iso8601(quiz_session.created_at) or "",
+            completed_at=_as_iso8601(quiz_session.completed_at),
+            score=_session_score(quiz_session),
+            config=_session_config(quiz_session),
+        )
+        for quiz_session in sessions[:limit]
+    ]
+    return SessionListResponse(limit=limit, offset=offset, items=items, next_cursor=next_cursor)
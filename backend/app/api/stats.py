@@ -0,0 +1,75 @@
+from datetime import UTC, datetime, timedelta
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.models import QuizAnswerRollup
+from app.db.session import get_session
+from app.schemas.quiz import Difficulty, QuestionType, Topic
+from app.schemas.stats import AccuracyStats, DailyStats, StatsResponse, TopicStats
+
+router = APIRouter(tags=["stats"])
+
+WEAK_TOPIC_ACCURACY = 0.6
+WEAK_TOPIC_MIN_ANSWERED = 5
+
+
+def _accuracy(answered: int, correct: int) -> float | None:
+    return round(correct / answered, 4) if answered else None
+
+
+@router.get("/stats", response_model=StatsResponse, status_code=status.HTTP_200_OK)
+async def get_stats(
+    days: Annotated[int, Query(ge=1, le=365)] = 30,
+    difficulty: Annotated[Difficulty | None, Query()] = None,
+    question_type: Annotated[QuestionType | None, Query()] = None,
+    db: AsyncSession = Depends(get_session),
+) -> StatsResponse:
+    since = datetime.now(UTC).date() - timedelta(days=days - 1)
+    filters = [QuizAnswerRollup.day >= since]
+    if difficulty is not None:
+        filters.append(QuizAnswerRollup.difficulty == difficulty.value)
+    if question_type is not None and question_type != QuestionType.mixed:
+        filters.append(QuizAnswerRollup.question_type == question_type.value)
+
+    answered = func.sum(QuizAnswerRollup.answered)
+    correct = func.sum(QuizAnswerRollup.correct)
+    topic_rows = (
+        await db.exec(select(QuizAnswerRollup.topic, answered, correct).where(*filters).group_by(QuizAnswerRollup.topic))
+    ).all()
+    day_rows = (
+        await db.exec(
+            select(QuizAnswerRollup.day, answered, correct)
+            .where(*filters)
+            .group_by(QuizAnswerRollup.day)
+            .order_by(QuizAnswerRollup.day)
+        )
+    ).all()
+
+    by_topic = sorted(
+        (
+            TopicStats(topic=Topic(topic), answered=topic_answered, correct=topic_correct, accuracy=_accuracy(topic_answered, topic_correct))
+            for topic, topic_answered, topic_correct in topic_rows
+        ),
+        key=lambda stats: (stats.accuracy, -stats.answered),
+    )
+    total_answered = sum(stats.answered for stats in by_topic)
+    total_correct = sum(stats.correct for stats in by_topic)
+    return StatsResponse(
+        days=days,
+        since=since.isoformat(),
+        totals=AccuracyStats(answered=total_answered, correct=total_correct, accuracy=_accuracy(total_answered, total_correct)),
+        by_topic=by_topic,
+        daily=[
+            DailyStats(day=day.isoformat(), answered=day_answered, correct=day_correct, accuracy=_accuracy(day_answered, day_correct))
+            for day, day_answered, day_correct in day_rows
+        ],
+        weak_topics=[
+            stats.topic
+            for stats in by_topic
+            if stats.answered >= WEAK_TOPIC_MIN_ANSWERED and (stats.accuracy or 0) < WEAK_TOPIC_ACCURACY
+        ],
+    )
@@ -0,0 +1,34 @@
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.db.session import get_engine
+from app.db.transfer import ImportRecordError, export_stream, import_records
+from app.schemas.transfer import ImportReport
+
+router = APIRouter(tags=["transfer"])
+
+
+@router.get("/export")
+async def export_history(compress: Annotated[bool, Query()] = False) -> StreamingResponse:
+    filename = "lairn-export.ndjson.gz" if compress else "lairn-export.ndjson"
+    return StreamingResponse(
+        export_stream(get_engine(), compress=compress),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/import", response_model=ImportReport, status_code=status.HTTP_200_OK)
+async def import_history(request: Request) -> ImportReport:
+    compressed = request.headers.get("content-encoding", "").lower() == "gzip"
+    try:
+        result = await import_records(get_engine(), request.stream(), compressed=compressed)
+    except ImportRecordError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from None
+    return ImportReport(
+        sessions=result.counts["session"],
+        questions=result.counts["question"],
+        answers=result.counts["answer"],
+    )
@@ -6,9 +6,74 @@ class Settings(BaseSettings):
 
     database_url: str = "sqlite:///./lairn.db"
     sqlite_path: str | None = None
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 20000
+    sqlite_mmap_size_bytes: int = 268435456
+    sqlite_auto_vacuum: str = "INCREMENTAL"
+    sqlite_incremental_vacuum_pages: int = 2000
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: int = 30
+    db_busy_retries: int = 5
+    db_busy_backoff_ms: int = 50
+    retention_archive_after_days: int = 180
+    retention_trim_trace_after_days: int = 30
+    retention_batch_size: int = 200
+    retention_interval_seconds: int = 86400
+    retention_lease_seconds: int = 3600
+    # Online backups: copied in page steps with a pause between them, verified, optionally gzipped and rotated.
+    backup_dir: str | None = None
+    backup_interval_seconds: int = 86400
+    backup_keep: int = 7
+    backup_compress: bool = True
+    backup_verify: bool = True
+    backup_step_pages: int = 256
+    backup_step_sleep_ms: int = 5
+    backup_max_restarts: int = 3
+    backup_lease_seconds: int = 3600
+    transfer_batch_size: int = 500
+    regrade_batch_size: int = 500
+    regrade_workers: int = 4
+    regrade_llm_concurrency: int = 4
+    idempotency_key_ttl_hours: int = 24
+    summary_cache_size: int = 2048
+    active_session_cache_size: int = 512
+    active_session_idle_seconds: int = 1800
+    idempotency_wait_seconds: int = 120
+    idempotency_poll_interval_ms: int = 250
+    # Hard time budgets per endpoint; clients may ask for less with X-Request-Timeout-Ms. 0 means unbounded.
+    create_session_budget_seconds: float = 20.0
+    submit_answer_budget_seconds: float = 10.0
     ollama_base_url: str = "http://localhost:11434"
     ollama_model: str = "qwen3:1.7b" # llama3.1
+    # Pool of Ollama servers (JSON list); empty means just ollama_base_url.
+    ollama_base_urls: list[str] = []
+    # Per-task models; unset falls back to ollama_model.
+    ollama_generation_model: str | None = None
+    ollama_grading_model: str | None = None
     ollama_timeout_seconds: int = 30
+    # An LLM attempt is not started with less budget than this left; callers take their fallback instead.
+    llm_min_attempt_seconds: float = 1.0
+    ollama_max_in_flight: int = 2
+    ollama_slot_wait_seconds: int = 30
+    ollama_breaker_threshold: int = 5
+    ollama_breaker_cooldown_seconds: int = 30
+    ollama_health_ttl_seconds: int = 10
+    # Send fixed instructions as a /api/chat system message (False: one /api/generate prompt, the old layout).
+    ollama_chat_prefix: bool = True
+    # How long Ollama keeps the model, and with it the cached instruction prefix, loaded between calls.
+    ollama_keep_alive: str = "30m"
+    llm_verdict_cache_ttl_seconds: int = 86400
+    # Send a duplicate LLM call when one runs past this percentile of the task's recent latency.
+    llm_hedge_enabled: bool = False
+    llm_hedge_percentile: float = 95.0
+    llm_hedge_min_samples: int = 20
+    llm_hedge_max_ratio: float = 0.1
+    coordination_path: str | None = None
+    trace_log_requests: bool = False
+    trace_slow_request_ms: int = 2000
 
     def resolved_database_url(self) -> str:
         if self.sqlite_path:
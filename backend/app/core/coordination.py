@@ -0,0 +1,166 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from app.core.config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shared_cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS ix_shared_cache_expires_at ON shared_cache (expires_at);
+CREATE TABLE IF NOT EXISTS shared_slot (
+    name TEXT NOT NULL,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (name, holder)
+);
+CREATE TABLE IF NOT EXISTS shared_breaker (
+    name TEXT PRIMARY KEY,
+    failures INTEGER NOT NULL DEFAULT 0,
+    open_until REAL NOT NULL DEFAULT 0
+);
+"""
+_PURGE_EVERY_WRITES = 200
+
+
+def default_coordination_path() -> str:
+    if settings.coordination_path:
+        return settings.coordination_path
+    database_url = settings.resolved_database_url()
+    prefix = "sqlite:///"
+    if database_url.startswith(prefix) and database_url[len(prefix) :] not in {"", ":memory:"}:
+        # Resolved once at import, so every worker finds the same file even if one later changes directory.
+        return f"{os.path.abspath(database_url[len(prefix) :])}.coord"
+    return os.path.join(tempfile.gettempdir(), "lairn.coord")
+
+
+class SharedState:
+    """Cross-process caches, counting slots and circuit breakers kept in a small local SQLite file.
+
+    Every worker on the host opens the same file, so limits and cached values hold for the whole deployment
+    rather than per process. Connections are per thread because callers run on the threadpool.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=settings.sqlite_busy_timeout_ms / 1000, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM shared_cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time()),
+            )
+            .fetchone()
+        )
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl_seconds: float) -> None:
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO shared_cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                (namespace, key, json.dumps(value, separators=(",", ":")), now + ttl_seconds),
+            )
+            self._writes += 1
+            if self._writes % _PURGE_EVERY_WRITES == 0:
+                connection.execute("DELETE FROM shared_cache WHERE expires_at <= ?", (now,))
+
+    def _try_acquire(self, name: str, holder: str, limit: int, lease_seconds: float) -> bool:
+        now = time.time()
+        with self._transaction() as connection:
+            # Leases expire so a crashed worker cannot hold a slot forever.
+            connection.execute("DELETE FROM shared_slot WHERE name = ? AND expires_at <= ?", (name, now))
+            in_use = connection.execute("SELECT count(*) FROM shared_slot WHERE name = ?", (name,)).fetchone()[0]
+            if in_use >= limit:
+                return False
+            connection.execute(
+                "INSERT INTO shared_slot (name, holder, expires_at) VALUES (?, ?, ?)", (name, holder, now + lease_seconds)
+            )
+            return True
+
+    @contextmanager
+    def slot(self, name: str, *, limit: int, wait_seconds: float, lease_seconds: float) -> Iterator[bool]:
+        """Hold one of `limit` host-wide slots; yields False if none frees up within `wait_seconds`."""
+        holder = f"{os.getpid()}:{threading.get_ident()}:{uuid.uuid4().hex}"
+        deadline = time.monotonic() + wait_seconds
+        delay = 0.01
+        acquired = self._try_acquire(name, holder, limit, lease_seconds)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(delay)
+            delay = min(delay * 2, 0.25)
+            acquired = self._try_acquire(name, holder, limit, lease_seconds)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                with self._transaction() as connection:
+                    connection.execute("DELETE FROM shared_slot WHERE name = ? AND holder = ?", (name, holder))
+
+    def in_use(self, name: str) -> int:
+        return (
+            self._connection()
+            .execute("SELECT count(*) FROM shared_slot WHERE name = ? AND expires_at > ?", (name, time.time()))
+            .fetchone()[0]
+        )
+
+    def breaker_open(self, name: str) -> bool:
+        row = self._connection().execute("SELECT open_until FROM shared_breaker WHERE name = ?", (name,)).fetchone()
+        return bool(row) and row[0] > time.time()
+
+    def record_failure(self, name: str, *, threshold: int, cooldown_seconds: float) -> None:
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO shared_breaker (name, failures) VALUES (?, 1) "
+                "ON CONFLICT (name) DO UPDATE SET failures = failures + 1",
+                (name,),
+            )
+            connection.execute(
+                "UPDATE shared_breaker SET open_until = ?, failures = 0 WHERE name = ? AND failures >= ?",
+                (time.time() + cooldown_seconds, name, threshold),
+            )
+
+    def record_success(self, name: str) -> None:
+        with self._transaction() as connection:
+            connection.execute("UPDATE shared_breaker SET failures = 0, open_until = 0 WHERE name = ?", (name,))
+
+
+shared_state = SharedState(default_coordination_path())
@@ -0,0 +1,42 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Monotonic time by which the current request must finish; copied into threadpool workers like the trace span.
+_deadline: ContextVar[float | None] = ContextVar("lairn_deadline", default=None)
+
+
+def request_budget(configured_seconds: float, client_timeout_ms: int | None) -> float | None:
+    """The endpoint's budget, shortened by the client's `X-Request-Timeout-Ms`; None when neither sets one."""
+    budget = configured_seconds if configured_seconds > 0 else None
+    if client_timeout_ms is not None:
+        requested = client_timeout_ms / 1000
+        budget = requested if budget is None else min(budget, requested)
+    return budget
+
+
+@contextmanager
+def deadline(seconds: float | None) -> Iterator[None]:
+    """Bound the enclosed work to `seconds` from now; nested scopes can only shorten an outer deadline."""
+    if seconds is None:
+        yield
+        return
+    at = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(at if outer is None else min(outer, at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    at = _deadline.get()
+    return None if at is None else max(0.0, at - time.monotonic())
+
+
+def expired(reserve: float = 0.0) -> bool:
+    """True when less than `reserve` seconds are left, so a step that needs that long should take its cheap path."""
+    left = remaining()
+    return left is not None and left <= reserve
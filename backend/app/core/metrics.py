@@ -0,0 +1,134 @@
+import threading
+from bisect import bisect_left
+from collections.abc import Sequence
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_text(label_names: Sequence[str], label_values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.label_names), 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.label_names, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = _DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last slot is +Inf), sum, count.
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            counts, totals = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0, 0.0]))
+            counts[bisect_left(self.buckets, value)] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(tuple(str(labels[name]) for name in self.label_names))
+        return int(series[1][1]) if series else 0
+
+    def sum(self, **labels: str) -> float:
+        series = self._series.get(tuple(str(labels[name]) for name in self.label_names))
+        return series[1][0] if series else 0.0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, (total, observations)) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    labels = _label_text(self.label_names, key, 'le="' + le + '"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_label_text(self.label_names, key)} {total:g}")
+                lines.append(f"{self.name}_count{_label_text(self.label_names, key)} {observations:g}")
+        return lines
+
+
+class Registry:
+    """Process-local metric registry rendered in the Prometheus text exposition format."""
+
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram] = []
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Histogram:
+        metric = Histogram(name, documentation, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = Registry()
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "lairn_http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status")
+)
+WS_ANSWER_DURATION = REGISTRY.histogram(
+    "lairn_ws_answer_duration_seconds", "Time from an answer message on the session WebSocket to its pushed result.", ("type",)
+)
+STAGE_DURATION = REGISTRY.histogram("lairn_stage_duration_seconds", "Duration of traced stages.", ("stage",))
+PATH_TOTAL = REGISTRY.counter("lairn_path_total", "Which path handled generation, grading, and LLM calls.", ("stage", "path"))
+LLM_CALL_DURATION = REGISTRY.histogram(
+    "lairn_llm_call_duration_seconds", "Successful LLM call latency as seen by the caller, by task and whether a hedge was sent.", ("task", "hedged")
+)
+LLM_HEDGES = REGISTRY.counter(
+    "lairn_llm_hedges_total", "Hedged LLM requests: sent, won, lost, or skipped (over_budget, no_capacity).", ("task", "outcome")
+)
+LLM_HEDGE_SAVED = REGISTRY.histogram(
+    "lairn_llm_hedge_saved_seconds", "Estimated time the cancelled primary would still have taken when a hedge won.", ("task",)
+)
+LLM_PROMPT_EVAL_DURATION = REGISTRY.histogram(
+    "lairn_llm_prompt_eval_seconds", "Ollama prompt evaluation time per call type and API (chat or generate).", ("call", "api")
+)
+LLM_PROMPT_EVAL_TOKENS = REGISTRY.counter(
+    "lairn_llm_prompt_eval_tokens_total", "Prompt tokens Ollama evaluated (not served from its cache), per call type and API.", ("call", "api")
+)
+BACKUPS = REGISTRY.counter("lairn_backups_total", "Online database backups by outcome (ok, failed, skipped).", ("outcome",))
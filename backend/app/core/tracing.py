@@ -0,0 +1,125 @@
+import json
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import HTTP_REQUEST_DURATION, PATH_TOTAL, STAGE_DURATION
+
+logger = logging.getLogger("app.trace")
+
+REQUEST_SPAN = "request"
+
+
+@dataclass(eq=False)
+class Span:
+    name: str
+    attributes: dict[str, Any]
+    started_at: float = field(default_factory=time.perf_counter)
+    duration: float | None = None
+    children: list["Span"] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            **({"attributes": self.attributes} if self.attributes else {}),
+            **({"children": [child.to_dict() for child in self.children]} if self.children else {}),
+        }
+
+
+# Copied into threadpool workers by run_in_threadpool, so spans opened there attach to the request tree.
+_current_span: ContextVar[Span | None] = ContextVar("lairn_current_span", default=None)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    current = Span(name=name, attributes=attributes)
+    parent = _current_span.get()
+    if parent is not None:
+        parent.children.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.attributes["error"] = type(exc).__name__
+        raise
+    finally:
+        current.duration = time.perf_counter() - current.started_at
+        _current_span.reset(token)
+        if name != REQUEST_SPAN:
+            STAGE_DURATION.observe(current.duration, stage=name)
+
+
+def annotate(**attributes: Any) -> None:
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def record_path(stage: str, path: str) -> None:
+    """Count which branch handled `stage` (for example LLM vs fallback) and tag the active span with it."""
+    PATH_TOTAL.inc(stage=stage, path=path)
+    annotate(path=path)
+
+
+class TracingMiddleware:
+    """Opens the root span for each HTTP request and records its latency by route template."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with span(REQUEST_SPAN, method=scope["method"], path=scope["path"]) as root:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                root.attributes.update(route=route, status=status_code)
+
+        HTTP_REQUEST_DURATION.observe(
+            root.duration or 0.0, method=scope["method"], route=root.attributes["route"], status=str(status_code)
+        )
+        _log_request(root)
+
+
+def _log_request(root: Span) -> None:
+    duration_ms = (root.duration or 0.0) * 1000
+    if settings.trace_slow_request_ms and duration_ms >= settings.trace_slow_request_ms:
+        logger.warning("slow request %s", json.dumps(root.to_dict(), default=str))
+    elif settings.trace_log_requests:
+        logger.info(
+            "request %s",
+            json.dumps(
+                {
+                    "route": root.attributes.get("route"),
+                    "method": root.attributes.get("method"),
+                    "status": root.attributes.get("status"),
+                    "duration_ms": round(duration_ms, 3),
+                    "stages": {child.name: round((child.duration or 0.0) * 1000, 3) for child in root.children},
+                },
+                default=str,
+            ),
+        )
@@ -0,0 +1,209 @@
+import asyncio
+import gzip
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core import coordination
+from app.core.config import settings
+from app.core.metrics import BACKUPS
+from app.db.retention import sqlite_database_path
+from app.db.session import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+_STAMP = "%Y%m%d_%H%M%S_%f"
+
+
+class BackupBusyError(RuntimeError):
+    """Another worker on the host is already taking a backup."""
+
+
+@dataclass
+class BackupVerification:
+    ok: bool
+    integrity: str
+    schema_version: int | None = None
+    sessions: int | None = None
+    answers: int | None = None
+
+
+@dataclass
+class BackupResult:
+    path: Path
+    size_bytes: int
+    page_count: int
+    duration_ms: float
+    restarts: int
+    verification: BackupVerification | None
+    removed: list[str]
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def backup_directory(database_path: str) -> Path:
+    return Path(settings.backup_dir) if settings.backup_dir else Path(database_path).resolve().parent / "backups"
+
+
+def list_backups(database_path: str) -> list[Path]:
+    """Backups of `database_path`, newest first; the timestamped names sort in creation order."""
+    directory = backup_directory(database_path)
+    if not directory.is_dir():
+        return []
+    pattern = re.compile(rf"{re.escape(Path(database_path).name)}\.bak\.\d{{8}}_\d{{6}}_\d{{6}}(\.gz)?")
+    return sorted((path for path in directory.iterdir() if pattern.fullmatch(path.name)), reverse=True)
+
+
+def _copy_online(source: sqlite3.Connection, target: sqlite3.Connection, pages: int, pause: float, max_restarts: int) -> int:
+    """Copy in `pages`-sized steps, pausing between them; returns how often writers forced a restart."""
+    restarts = 0
+    last_remaining: int | None = None
+
+    def progress(_status: int, remaining: int, _total: int) -> None:
+        nonlocal restarts, last_remaining
+        # A write from another connection makes SQLite start the copy over, which shows up as `remaining` growing.
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > max_restarts:
+                raise _TooManyRestarts
+        last_remaining = remaining
+        if remaining:
+            time.sleep(pause)
+
+    try:
+        source.backup(target, pages=pages, progress=progress)
+    except _TooManyRestarts:
+        if source.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+            # Outside WAL a single step would hold a shared lock that writers queue behind for the whole copy.
+            raise RuntimeError(f"Backup restarted {restarts} times under concurrent writes") from None
+        # Under steady writes small steps never catch up. One step reads a single WAL snapshot, which writers do not
+        # wait on, so finishing that way only costs a longer read transaction.
+        source.backup(target, pages=-1)
+    return restarts
+
+
+def verify_backup(path: Path, *, compressed: bool | None = None) -> BackupVerification:
+    """Restore `path` into a scratch file and check that it opens, passes integrity_check and has the app's tables."""
+    compressed = path.name.endswith(".gz") if compressed is None else compressed
+    with tempfile.TemporaryDirectory(dir=path.parent) as scratch:
+        restored = Path(scratch) / "restored.db"
+        opener = gzip.open if compressed else open
+        try:
+            with opener(path, "rb") as packed, open(restored, "wb") as unpacked:
+                shutil.copyfileobj(packed, unpacked)
+            with closing(sqlite3.connect(restored)) as connection:
+                integrity = connection.execute("PRAGMA integrity_check").fetchone()[0]
+                return BackupVerification(
+                    ok=integrity == "ok",
+                    integrity=integrity,
+                    schema_version=connection.execute("PRAGMA user_version").fetchone()[0],
+                    sessions=connection.execute("SELECT count(*) FROM quizsession").fetchone()[0],
+                    answers=connection.execute("SELECT count(*) FROM quizanswer").fetchone()[0],
+                )
+        except (OSError, sqlite3.DatabaseError) as exc:
+            return BackupVerification(ok=False, integrity=str(exc))
+
+
+def _rotate(database_path: str, keep: int) -> list[str]:
+    removed = []
+    for path in list_backups(database_path)[max(keep, 1) :]:
+        path.unlink(missing_ok=True)
+        removed.append(path.name)
+    return removed
+
+
+def backup_sqlite_database(database_path: str, *, compress: bool | None = None, verify: bool | None = None) -> BackupResult:
+    compress = settings.backup_compress if compress is None else compress
+    verify = settings.backup_verify if verify is None else verify
+    directory = backup_directory(database_path)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f"{Path(database_path).name}.bak.{datetime.now(UTC):{_STAMP}}" + (".gz" if compress else "")
+    final = directory / name
+    partial = directory / f"{name}.partial"
+    copied = directory / f"{name}.copy.partial" if compress else partial
+
+    started = time.perf_counter()
+    try:
+        with closing(connect_sqlite(database_path)) as source, closing(sqlite3.connect(copied)) as target:
+            restarts = _copy_online(
+                source, target, settings.backup_step_pages, settings.backup_step_sleep_ms / 1000, settings.backup_max_restarts
+            )
+            page_count = target.execute("PRAGMA page_count").fetchone()[0]
+        if compress:
+            with open(copied, "rb") as raw, gzip.open(partial, "wb", compresslevel=1) as packed:
+                shutil.copyfileobj(raw, packed)
+        verification = verify_backup(partial, compressed=compress) if verify else None
+        if verification is not None and not verification.ok:
+            raise RuntimeError(f"Backup of {database_path} failed verification: {verification.integrity}")
+        # Only a complete, verified file ever gets a backup name, so rotation never keeps a torn copy.
+        os.replace(partial, final)
+    finally:
+        partial.unlink(missing_ok=True)
+        copied.unlink(missing_ok=True)
+    return BackupResult(
+        path=final,
+        size_bytes=final.stat().st_size,
+        page_count=page_count,
+        duration_ms=(time.perf_counter() - started) * 1000,
+        restarts=restarts,
+        verification=verification,
+        removed=_rotate(database_path, settings.backup_keep),
+    )
+
+
+def _backup_exclusively(database_path: str) -> BackupResult:
+    # Every worker runs the schedule; the host-wide slot makes sure only one of them copies the file at a time.
+    with coordination.shared_state.slot("backup", limit=1, wait_seconds=0, lease_seconds=settings.backup_lease_seconds) as acquired:
+        if not acquired:
+            raise BackupBusyError("A backup is already running")
+        return backup_sqlite_database(database_path)
+
+
+async def run_backup(target_engine: AsyncEngine) -> BackupResult | None:
+    """Back up the SQLite database behind `target_engine`; None for other databases."""
+    database_path = sqlite_database_path(target_engine)
+    if database_path is None:
+        return None
+    try:
+        result = await asyncio.to_thread(_backup_exclusively, database_path)
+    except BackupBusyError:
+        BACKUPS.inc(outcome="skipped")
+        raise
+    except Exception:
+        BACKUPS.inc(outcome="failed")
+        raise
+    BACKUPS.inc(outcome="ok")
+    return result
+
+
+async def backup_loop(target_engine: AsyncEngine) -> None:
+    while True:
+        await asyncio.sleep(settings.backup_interval_seconds)
+        try:
+            result = await run_backup(target_engine)
+        except BackupBusyError:
+            logger.info("Skipped scheduled backup; another worker is taking one")
+        except Exception:
+            logger.exception("Backup run failed")
+        else:
+            if result is not None:
+                logger.info(
+                    "Backed up %d pages to %s in %.0f ms (%d restarts), removed %d old backups",
+                    result.page_count,
+                    result.path,
+                    result.duration_ms,
+                    result.restarts,
+                    len(result.removed),
+                )
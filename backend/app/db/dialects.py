@@ -0,0 +1,26 @@
+from sqlalchemy import Connection
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, SQLModel
+
+# Upserts rely on INSERT ... ON CONFLICT, which only these dialects build.
+SUPPORTED_DIALECTS = ("sqlite", "postgresql")
+
+
+class UnsupportedDialectError(ValueError):
+    def __init__(self, dialect: str) -> None:
+        super().__init__(f"Unsupported database dialect {dialect!r}; use one of: {', '.join(SUPPORTED_DIALECTS)}")
+        self.dialect = dialect
+
+
+def check_dialect(dialect: str) -> None:
+    if dialect not in SUPPORTED_DIALECTS:
+        raise UnsupportedDialectError(dialect)
+
+
+def dialect_insert(db: Session | Connection, model: type[SQLModel]) -> postgresql.Insert | sqlite.Insert:
+    # Both dialects expose the same ON CONFLICT builder API.
+    dialect = db.dialect if isinstance(db, Connection) else db.get_bind().dialect
+    if dialect.name == "postgresql":
+        return postgresql.insert(model)
+    check_dialect(dialect.name)
+    return sqlite.insert(model)
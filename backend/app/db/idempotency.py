@@ -0,0 +1,60 @@
+import hashlib
+import json
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.db.dialects import dialect_insert
+from app.db.models import IdempotencyKey
+
+
+def request_fingerprint(payload: dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def claim_idempotency_key(db: Session, key: str, request_hash: str) -> IdempotencyKey | None:
+    """Claim `key` for this request; returns None when the caller owns it, otherwise the existing record."""
+    now = datetime.now(UTC)
+    inserted = db.exec(
+        dialect_insert(db, IdempotencyKey)
+        .values(key=key, request_hash=request_hash, created_at=now)
+        .on_conflict_do_nothing(index_elements=["key"])
+    )
+    if inserted.rowcount == 1:
+        return None
+
+    # A claim that never produced a response outlived its owner (crash or lost connection); take it over.
+    abandoned_before = now - timedelta(seconds=settings.idempotency_wait_seconds)
+    taken_over = db.exec(
+        update(IdempotencyKey)
+        .where(
+            IdempotencyKey.key == key,
+            IdempotencyKey.request_hash == request_hash,
+            IdempotencyKey.response.is_(None),
+            IdempotencyKey.created_at < abandoned_before,
+        )
+        .values(created_at=now)
+    )
+    if taken_over.rowcount == 1:
+        return None
+    return db.exec(
+        select(IdempotencyKey).where(IdempotencyKey.key == key).execution_options(populate_existing=True)
+    ).first()
+
+
+def complete_idempotency_key(db: Session, key: str, session_id: str, response: dict[str, Any]) -> None:
+    db.exec(update(IdempotencyKey).where(IdempotencyKey.key == key).values(session_id=session_id, response=response))
+
+
+def release_idempotency_key(db: Session, key: str) -> None:
+    db.exec(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.response.is_(None)))
+
+
+def expire_idempotency_keys(db: Session, now: datetime) -> int:
+    expired = db.exec(
+        delete(IdempotencyKey).where(IdempotencyKey.created_at < now - timedelta(hours=settings.idempotency_key_ttl_hours))
+    )
+    return expired.rowcount
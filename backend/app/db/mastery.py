@@ -0,0 +1,281 @@
+import hashlib
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import Connection, delete, insert, update
+from sqlmodel import Session, col, select
+from sqlmodel.sql.expression import Select, SelectOfScalar
+
+from app.db.dialects import dialect_insert
+from app.db.models import QuestionReview, QuizAnswer, QuizQuestion, TopicMastery
+
+# Weight of the latest answer in a topic's moving error rate.
+ERROR_RATE_DECAY = 0.3
+MIN_EASE = 1.3
+MAX_EASE = 3.0
+MAX_INTERVAL_DAYS = 365.0
+_VARIATION_SUFFIX = re.compile(r"\s*\(variation \d+\)$")
+
+
+@dataclass(frozen=True)
+class ReviewState:
+    question_id: str
+    session_id: str
+    topic: str
+    difficulty: str
+    question_type: str
+    repetitions: int
+    lapses: int
+    ease: float
+    interval_days: float
+    last_correct: bool
+    last_answered_at: datetime
+    due_at: datetime
+
+
+def prompt_key(prompt: str) -> str:
+    # Deduplication variants of one prompt are the same question for review purposes.
+    normalized = " ".join(_VARIATION_SUFFIX.sub("", prompt).lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def next_review(
+    previous: ReviewState | None,
+    *,
+    question_id: str,
+    session_id: str,
+    topic: str,
+    difficulty: str,
+    question_type: str,
+    is_correct: bool,
+    answered_at: datetime,
+) -> ReviewState:
+    """SM-2 style schedule: correct answers stretch the interval by `ease`, misses make the question due at once."""
+    repetitions = previous.repetitions if previous else 0
+    lapses = previous.lapses if previous else 0
+    ease = previous.ease if previous else 2.5
+    interval_days = previous.interval_days if previous else 0.0
+    if is_correct:
+        interval_days = 1.0 if repetitions == 0 else 3.0 if repetitions == 1 else min(round(interval_days * ease, 2), MAX_INTERVAL_DAYS)
+        repetitions += 1
+        ease = min(MAX_EASE, ease + 0.05)
+    else:
+        interval_days = 0.0
+        repetitions = 0
+        lapses += 1
+        ease = max(MIN_EASE, ease - 0.2)
+    return ReviewState(
+        question_id=question_id,
+        session_id=session_id,
+        topic=topic,
+        difficulty=difficulty,
+        question_type=question_type,
+        repetitions=repetitions,
+        lapses=lapses,
+        ease=ease,
+        interval_days=interval_days,
+        last_correct=is_correct,
+        last_answered_at=answered_at,
+        due_at=answered_at + timedelta(days=interval_days),
+    )
+
+
+def _review_row(key: str, state: ReviewState) -> dict[str, object]:
+    # A shallow copy: `asdict` deep-copies every field, which dominated full-history replays.
+    return {"prompt_key": key, **vars(state)}
+
+
+def review_state(review: QuestionReview) -> ReviewState:
+    return ReviewState(
+        question_id=review.question_id,
+        session_id=review.session_id,
+        topic=review.topic,
+        difficulty=review.difficulty,
+        question_type=review.question_type,
+        repetitions=review.repetitions,
+        lapses=review.lapses,
+        ease=review.ease,
+        interval_days=review.interval_days,
+        last_correct=review.last_correct,
+        last_answered_at=review.last_answered_at.replace(tzinfo=review.last_answered_at.tzinfo or UTC),
+        due_at=review.due_at.replace(tzinfo=review.due_at.tzinfo or UTC),
+    )
+
+
+def save_review(db: Session, key: str, state: ReviewState) -> None:
+    statement = dialect_insert(db, QuestionReview).values(**_review_row(key, state))
+    db.exec(
+        statement.on_conflict_do_update(
+            index_elements=["prompt_key"],
+            set_={name: statement.excluded[name] for name in vars(state)},
+        )
+    )
+
+
+def _swap_review(db: Session, key: str, expected: ReviewState | None, state: ReviewState) -> bool:
+    """Write `state` only if the stored schedule is still `expected`; False if another answer got there first."""
+    if expected is None:
+        statement = dialect_insert(db, QuestionReview).values(**_review_row(key, state))
+        return db.exec(statement.on_conflict_do_nothing(index_elements=["prompt_key"])).rowcount == 1
+    return (
+        db.exec(
+            update(QuestionReview)
+            .where(
+                QuestionReview.prompt_key == key,
+                QuestionReview.repetitions == expected.repetitions,
+                QuestionReview.lapses == expected.lapses,
+                QuestionReview.last_answered_at == expected.last_answered_at,
+            )
+            .values(**vars(state))
+        ).rowcount
+        == 1
+    )
+
+
+def reschedule_review(
+    db: Session,
+    key: str,
+    cached: ReviewState | None,
+    *,
+    question_id: str,
+    session_id: str,
+    topic: str,
+    difficulty: str,
+    question_type: str,
+    is_correct: bool,
+    answered_at: datetime,
+) -> ReviewState:
+    """Advance the schedule for `key` from the caller's `cached` copy, or from the stored row if another session or
+    worker has moved it since, so concurrent answers to one prompt build on each other instead of overwriting."""
+    answer = {
+        "question_id": question_id,
+        "session_id": session_id,
+        "topic": topic,
+        "difficulty": difficulty,
+        "question_type": question_type,
+        "is_correct": is_correct,
+        "answered_at": answered_at,
+    }
+    state = next_review(cached, **answer)
+    if _swap_review(db, key, cached, state):
+        return state
+    stored = db.exec(reviews_by_key_query([key]).with_for_update().execution_options(populate_existing=True)).first()
+    state = next_review(review_state(stored) if stored is not None else None, **answer)
+    save_review(db, key, state)
+    return state
+
+
+def record_topic_mastery(db: Session, *, topic: str, difficulty: str, is_correct: bool, answered_at: datetime) -> None:
+    miss = 0.0 if is_correct else 1.0
+    statement = dialect_insert(db, TopicMastery).values(
+        topic=topic,
+        difficulty=difficulty,
+        answered=1,
+        correct=0 if miss else 1,
+        error_rate=miss,
+        last_answered_at=answered_at,
+    )
+    db.exec(
+        statement.on_conflict_do_update(
+            index_elements=["topic", "difficulty"],
+            set_={
+                "answered": TopicMastery.answered + 1,
+                "correct": TopicMastery.correct + (0 if miss else 1),
+                "error_rate": TopicMastery.error_rate * (1 - ERROR_RATE_DECAY) + ERROR_RATE_DECAY * miss,
+                "last_answered_at": answered_at,
+            },
+        )
+    )
+
+
+def shift_topic_mastery(db: Session, *, topic: str, difficulty: str, correct: int) -> None:
+    """Adjust correct counts after stored verdicts change; the moving error rate is left to later answers."""
+    db.exec(
+        update(TopicMastery)
+        .where(TopicMastery.topic == topic, TopicMastery.difficulty == difficulty)
+        .values(correct=TopicMastery.correct + correct)
+    )
+
+
+def reviews_by_key_query(keys: Iterable[str]) -> SelectOfScalar[QuestionReview]:
+    return select(QuestionReview).where(col(QuestionReview.prompt_key).in_(list(keys)))
+
+
+def due_reviews_query(
+    *, topics: list[str], difficulty: str, question_types: list[str], now: datetime, limit: int
+) -> Select[tuple[QuestionReview, QuizQuestion]]:
+    # Missed questions first, then the longest overdue; served by ix_questionreview_queue.
+    return (
+        select(QuestionReview, QuizQuestion)
+        .join(QuizQuestion, QuizQuestion.id == QuestionReview.question_id)
+        .where(
+            QuestionReview.difficulty == difficulty,
+            QuestionReview.due_at <= now,
+            col(QuestionReview.topic).in_(topics),
+            col(QuestionReview.question_type).in_(question_types),
+        )
+        .order_by(QuestionReview.last_correct, QuestionReview.due_at)
+        .limit(limit)
+    )
+
+
+def mastery_query(*, topics: list[str], difficulty: str) -> SelectOfScalar[TopicMastery]:
+    return select(TopicMastery).where(TopicMastery.difficulty == difficulty, col(TopicMastery.topic).in_(topics))
+
+
+def rebuild_mastery(connection: Connection) -> None:
+    """Replay answer history into review schedules and topic mastery."""
+    answers = connection.execute(
+        select(
+            QuizAnswer.question_id,
+            QuizAnswer.session_id,
+            QuizAnswer.is_correct,
+            QuizAnswer.created_at,
+            QuizQuestion.prompt,
+            QuizQuestion.topic_tags,
+            QuizQuestion.difficulty,
+            QuizQuestion.type,
+        )
+        .join(QuizQuestion, QuizQuestion.id == QuizAnswer.question_id)
+        .order_by(QuizAnswer.created_at, QuizAnswer.id)
+    )
+    reviews: dict[str, ReviewState] = {}
+    mastery: dict[tuple[str, str], dict[str, object]] = {}
+    for question_id, session_id, is_correct, created_at, prompt, topic_tags, difficulty, question_type in answers:
+        answered_at = created_at.replace(tzinfo=created_at.tzinfo or UTC)
+        key = prompt_key(prompt)
+        reviews[key] = next_review(
+            reviews.get(key),
+            question_id=question_id,
+            session_id=session_id,
+            topic=topic_tags[0],
+            difficulty=difficulty,
+            question_type=question_type,
+            is_correct=is_correct,
+            answered_at=answered_at,
+        )
+        miss = 0.0 if is_correct else 1.0
+        current = mastery.get((topic_tags[0], difficulty))
+        if current is None:
+            mastery[(topic_tags[0], difficulty)] = {
+                "topic": topic_tags[0],
+                "difficulty": difficulty,
+                "answered": 1,
+                "correct": 1 - int(miss),
+                "error_rate": miss,
+                "last_answered_at": answered_at,
+            }
+        else:
+            current["answered"] += 1  # type: ignore[operator]
+            current["correct"] += 1 - int(miss)  # type: ignore[operator]
+            current["error_rate"] = current["error_rate"] * (1 - ERROR_RATE_DECAY) + ERROR_RATE_DECAY * miss  # type: ignore[operator]
+            current["last_answered_at"] = answered_at
+
+    connection.execute(delete(QuestionReview))
+    connection.execute(delete(TopicMastery))
+    if reviews:
+        connection.execute(insert(QuestionReview), [_review_row(key, state) for key, state in reviews.items()])
+    if mastery:
+        connection.execute(insert(TopicMastery), list(mastery.values()))
@@ -0,0 +1,111 @@
+from collections.abc import Callable
+
+from sqlalchemy import Connection
+
+from app.db.mastery import rebuild_mastery
+from app.db.scores import rebuild_answer_rollups, rebuild_session_scores
+
+
+def _column_names(connection: Connection, table: str) -> set[str]:
+    return {row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({table})")}
+
+
+def _add_missing_columns(connection: Connection, table: str, columns: dict[str, str]) -> None:
+    existing = _column_names(connection, table)
+    for name, ddl in columns.items():
+        if name not in existing:
+            connection.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+
+
+def _denormalize_session_scores(connection: Connection) -> None:
+    _add_missing_columns(
+        connection,
+        "quizsession",
+        {
+            "answered_count": "INTEGER NOT NULL DEFAULT 0",
+            "correct_count": "INTEGER NOT NULL DEFAULT 0",
+        },
+    )
+    # The rebuild helper bumps `version`, which older files only gain in step 6.
+    _session_version(connection)
+    rebuild_session_scores(connection)
+
+
+def _unique_answer_per_question(connection: Connection) -> None:
+    connection.exec_driver_sql(
+        "DELETE FROM quizanswer WHERE rowid NOT IN "
+        "(SELECT MIN(rowid) FROM quizanswer GROUP BY session_id, question_id)"
+    )
+    connection.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_quizanswer_session_question ON quizanswer (session_id, question_id)"
+    )
+    rebuild_session_scores(connection)
+
+
+def _session_history_indexes(connection: Connection) -> None:
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS ix_quizsession_created_at_id ON quizsession (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_quizsession_difficulty_created_at_id ON quizsession (difficulty, created_at, id)",
+        (
+            "CREATE INDEX IF NOT EXISTS ix_quizsession_completed_created_at_id ON quizsession (created_at, id) "
+            "WHERE completed_at IS NOT NULL"
+        ),
+        "CREATE INDEX IF NOT EXISTS ix_quizsession_open_created_at_id ON quizsession (created_at, id) WHERE completed_at IS NULL",
+    ):
+        connection.exec_driver_sql(statement)
+
+
+def _session_archive_marker(connection: Connection) -> None:
+    _add_missing_columns(connection, "quizsession", {"archived_at": "DATETIME"})
+
+
+def _session_version(connection: Connection) -> None:
+    _add_missing_columns(connection, "quizsession", {"version": "INTEGER NOT NULL DEFAULT 0"})
+
+
+def _adaptive_sessions(connection: Connection) -> None:
+    _add_missing_columns(connection, "quizsession", {"mode": "VARCHAR NOT NULL DEFAULT 'standard'"})
+    rebuild_mastery(connection)
+
+
+MIGRATIONS: list[tuple[int, Callable[[Connection], None]]] = [
+    (1, _denormalize_session_scores),
+    (2, _unique_answer_per_question),
+    (3, _session_history_indexes),
+    (4, _session_archive_marker),
+    (5, rebuild_answer_rollups),
+    (6, _session_version),
+    (7, _adaptive_sessions),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_is_current(connection: Connection, table_names: set[str]) -> bool:
+    # One pragma and one catalog read, instead of the per-table inspection `create_all` performs.
+    if connection.dialect.name != "sqlite":
+        return False
+    if connection.exec_driver_sql("PRAGMA user_version").scalar() != SCHEMA_VERSION:
+        return False
+    existing = {row[0] for row in connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return table_names <= existing
+
+
+def has_tables(connection: Connection) -> bool:
+    if connection.dialect.name != "sqlite":
+        return True
+    return connection.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE type = 'table' LIMIT 1").first() is not None
+
+
+def run_migrations(connection: Connection, *, fresh: bool = False) -> None:
+    # Tables are created by `create_all`; these steps only upgrade databases created by older releases.
+    if connection.dialect.name != "sqlite":
+        return
+    if fresh:
+        # `create_all` just built the current schema, so there is nothing to upgrade.
+        connection.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return
+    current_version = connection.exec_driver_sql("PRAGMA user_version").scalar() or 0
+    for version, step in MIGRATIONS:
+        if current_version < version:
+            step(connection)
+            connection.exec_driver_sql(f"PRAGMA user_version = {version}")
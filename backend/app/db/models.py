@@ -1,12 +1,31 @@
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime
 from typing import Any, Optional
 from uuid import uuid4
 
-from sqlalchemy import JSON, Column
+from sqlalchemy import JSON, Column, Index, LargeBinary, text
 from sqlmodel import Field, SQLModel
 
 
 class QuizSession(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_quizsession_created_at_id", "created_at", "id"),
+        Index("ix_quizsession_difficulty_created_at_id", "difficulty", "created_at", "id"),
+        Index(
+            "ix_quizsession_completed_created_at_id",
+            "created_at",
+            "id",
+            sqlite_where=text("completed_at IS NOT NULL"),
+            postgresql_where=text("completed_at IS NOT NULL"),
+        ),
+        Index(
+            "ix_quizsession_open_created_at_id",
+            "created_at",
+            "id",
+            sqlite_where=text("completed_at IS NULL"),
+            postgresql_where=text("completed_at IS NULL"),
+        ),
+    )
+
     id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
     topics: list[str] = Field(sa_column=Column(JSON, nullable=False))
     difficulty: str = Field(nullable=False)
@@ -14,6 +33,19 @@ class QuizSession(SQLModel, table=True):
     num_questions: int = Field(nullable=False)
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
     completed_at: Optional[datetime] = Field(default=None, nullable=True)
+    answered_count: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+    correct_count: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+    archived_at: Optional[datetime] = Field(default=None, nullable=True)
+    version: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+    mode: str = Field(default="standard", nullable=False, sa_column_kwargs={"server_default": "standard"})
+
+
+class QuizSessionTopicScore(SQLModel, table=True):
+    session_id: str = Field(foreign_key="quizsession.id", primary_key=True)
+    topic: str = Field(primary_key=True)
+    position: int = Field(nullable=False)
+    correct: int = Field(default=0, nullable=False)
+    total: int = Field(default=0, nullable=False)
 
 
 class QuizQuestion(SQLModel, table=True):
@@ -33,6 +65,8 @@ class QuizQuestion(SQLModel, table=True):
 
 
 class QuizAnswer(SQLModel, table=True):
+    __table_args__ = (Index("uq_quizanswer_session_question", "session_id", "question_id", unique=True),)
+
     id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
     session_id: str = Field(foreign_key="quizsession.id", index=True, nullable=False)
     question_id: str = Field(foreign_key="quizquestion.id", index=True, nullable=False)
@@ -44,3 +78,76 @@ class QuizAnswer(SQLModel, table=True):
     why_others_wrong: Optional[list[str]] = Field(default=None, sa_column=Column(JSON, nullable=True))
     judge_trace: Optional[dict[str, Any]] = Field(default=None, sa_column=Column(JSON, nullable=True))
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
+
+
+class QuizSessionArchive(SQLModel, table=True):
+    session_id: str = Field(foreign_key="quizsession.id", primary_key=True)
+    archived_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
+    codec: str = Field(default="gzip", nullable=False)
+    record_count: int = Field(nullable=False)
+    payload: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+
+class QuizAnswerRollup(SQLModel, table=True):
+    __table_args__ = (Index("ix_quizanswerrollup_day", "day"),)
+
+    topic: str = Field(primary_key=True)
+    difficulty: str = Field(primary_key=True)
+    question_type: str = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    answered: int = Field(default=0, nullable=False)
+    correct: int = Field(default=0, nullable=False)
+
+
+class IdempotencyKey(SQLModel, table=True):
+    __table_args__ = (Index("ix_idempotencykey_created_at", "created_at"),)
+
+    key: str = Field(primary_key=True, max_length=255)
+    request_hash: str = Field(nullable=False)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
+    session_id: Optional[str] = Field(default=None, foreign_key="quizsession.id", nullable=True)
+    response: Optional[dict[str, Any]] = Field(default=None, sa_column=Column(JSON, nullable=True))
+
+
+class QuestionReview(SQLModel, table=True):
+    """Spaced-repetition schedule per distinct prompt, pointing at the latest stored copy of the question."""
+
+    __table_args__ = (
+        Index("ix_questionreview_queue", "difficulty", "last_correct", "due_at"),
+        Index("ix_questionreview_session_id", "session_id"),
+    )
+
+    prompt_key: str = Field(primary_key=True, max_length=64)
+    question_id: str = Field(foreign_key="quizquestion.id", nullable=False)
+    session_id: str = Field(nullable=False)
+    topic: str = Field(nullable=False)
+    difficulty: str = Field(nullable=False)
+    question_type: str = Field(nullable=False)
+    repetitions: int = Field(default=0, nullable=False)
+    lapses: int = Field(default=0, nullable=False)
+    ease: float = Field(default=2.5, nullable=False)
+    interval_days: float = Field(default=0.0, nullable=False)
+    last_correct: bool = Field(nullable=False)
+    last_answered_at: datetime = Field(nullable=False)
+    due_at: datetime = Field(nullable=False)
+
+
+class TopicMastery(SQLModel, table=True):
+    topic: str = Field(primary_key=True)
+    difficulty: str = Field(primary_key=True)
+    answered: int = Field(default=0, nullable=False)
+    correct: int = Field(default=0, nullable=False)
+    error_rate: float = Field(default=0.0, nullable=False)
+    last_answered_at: datetime = Field(nullable=False)
+
+
+class RegradeCheckpoint(SQLModel, table=True):
+    """Progress of a re-grading job; answers are visited in id order and `last_answer_id` is the resume point."""
+
+    job: str = Field(primary_key=True, max_length=255)
+    last_answer_id: Optional[str] = Field(default=None, nullable=True)
+    processed: int = Field(default=0, nullable=False)
+    changed: int = Field(default=0, nullable=False)
+    started_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC), nullable=False)
+    finished_at: Optional[datetime] = Field(default=None, nullable=True)
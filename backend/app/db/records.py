@@ -0,0 +1,7 @@
+from typing import Any
+
+from sqlmodel import SQLModel
+
+
+def dump_record(kind: str, row: SQLModel) -> dict[str, Any]:
+    return {"kind": kind, **row.model_dump(mode="json")}
@@ -0,0 +1,235 @@
+import asyncio
+import gzip
+import json
+import logging
+import sqlite3
+from collections import defaultdict
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session, select
+
+from app.core import coordination
+from app.core.config import settings
+from app.db.idempotency import expire_idempotency_keys
+from app.db.models import (
+    QuestionReview,
+    QuizAnswer,
+    QuizQuestion,
+    QuizSession,
+    QuizSessionArchive,
+)
+from app.db.records import dump_record
+from app.db.session import connect_sqlite, open_session, run_with_busy_retry
+
+logger = logging.getLogger(__name__)
+
+# SQLite reports this auto_vacuum mode as 2; 0 (NONE) needs a one-off VACUUM to switch.
+_INCREMENTAL_AUTO_VACUUM = 2
+
+
+class RetentionBusyError(RuntimeError):
+    """Another worker on the host is already running retention."""
+
+
+@dataclass
+class StorageStats:
+    page_size: int
+    page_count: int
+    freelist_count: int
+    auto_vacuum: int
+
+    @property
+    def database_bytes(self) -> int:
+        return self.page_size * self.page_count
+
+    @property
+    def free_bytes(self) -> int:
+        return self.page_size * self.freelist_count
+
+
+@dataclass
+class RetentionResult:
+    sessions_archived: int
+    answers_trimmed: int
+    before: StorageStats | None
+    after: StorageStats | None
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        if self.before is None or self.after is None:
+            return 0
+        return max(self.before.database_bytes - self.after.database_bytes, 0)
+
+
+def encode_archive(records: list[dict[str, Any]]) -> bytes:
+    lines = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+    return gzip.compress(lines.encode("utf-8"))
+
+
+def decode_archive(payload: bytes) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in gzip.decompress(payload).decode("utf-8").splitlines() if line]
+
+
+def _archive_batch(db: Session, cutoff: datetime, batch_size: int, archived_at: datetime) -> int:
+    sessions = db.exec(
+        select(QuizSession)
+        .where(QuizSession.completed_at < cutoff, QuizSession.archived_at.is_(None))
+        .order_by(QuizSession.completed_at)
+        .limit(batch_size)
+    ).all()
+    if not sessions:
+        return 0
+
+    session_ids = [quiz_session.id for quiz_session in sessions]
+    records: dict[str, list[dict[str, Any]]] = {quiz_session.id: [dump_record("session", quiz_session)] for quiz_session in sessions}
+    questions = db.exec(
+        select(QuizQuestion).where(QuizQuestion.session_id.in_(session_ids)).order_by(QuizQuestion.order_index)
+    ).all()
+    answers = db.exec(select(QuizAnswer).where(QuizAnswer.session_id.in_(session_ids)).order_by(QuizAnswer.created_at)).all()
+    children: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for question in questions:
+        children[question.session_id].append(dump_record("question", question))
+    for answer in answers:
+        children[answer.session_id].append(dump_record("answer", answer))
+
+    db.exec(
+        insert(QuizSessionArchive),
+        params=[
+            {
+                "session_id": session_id,
+                "archived_at": archived_at,
+                "codec": "gzip",
+                "record_count": len(records[session_id]) + len(children[session_id]),
+                "payload": encode_archive(records[session_id] + children[session_id]),
+            }
+            for session_id in session_ids
+        ],
+    )
+    # Scores and topic tallies stay hot so history and summaries keep working for archived sessions.
+    # Review schedules whose latest copy of the question is archived leave the review queue with it.
+    db.exec(delete(QuestionReview).where(QuestionReview.session_id.in_(session_ids)))
+    db.exec(delete(QuizAnswer).where(QuizAnswer.session_id.in_(session_ids)))
+    db.exec(delete(QuizQuestion).where(QuizQuestion.session_id.in_(session_ids)))
+    db.exec(update(QuizSession).where(QuizSession.id.in_(session_ids)).values(archived_at=archived_at))
+    return len(session_ids)
+
+
+def _trim_judge_traces(db: Session, cutoff: datetime) -> int:
+    if db.get_bind().dialect.name != "sqlite":
+        return 0
+    # Keep only the grading path; rationales and overlap details are debugging aids that bloat old rows.
+    trace_path = func.json_object("path", func.json_extract(QuizAnswer.judge_trace, "$.path"))
+    result = db.exec(
+        update(QuizAnswer)
+        .where(
+            QuizAnswer.created_at < cutoff,
+            func.json_type(QuizAnswer.judge_trace) == "object",
+            func.json_remove(QuizAnswer.judge_trace, "$.path") != "{}",
+        )
+        .values(judge_trace=trace_path)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def sqlite_database_path(target_engine: AsyncEngine) -> str | None:
+    url = target_engine.url
+    if url.get_backend_name() != "sqlite" or url.database in {None, "", ":memory:"}:
+        return None
+    return url.database
+
+
+def _read_stats(connection: sqlite3.Connection) -> StorageStats:
+    return StorageStats(
+        page_size=connection.execute("PRAGMA page_size").fetchone()[0],
+        page_count=connection.execute("PRAGMA page_count").fetchone()[0],
+        freelist_count=connection.execute("PRAGMA freelist_count").fetchone()[0],
+        auto_vacuum=connection.execute("PRAGMA auto_vacuum").fetchone()[0],
+    )
+
+
+def read_storage_stats(path: str) -> StorageStats:
+    with closing(connect_sqlite(path)) as connection:
+        return _read_stats(connection)
+
+
+def compact_sqlite_database(path: str, pages: int, *, switch_auto_vacuum: bool = False) -> StorageStats:
+    with closing(connect_sqlite(path)) as connection:
+        if _read_stats(connection).auto_vacuum != _INCREMENTAL_AUTO_VACUUM:
+            if not switch_auto_vacuum:
+                # Switching modes rewrites the whole file under an exclusive lock that writers would time out on,
+                # so only an explicit admin run does it; scheduled runs leave such files as they are.
+                return _read_stats(connection)
+            # Databases created before incremental auto-vacuum need one full rebuild to switch modes.
+            connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            connection.execute("VACUUM")
+        else:
+            # execute() steps the pragma once and frees a single page; executescript runs it to completion.
+            connection.executescript(f"PRAGMA incremental_vacuum({pages})")
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return _read_stats(connection)
+
+
+async def run_retention(
+    target_engine: AsyncEngine, now: datetime | None = None, *, switch_auto_vacuum: bool = False
+) -> RetentionResult:
+    """Archive, trim and compact; `switch_auto_vacuum` allows the one-off VACUUM older files need."""
+    # Every worker runs the schedule; the host-wide slot keeps two of them from archiving the same sessions.
+    with coordination.shared_state.slot(
+        "retention", limit=1, wait_seconds=0, lease_seconds=settings.retention_lease_seconds
+    ) as acquired:
+        if not acquired:
+            raise RetentionBusyError("Retention is already running")
+        return await _retain(target_engine, now or datetime.now(UTC), switch_auto_vacuum)
+
+
+async def _retain(target_engine: AsyncEngine, now: datetime, switch_auto_vacuum: bool) -> RetentionResult:
+    archive_cutoff = now - timedelta(days=settings.retention_archive_after_days)
+    trim_cutoff = now - timedelta(days=settings.retention_trim_trace_after_days)
+    database_path = sqlite_database_path(target_engine)
+    before = await asyncio.to_thread(read_storage_stats, database_path) if database_path else None
+
+    archived = 0
+    async with open_session(target_engine) as db:
+        while True:
+            batch = await run_with_busy_retry(
+                db, lambda tx: _archive_batch(tx, archive_cutoff, settings.retention_batch_size, now)
+            )
+            archived += batch
+            if batch < settings.retention_batch_size:
+                break
+        trimmed = await run_with_busy_retry(db, lambda tx: _trim_judge_traces(tx, trim_cutoff))
+        await run_with_busy_retry(db, lambda tx: expire_idempotency_keys(tx, now))
+
+    after = None
+    if database_path:
+        after = await asyncio.to_thread(
+            compact_sqlite_database,
+            database_path,
+            settings.sqlite_incremental_vacuum_pages,
+            switch_auto_vacuum=switch_auto_vacuum,
+        )
+    return RetentionResult(sessions_archived=archived, answers_trimmed=trimmed, before=before, after=after)
+
+
+async def retention_loop(target_engine: AsyncEngine) -> None:
+    while True:
+        await asyncio.sleep(settings.retention_interval_seconds)
+        try:
+            result = await run_retention(target_engine)
+        except RetentionBusyError:
+            logger.info("Skipped scheduled retention; another worker is running it")
+        except Exception:
+            logger.exception("Retention run failed")
+        else:
+            logger.info(
+                "Retention archived %d sessions, trimmed %d answers, reclaimed %d bytes",
+                result.sessions_archived,
+                result.answers_trimmed,
+                result.reclaimed_bytes,
+            )
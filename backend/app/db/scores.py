@@ -0,0 +1,168 @@
+from collections.abc import Sequence
+from datetime import UTC, date, datetime
+
+from sqlalchemy import Connection, case, delete, func, insert, select, update
+from sqlmodel import Session
+
+from app.db.dialects import dialect_insert
+from app.db.models import (
+    QuizAnswer,
+    QuizAnswerRollup,
+    QuizQuestion,
+    QuizSession,
+    QuizSessionTopicScore,
+)
+
+
+def init_session_scores(db: Session, session_id: str, question_topics: Sequence[str]) -> None:
+    totals: dict[str, int] = {}
+    for topic in question_topics:
+        totals[topic] = totals.get(topic, 0) + 1
+    if not totals:
+        return
+    db.exec(
+        insert(QuizSessionTopicScore),
+        params=[
+            {"session_id": session_id, "topic": topic, "position": position, "correct": 0, "total": total}
+            for position, (topic, total) in enumerate(totals.items())
+        ],
+    )
+
+
+def record_answer_score(db: Session, *, session_id: str, topic: str, is_correct: bool) -> bool:
+    db.exec(
+        update(QuizSession)
+        .where(QuizSession.id == session_id)
+        .values(
+            answered_count=QuizSession.answered_count + 1,
+            correct_count=QuizSession.correct_count + (1 if is_correct else 0),
+            version=QuizSession.version + 1,
+        )
+    )
+    if is_correct:
+        db.exec(
+            update(QuizSessionTopicScore)
+            .where(QuizSessionTopicScore.session_id == session_id, QuizSessionTopicScore.topic == topic)
+            .values(correct=QuizSessionTopicScore.correct + 1)
+        )
+    completed = db.exec(
+        update(QuizSession)
+        .where(
+            QuizSession.id == session_id,
+            QuizSession.completed_at.is_(None),
+            QuizSession.answered_count >= QuizSession.num_questions,
+        )
+        .values(completed_at=datetime.now(UTC))
+    )
+    return completed.rowcount == 1
+
+
+def add_answer_rollup(
+    db: Session,
+    *,
+    topic: str,
+    difficulty: str,
+    question_type: str,
+    answered_on: date,
+    answered: int,
+    correct: int,
+) -> None:
+    db.exec(
+        dialect_insert(db, QuizAnswerRollup)
+        .values(
+            topic=topic,
+            difficulty=difficulty,
+            question_type=question_type,
+            day=answered_on,
+            answered=answered,
+            correct=correct,
+        )
+        .on_conflict_do_update(
+            index_elements=["topic", "difficulty", "question_type", "day"],
+            set_={"answered": QuizAnswerRollup.answered + answered, "correct": QuizAnswerRollup.correct + correct},
+        )
+    )
+
+
+def record_answer_rollup(
+    db: Session,
+    *,
+    topic: str,
+    difficulty: str,
+    question_type: str,
+    answered_on: date,
+    is_correct: bool,
+) -> None:
+    add_answer_rollup(
+        db,
+        topic=topic,
+        difficulty=difficulty,
+        question_type=question_type,
+        answered_on=answered_on,
+        answered=1,
+        correct=1 if is_correct else 0,
+    )
+
+
+def rebuild_session_scores(connection: Connection, session_ids: Sequence[str] | None = None) -> None:
+    topic_expr = QuizQuestion.topic_tags[0].as_string()
+    correct_expr = case((QuizAnswer.is_correct, 1), else_=0)
+
+    clear_topics = delete(QuizSessionTopicScore)
+    tallies = (
+        select(
+            QuizQuestion.session_id,
+            topic_expr,
+            func.min(QuizQuestion.order_index),
+            func.coalesce(func.sum(correct_expr), 0),
+            func.count(QuizQuestion.id),
+        )
+        .outerjoin(
+            QuizAnswer,
+            (QuizAnswer.question_id == QuizQuestion.id) & (QuizAnswer.session_id == QuizQuestion.session_id),
+        )
+        .group_by(QuizQuestion.session_id, topic_expr)
+    )
+    answered = select(func.count(QuizAnswer.id)).where(QuizAnswer.session_id == QuizSession.id).scalar_subquery()
+    correct = (
+        select(func.count(QuizAnswer.id))
+        .where(QuizAnswer.session_id == QuizSession.id, QuizAnswer.is_correct.is_(True))
+        .scalar_subquery()
+    )
+    refresh_sessions = update(QuizSession).values(
+        answered_count=answered, correct_count=correct, version=QuizSession.version + 1
+    )
+
+    if session_ids is not None:
+        clear_topics = clear_topics.where(QuizSessionTopicScore.session_id.in_(session_ids))
+        tallies = tallies.where(QuizQuestion.session_id.in_(session_ids))
+        refresh_sessions = refresh_sessions.where(QuizSession.id.in_(session_ids))
+
+    connection.execute(clear_topics)
+    connection.execute(
+        insert(QuizSessionTopicScore).from_select(["session_id", "topic", "position", "correct", "total"], tallies)
+    )
+    connection.execute(refresh_sessions)
+
+
+def rebuild_answer_rollups(connection: Connection) -> None:
+    topic_expr = QuizQuestion.topic_tags[0].as_string()
+    day_expr = func.date(QuizAnswer.created_at)
+    rollups = (
+        select(
+            topic_expr,
+            QuizQuestion.difficulty,
+            QuizQuestion.type,
+            day_expr,
+            func.count(QuizAnswer.id),
+            func.sum(case((QuizAnswer.is_correct, 1), else_=0)),
+        )
+        .join(QuizQuestion, QuizQuestion.id == QuizAnswer.question_id)
+        .group_by(topic_expr, QuizQuestion.difficulty, QuizQuestion.type, day_expr)
+    )
+    connection.execute(delete(QuizAnswerRollup))
+    connection.execute(
+        insert(QuizAnswerRollup).from_select(
+            ["topic", "difficulty", "question_type", "day", "answered", "correct"], rollups
+        )
+    )
@@ -1,18 +1,160 @@
-from collections.abc import Generator
+import asyncio
+import functools
+import random
+import sqlite3
+from collections.abc import AsyncGenerator, Callable
+from typing import Any, TypeVar
 
+from sqlalchemy import Connection, Engine, event, make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
+from app.core.tracing import span
+from app.db.dialects import check_dialect
+from app.db.migrations import has_tables, run_migrations, schema_is_current
 
-resolved_db_url = settings.resolved_database_url()
-sqlite_connect_args = {"check_same_thread": False} if resolved_db_url.startswith("sqlite") else {}
-engine = create_engine(resolved_db_url, echo=False, connect_args=sqlite_connect_args)
+T = TypeVar("T")
 
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
 
-def create_db_and_tables() -> None:
-    SQLModel.metadata.create_all(engine)
 
+def _is_sqlite_url(url: str) -> bool:
+    return url.startswith("sqlite")
 
-def get_session() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+
+def _is_sqlite_memory_url(url: str) -> bool:
+    return _is_sqlite_url(url) and (":memory:" in url or url.split("://", 1)[-1] in {"", "/"})
+
+
+def _apply_sqlite_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA page_count")
+        if cursor.fetchone()[0] == 0:
+            # auto_vacuum only takes effect before the first table exists; setting it later takes a write lock.
+            cursor.execute(f"PRAGMA auto_vacuum={settings.sqlite_auto_vacuum}")
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kib}")
+        cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size_bytes}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+    finally:
+        cursor.close()
+
+
+def _engine_options(database_url: str) -> dict[str, Any]:
+    if not _is_sqlite_url(database_url):
+        return {"pool_pre_ping": True}
+
+    options: dict[str, Any] = {
+        "connect_args": {"check_same_thread": False, "timeout": settings.sqlite_busy_timeout_ms / 1000},
+    }
+    if not _is_sqlite_memory_url(database_url):
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+        )
+    return options
+
+
+def to_async_url(database_url: str) -> str:
+    scheme, separator, rest = database_url.partition("://")
+    if "+" in scheme:
+        return database_url
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{separator}{rest}"
+
+
+def build_engine(database_url: str) -> Engine:
+    check_dialect(make_url(database_url).get_backend_name())
+    sync_engine = create_engine(database_url, echo=False, **_engine_options(database_url))
+    if _is_sqlite_url(database_url):
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
+    return sync_engine
+
+
+def build_async_engine(database_url: str) -> AsyncEngine:
+    async_url = to_async_url(database_url)
+    # Fail here rather than on the first upsert, which would build SQL the server rejects.
+    check_dialect(make_url(async_url).get_backend_name())
+    async_engine = create_async_engine(async_url, echo=False, **_engine_options(async_url))
+    if _is_sqlite_url(async_url):
+        event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return async_engine
+
+
+def connect_sqlite(path: str) -> sqlite3.Connection:
+    """A plain sqlite3 connection in autocommit mode for maintenance work outside the engine's pool."""
+    connection = sqlite3.connect(path, timeout=settings.sqlite_busy_timeout_ms / 1000, isolation_level=None)
+    connection.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+    return connection
+
+
+def is_busy_error(exc: OperationalError) -> bool:
+    message = str(exc.orig).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+async def run_with_busy_retry(db: AsyncSession, work: Callable[[Session], T]) -> T:
+    # `work` runs against the synchronous session view and is replayed after a rollback,
+    # so it must be safe to run again against a clean transaction.
+    attempt = 0
+    with span("db.transaction") as transaction:
+        while True:
+            transaction.attributes["attempts"] = attempt + 1
+            try:
+                result = await db.run_sync(work)
+                await db.commit()
+                return result
+            except OperationalError as exc:
+                await db.rollback()
+                if not is_busy_error(exc) or attempt >= settings.db_busy_retries:
+                    raise
+                backoff_seconds = min(settings.db_busy_backoff_ms * (2**attempt) / 1000, 1.0)
+                await asyncio.sleep(backoff_seconds * random.uniform(0.5, 1.0))
+                attempt += 1
+
+
+def _prepare_schema(connection: Connection) -> None:
+    if schema_is_current(connection, set(SQLModel.metadata.tables)):
+        return
+    fresh = not has_tables(connection)
+    SQLModel.metadata.create_all(connection)
+    run_migrations(connection, fresh=fresh)
+
+
+def prepare_database(target_engine: Engine) -> None:
+    with target_engine.begin() as connection:
+        _prepare_schema(connection)
+
+
+async def prepare_async_database(target_engine: AsyncEngine) -> None:
+    async with target_engine.begin() as connection:
+        await connection.run_sync(_prepare_schema)
+
+
+@functools.cache
+def get_engine() -> AsyncEngine:
+    # Built on first use so importing the app does not load the driver or touch the database file.
+    return build_async_engine(settings.resolved_database_url())
+
+
+async def create_db_and_tables() -> None:
+    await prepare_async_database(get_engine())
+
+
+def open_session(target_engine: AsyncEngine) -> AsyncSession:
+    # Committed rows stay readable: async sessions cannot lazily refresh expired attributes.
+    return AsyncSession(target_engine, expire_on_commit=False)
+
+
+async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    async with open_session(get_engine()) as session:
         yield session
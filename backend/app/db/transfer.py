@@ -0,0 +1,285 @@
+import json
+import zlib
+from collections import defaultdict
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session, SQLModel, select
+
+from app.core.config import settings
+from app.db.dialects import dialect_insert
+from app.db.mastery import prompt_key, record_topic_mastery, reschedule_review
+from app.db.migrations import SCHEMA_VERSION
+from app.db.models import QuizAnswer, QuizQuestion, QuizSession, QuizSessionArchive
+from app.db.records import dump_record
+from app.db.retention import decode_archive
+from app.db.scores import add_answer_rollup, rebuild_session_scores
+from app.db.session import open_session, run_with_busy_retry
+
+EXPORT_FORMAT = "lairn-export"
+EXPORT_VERSION = 1
+
+_RECORD_MODELS: dict[str, type[SQLModel]] = {"session": QuizSession, "question": QuizQuestion, "answer": QuizAnswer}
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+_FLUSH_BYTES = 64 * 1024
+
+
+class ImportRecordError(ValueError):
+    def __init__(self, line_number: int, message: str) -> None:
+        super().__init__(f"line {line_number}: {message}")
+        self.line_number = line_number
+
+
+@dataclass
+class ImportResult:
+    counts: dict[str, int] = field(default_factory=lambda: dict.fromkeys(_RECORD_MODELS, 0))
+
+
+def _encode_line(record: dict[str, Any]) -> str:
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+async def _export_lines(target_engine: AsyncEngine) -> AsyncIterator[str]:
+    yield _encode_line(
+        {
+            "kind": "header",
+            "format": EXPORT_FORMAT,
+            "version": EXPORT_VERSION,
+            "schema_version": SCHEMA_VERSION,
+            "exported_at": datetime.now(UTC).isoformat(),
+        }
+    )
+    # Sessions first, then questions, then answers, so an import never references a row it has not seen yet.
+    async with open_session(target_engine) as db:
+        for kind, statement in (
+            ("session", select(QuizSession).order_by(QuizSession.created_at, QuizSession.id)),
+            ("question", select(QuizQuestion)),
+            ("answer", select(QuizAnswer)),
+        ):
+            rows = await db.stream_scalars(statement.execution_options(yield_per=settings.transfer_batch_size))
+            async for row in rows:
+                yield _encode_line(dump_record(kind, row))
+
+        archives = await db.stream_scalars(
+            select(QuizSessionArchive).execution_options(yield_per=settings.transfer_batch_size)
+        )
+        async for archive in archives:
+            for record in decode_archive(archive.payload):
+                if record["kind"] != "session":
+                    yield _encode_line(record)
+
+
+async def export_stream(target_engine: AsyncEngine, compress: bool = False) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=_GZIP_WBITS) if compress else None
+    buffer: list[str] = []
+    buffered_bytes = 0
+    async for line in _export_lines(target_engine):
+        buffer.append(line)
+        buffered_bytes += len(line)
+        if buffered_bytes < _FLUSH_BYTES:
+            continue
+        chunk = "".join(buffer).encode("utf-8")
+        buffer.clear()
+        buffered_bytes = 0
+        if compressor is None:
+            yield chunk
+        elif compressed := compressor.compress(chunk):
+            yield compressed
+
+    chunk = "".join(buffer).encode("utf-8")
+    if compressor is None:
+        if chunk:
+            yield chunk
+    else:
+        yield compressor.compress(chunk) + compressor.flush()
+
+
+async def _iter_lines(chunks: AsyncIterable[bytes], compressed: bool) -> AsyncIterator[bytes]:
+    decompressor = None
+    pending = b""
+    sniffed = False
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        if not sniffed:
+            sniffed = True
+            if compressed or chunk[:2] == b"\x1f\x8b":
+                decompressor = zlib.decompressobj(wbits=_GZIP_WBITS)
+        pending += decompressor.decompress(chunk) if decompressor else chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if decompressor is not None:
+        pending += decompressor.flush()
+    for line in pending.split(b"\n"):
+        yield line
+
+
+def _parse_record(line: bytes, line_number: int) -> tuple[str, dict[str, Any]] | None:
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as exc:
+        raise ImportRecordError(line_number, f"invalid JSON ({exc.msg})") from None
+    if not isinstance(record, dict):
+        raise ImportRecordError(line_number, "expected a JSON object")
+
+    kind = record.pop("kind", None)
+    if kind == "header":
+        if record.get("format") != EXPORT_FORMAT or record.get("version") != EXPORT_VERSION:
+            raise ImportRecordError(line_number, "unsupported export format")
+        return None
+    model = _RECORD_MODELS.get(kind)
+    if model is None:
+        raise ImportRecordError(line_number, f"unknown record kind {kind!r}")
+    try:
+        row = model.model_validate(record).model_dump()
+    except ValidationError as exc:
+        raise ImportRecordError(line_number, f"invalid {kind}: {exc.errors()[0]['msg']}") from None
+    return kind, row
+
+
+def _archived_sessions(db: Session, session_ids: set[str]) -> dict[str, datetime]:
+    return dict(
+        db.exec(
+            select(QuizSessionArchive.session_id, QuizSessionArchive.archived_at).where(
+                QuizSessionArchive.session_id.in_(session_ids)
+            )
+        ).all()
+    )
+
+
+def _check_references(db: Session, kind: str, rows: list[dict[str, Any]], line_numbers: list[int]) -> None:
+    """Reject the batch before it writes anything if a row points at a session or question that does not exist."""
+    references = [("session", QuizSession.id)]
+    if kind == "answer":
+        references.append(("question", QuizQuestion.id))
+    for name, id_column in references:
+        column = f"{name}_id"
+        known = set(db.exec(select(id_column).where(id_column.in_({row[column] for row in rows}))).all())
+        for row, line_number in zip(rows, line_numbers):
+            if row[column] not in known:
+                raise ImportRecordError(line_number, f"{kind} references unknown {name} {row[column]!r}")
+
+
+def _record_new_answers(db: Session, rows: list[dict[str, Any]]) -> None:
+    existing = set(db.exec(select(QuizAnswer.id).where(QuizAnswer.id.in_([row["id"] for row in rows]))).all())
+    new_rows = [row for row in rows if row["id"] not in existing]
+    if not new_rows:
+        return
+    questions = {
+        question_id: (topic_tags[0], difficulty, question_type, prompt)
+        for question_id, topic_tags, difficulty, question_type, prompt in db.exec(
+            select(
+                QuizQuestion.id, QuizQuestion.topic_tags, QuizQuestion.difficulty, QuizQuestion.type, QuizQuestion.prompt
+            ).where(QuizQuestion.id.in_({row["question_id"] for row in new_rows}))
+        ).all()
+    }
+    tallies: dict[tuple[str, str, str, Any], list[int]] = defaultdict(lambda: [0, 0])
+    for row in new_rows:
+        key = (*questions[row["question_id"]][:3], row["created_at"].astimezone(UTC).date())
+        tallies[key][0] += 1
+        tallies[key][1] += 1 if row["is_correct"] else 0
+    for (topic, difficulty, question_type, answered_on), (answered, correct) in tallies.items():
+        add_answer_rollup(
+            db,
+            topic=topic,
+            difficulty=difficulty,
+            question_type=question_type,
+            answered_on=answered_on,
+            answered=answered,
+            correct=correct,
+        )
+    # Like the live path, only answers new to this database move review schedules and mastery, oldest first.
+    for row in sorted(new_rows, key=lambda row: (row["created_at"], row["id"])):
+        topic, difficulty, question_type, prompt = questions[row["question_id"]]
+        answered_at = row["created_at"].replace(tzinfo=row["created_at"].tzinfo or UTC)
+        record_topic_mastery(db, topic=topic, difficulty=difficulty, is_correct=row["is_correct"], answered_at=answered_at)
+        reschedule_review(
+            db,
+            prompt_key(prompt),
+            None,
+            question_id=row["question_id"],
+            session_id=row["session_id"],
+            topic=topic,
+            difficulty=difficulty,
+            question_type=question_type,
+            is_correct=row["is_correct"],
+            answered_at=answered_at,
+        )
+
+
+def _upsert_batch(db: Session, kind: str, rows: list[dict[str, Any]], line_numbers: list[int]) -> int:
+    model = _RECORD_MODELS[kind]
+    archived = _archived_sessions(db, {row["id" if kind == "session" else "session_id"] for row in rows})
+    if kind == "session":
+        # Imported history lands in the hot tables and retention archives it again when it ages out, unless the
+        # session is already archived here: then its archive stays the only copy of its questions and answers.
+        rows = [{**row, "archived_at": archived.get(row["id"])} for row in rows]
+    else:
+        kept = [(row, line_number) for row, line_number in zip(rows, line_numbers) if row["session_id"] not in archived]
+        if not kept:
+            return 0
+        rows, line_numbers = [row for row, _ in kept], [line_number for _, line_number in kept]
+        _check_references(db, kind, rows, line_numbers)
+    if kind == "answer":
+        _record_new_answers(db, rows)
+    statement = dialect_insert(db, model)
+    updates = {column.name: statement.excluded[column.name] for column in model.__table__.columns if not column.primary_key}
+    if kind == "session":
+        # Keep version counters moving forward so ETags handed out before the import stay invalid.
+        updates["version"] = QuizSession.version + 1
+    db.exec(statement.on_conflict_do_update(index_elements=["id"], set_=updates), params=rows)
+    if kind != "session":
+        rebuild_session_scores(db.connection(), sorted({row["session_id"] for row in rows}))
+    return len(rows)
+
+
+async def import_records(
+    target_engine: AsyncEngine,
+    chunks: AsyncIterable[bytes],
+    compressed: bool = False,
+) -> ImportResult:
+    result = ImportResult()
+    batch_kind: str | None = None
+    batch: list[dict[str, Any]] = []
+    batch_lines: list[int] = []
+
+    async with open_session(target_engine) as db:
+
+        async def flush() -> None:
+            if batch_kind is None or not batch:
+                return
+            rows, line_numbers = list(batch), list(batch_lines)
+            try:
+                result.counts[batch_kind] += await run_with_busy_retry(
+                    db, lambda tx: _upsert_batch(tx, batch_kind, rows, line_numbers)
+                )
+            except IntegrityError as exc:
+                # The batch's transaction is rolled back with the session, like any other rejected line.
+                raise ImportRecordError(
+                    line_numbers[0], f"{batch_kind} batch starting here rejected by the database ({exc.orig})"
+                ) from None
+            batch.clear()
+            batch_lines.clear()
+
+        line_number = 0
+        async for line in _iter_lines(chunks, compressed):
+            line_number += 1
+            if not line.strip():
+                continue
+            parsed = _parse_record(line, line_number)
+            if parsed is None:
+                continue
+            kind, row = parsed
+            if kind != batch_kind or len(batch) >= settings.transfer_batch_size:
+                await flush()
+                batch_kind = kind
+            batch.append(row)
+            batch_lines.append(line_number)
+        await flush()
+    return result
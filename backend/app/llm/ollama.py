@@ -1,53 +1,213 @@
 import json
-from typing import Any, TypeVar
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, TypeVar
 
-import httpx
 from pydantic import BaseModel, ValidationError
 
+from app.core import coordination
 from app.core.config import settings
+from app.core.metrics import LLM_PROMPT_EVAL_DURATION, LLM_PROMPT_EVAL_TOKENS
+
+if TYPE_CHECKING:
+    import httpx
 
 T = TypeVar("T", bound=BaseModel)
 
+# Prefix of the per-server in-flight slots, circuit breaker and health entries shared by every worker.
+_OLLAMA = "ollama"
+# Weight of the latest call in a server's moving latency.
+LATENCY_DECAY = 0.3
+
+
+@dataclass(frozen=True)
+class GenerateRequest:
+    model: str
+    prompt: str
+    # Fixed instructions shared by many calls. Sent as the chat system message so Ollama reuses their KV cache.
+    system: str | None = None
+    # Label for prompt-eval metrics: generation, regeneration or grading.
+    call: str = "generation"
+
+    def body(self, *, stream: bool) -> tuple[str, dict[str, Any]]:
+        options: dict[str, Any] = {"model": self.model, "stream": stream, "format": "json", "keep_alive": settings.ollama_keep_alive}
+        if self.system is not None and settings.ollama_chat_prefix:
+            messages = [{"role": "system", "content": self.system}, {"role": "user", "content": self.prompt}]
+            return "/api/chat", {**options, "messages": messages}
+        return "/api/generate", {**options, "prompt": (self.system or "") + self.prompt}
+
+
+def _response_text(payload: dict[str, Any], default: str = "") -> str:
+    message = payload.get("message")
+    if isinstance(message, dict):
+        return message.get("content", default)
+    return payload.get("response", default)
+
+
+def _record_prompt_eval(payload: dict[str, Any], request: GenerateRequest, path: str) -> None:
+    # Ollama reports durations in nanoseconds on the final response (or final streamed chunk).
+    if "prompt_eval_duration" not in payload:
+        return
+    api = path.rsplit("/", 1)[-1]
+    LLM_PROMPT_EVAL_DURATION.observe(payload["prompt_eval_duration"] / 1e9, call=request.call, api=api)
+    LLM_PROMPT_EVAL_TOKENS.inc(payload.get("prompt_eval_count", 0), call=request.call, api=api)
+
+
+@dataclass
+class StreamControl:
+    """Lets another thread stop a streamed attempt; `chunks` counts response pieces received so far."""
+
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    started: float = field(default_factory=time.perf_counter)
+    chunks: int = 0
+
 
 class OllamaClient:
-    def __init__(self) -> None:
-        self._client = httpx.Client(
-            base_url=settings.ollama_base_url.rstrip("/"),
-            timeout=settings.ollama_timeout_seconds,
-        )
+    """One Ollama server; `LLMRouter` spreads task calls over several of these."""
+
+    def __init__(self, base_url: str | None = None) -> None:
+        self.base_url = (base_url or settings.ollama_base_url).rstrip("/")
+        self.name = f"{_OLLAMA}@{self.base_url}"
+        # Moving average of successful call durations seen by this worker; None until the first call.
+        self.latency_seconds: float | None = None
+        # Calls this worker has routed here and not finished, including ones still waiting for a slot.
+        self.pending = 0
+
+    @cached_property
+    def _client(self) -> "httpx.Client":
+        # httpx (and the TLS context a client builds) is loaded on the first call rather than at app import.
+        import httpx
+
+        return httpx.Client(base_url=self.base_url, timeout=settings.ollama_timeout_seconds)
 
-    def check_health(self) -> tuple[bool, str]:
+    def _health_key(self, model: str) -> str:
+        return f"{self.name}\0{model}"
+
+    def in_flight(self) -> int:
+        return coordination.shared_state.in_use(self.name)
+
+    def is_available(self, model: str) -> bool:
+        # Uses only shared state: an open breaker or a recent probe that did not find the model rules the server out.
+        shared = coordination.shared_state
+        return not shared.breaker_open(self.name) and shared.get("health", self._health_key(model)) is not False
+
+    def check_health(self, model: str) -> bool:
+        shared = coordination.shared_state
+        cached = shared.get("health", self._health_key(model))
+        if cached is not None:
+            return bool(cached)
+        model_is_available = self._probe_model(model)
+        shared.set("health", self._health_key(model), model_is_available, settings.ollama_health_ttl_seconds)
+        return model_is_available
+
+    def _probe_model(self, model: str) -> bool:
         try:
             response = self._client.get("/api/tags")
             response.raise_for_status()
             payload = response.json()
             models = payload.get("models", [])
-            installed_names = [model.get("name", "") for model in models if isinstance(model, dict)]
-            model_is_available = settings.ollama_model in installed_names
-            return model_is_available, settings.ollama_model
+            installed_names = [installed.get("name", "") for installed in models if isinstance(installed, dict)]
+            return model in installed_names
         except Exception:
-            return False, settings.ollama_model
-
-    def generate_json(self, *, prompt: str, response_model: type[T], max_retries: int = 2) -> T | None:
-        for _ in range(max_retries + 1):
-            try:
-                response = self._client.post(
-                    "/api/generate",
-                    json={
-                        "model": settings.ollama_model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "format": "json",
-                    },
-                )
-                response.raise_for_status()
+            return False
+
+    def generate_once(
+        self,
+        request: GenerateRequest,
+        *,
+        response_model: type[T],
+        stream: StreamControl | None = None,
+        wait_seconds: float | None = None,
+        timeout: float | None = None,
+    ) -> tuple[T | None, str]:
+        """One attempt; the outcome is ok, saturated, http_error, invalid_json, cancelled or deadline.
+
+        With `stream` the response is read chunk by chunk so another thread can cancel it. `timeout` caps both the
+        slot wait and the HTTP timeouts below their configured values, for callers with a deadline.
+        """
+        import httpx
+
+        shared = coordination.shared_state
+        wait_seconds = settings.ollama_slot_wait_seconds if wait_seconds is None else wait_seconds
+        http_timeout = float(settings.ollama_timeout_seconds)
+        if timeout is not None:
+            wait_seconds, http_timeout = min(wait_seconds, timeout), min(http_timeout, timeout)
+        try:
+            with shared.slot(
+                self.name,
+                limit=settings.ollama_max_in_flight,
+                wait_seconds=wait_seconds,
+                lease_seconds=settings.ollama_timeout_seconds * 2,
+            ) as acquired:
+                if not acquired:
+                    # Every worker's slots on this server are busy; callers already have a non-LLM fallback.
+                    return None, "saturated"
+                started = time.perf_counter()
+                path, body = request.body(stream=stream is not None)
+                if stream is None:
+                    response = self._client.post(path, json=body, timeout=http_timeout)
+                    response.raise_for_status()
+                    raw_response = None
+                else:
+                    raw_response = self._read_stream(path, body, request, stream, http_timeout)
+                elapsed = time.perf_counter() - started
+        except httpx.TimeoutException:
+            if timeout is not None and timeout < settings.ollama_timeout_seconds:
+                # Our caller ran out of budget; a slow answer is not a failing server, so the breaker is left alone.
+                return None, "deadline"
+            shared.record_failure(
+                self.name,
+                threshold=settings.ollama_breaker_threshold,
+                cooldown_seconds=settings.ollama_breaker_cooldown_seconds,
+            )
+            return None, "http_error"
+        except httpx.HTTPError:
+            shared.record_failure(
+                self.name,
+                threshold=settings.ollama_breaker_threshold,
+                cooldown_seconds=settings.ollama_breaker_cooldown_seconds,
+            )
+            return None, "http_error"
+        except (json.JSONDecodeError, ValueError):
+            shared.record_success(self.name)
+            return None, "invalid_json"
+        shared.record_success(self.name)
+        if stream is not None and raw_response is None:
+            return None, "cancelled"
+        previous = self.latency_seconds
+        self.latency_seconds = elapsed if previous is None else previous * (1 - LATENCY_DECAY) + elapsed * LATENCY_DECAY
+
+        try:
+            if raw_response is None:
                 payload: dict[str, Any] = response.json()
-                raw_response = payload.get("response", "{}")
-                parsed = self._parse_json_response(raw_response)
-                return response_model.model_validate(parsed)
-            except (httpx.HTTPError, json.JSONDecodeError, ValidationError, ValueError):
-                continue
-        return None
+                _record_prompt_eval(payload, request, path)
+                raw_response = _response_text(payload, "{}")
+            parsed = self._parse_json_response(raw_response)
+            return response_model.model_validate(parsed), "ok"
+        except (json.JSONDecodeError, ValidationError, ValueError):
+            return None, "invalid_json"
+
+    def _read_stream(
+        self, path: str, body: dict[str, Any], request: GenerateRequest, stream: StreamControl, timeout: float
+    ) -> str | None:
+        parts: list[str] = []
+        with self._client.stream("POST", path, json=body, timeout=timeout) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if stream.cancelled.is_set():
+                    # Leaving the block closes the connection, which makes Ollama stop generating.
+                    return None
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                parts.append(_response_text(chunk))
+                stream.chunks += 1
+                if chunk.get("done"):
+                    _record_prompt_eval(chunk, request, path)
+                    break
+        return "".join(parts)
 
     @staticmethod
     def _parse_json_response(raw_response: Any) -> Any:
@@ -63,6 +223,3 @@ class OllamaClient:
                 raise
             candidate = text[start : end + 1]
             return json.loads(candidate)
-
-
-ollama_client = OllamaClient()
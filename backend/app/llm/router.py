@@ -0,0 +1,271 @@
+import contextvars
+import hashlib
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from enum import StrEnum
+from functools import cached_property
+from typing import TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from app.core import coordination
+from app.core.config import settings
+from app.core.deadline import remaining
+from app.core.metrics import LLM_CALL_DURATION, LLM_HEDGE_SAVED, LLM_HEDGES
+from app.core.tracing import annotate, record_path, span
+from app.llm.ollama import GenerateRequest, OllamaClient, StreamControl
+
+T = TypeVar("T", bound=BaseModel)
+
+_HEDGE_THREADS = 64
+
+
+class LLMTask(StrEnum):
+    generation = "generation"
+    grading = "grading"
+
+
+class _LatencyWindow:
+    """Recent successful call latencies and hedge decisions for one task in this worker."""
+
+    def __init__(self, size: int = 256) -> None:
+        self._latencies: deque[float] = deque(maxlen=size)
+        self._hedged: deque[bool] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, *, hedged: bool) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+            self._hedged.append(hedged)
+
+    def hedge_delay(self) -> float | None:
+        with self._lock:
+            if len(self._latencies) < settings.llm_hedge_min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * settings.llm_hedge_percentile / 100))]
+
+    def try_hedge(self) -> bool:
+        # Budget: hedges stay under `llm_hedge_max_ratio` of the recent calls, counting this one.
+        with self._lock:
+            return sum(self._hedged) + 1 <= settings.llm_hedge_max_ratio * (len(self._hedged) + 1)
+
+
+class LLMRouter:
+    """Sends each task to its configured model on the least-loaded healthy server in the pool."""
+
+    def __init__(self, endpoints: list[OllamaClient] | None = None) -> None:
+        self._lock = threading.Lock()
+        self._windows = {task: _LatencyWindow() for task in LLMTask}
+        if endpoints is not None:
+            self.endpoints = endpoints
+
+    @cached_property
+    def endpoints(self) -> list[OllamaClient]:
+        urls = settings.ollama_base_urls or [settings.ollama_base_url]
+        return [OllamaClient(url) for url in dict.fromkeys(url.rstrip("/") for url in urls)]
+
+    @cached_property
+    def _hedge_pool(self) -> ThreadPoolExecutor:
+        # Sized above the request threadpool so hedged attempts never queue behind each other; threads start lazily.
+        return ThreadPoolExecutor(max_workers=_HEDGE_THREADS, thread_name_prefix="llm-hedge")
+
+    @staticmethod
+    def model_for(task: LLMTask) -> str:
+        assigned = {LLMTask.generation: settings.ollama_generation_model, LLMTask.grading: settings.ollama_grading_model}
+        return assigned[task] or settings.ollama_model
+
+    def pick(self, model: str, tried: set[str] = frozenset()) -> OllamaClient | None:
+        candidates = [endpoint for endpoint in self.endpoints if endpoint.is_available(model)]
+        candidates = [endpoint for endpoint in candidates if endpoint.name not in tried] or candidates
+        if not candidates:
+            return None
+        # The shared count covers other workers; `pending` covers this worker's calls that have not reached a slot yet.
+        loads = {endpoint.name: max(endpoint.in_flight(), endpoint.pending) for endpoint in candidates}
+        # Expected wait is the calls ahead of ours times the server's recent latency; unmeasured servers are tried first.
+        return min(
+            candidates,
+            key=lambda endpoint: ((loads[endpoint.name] + 1) * (endpoint.latency_seconds or 0.0), loads[endpoint.name]),
+        )
+
+    def check_health(self) -> dict[str, object]:
+        models = {task.value: self.model_for(task) for task in LLMTask}
+        endpoints = [
+            {
+                "url": endpoint.base_url,
+                "models": {model: endpoint.check_health(model) for model in dict.fromkeys(models.values())},
+                "in_flight": endpoint.in_flight(),
+            }
+            for endpoint in self.endpoints
+        ]
+        reachable = all(any(endpoint["models"][model] for endpoint in endpoints) for model in models.values())
+        return {"reachable": reachable, "model": models[LLMTask.generation], "models": models, "endpoints": endpoints}
+
+    def generate_json(
+        self,
+        *,
+        task: LLMTask,
+        prompt: str,
+        response_model: type[T],
+        system: str | None = None,
+        call: str | None = None,
+        max_retries: int = 2,
+        cache_ttl_seconds: int | None = None,
+    ) -> T | None:
+        """`system` holds fixed instructions shared by many calls; `call` labels prompt-eval metrics (default: the task)."""
+        request = GenerateRequest(model=self.model_for(task), prompt=prompt, system=system, call=call or task.value)
+        with span("llm.generate_json", response_model=response_model.__name__, task=task.value, model=request.model):
+            result, outcome = self._generate_json(
+                task=task,
+                request=request,
+                response_model=response_model,
+                max_retries=max_retries,
+                cache_ttl_seconds=cache_ttl_seconds,
+            )
+            record_path("llm", outcome)
+            return result
+
+    def _generate_json(
+        self,
+        *,
+        task: LLMTask,
+        request: GenerateRequest,
+        response_model: type[T],
+        max_retries: int,
+        cache_ttl_seconds: int | None,
+    ) -> tuple[T | None, str]:
+        shared = coordination.shared_state
+        cache_key = None
+        if cache_ttl_seconds:
+            cache_key = hashlib.sha256(
+                f"{request.model}\0{response_model.__name__}\0{request.system or ''}\0{request.prompt}".encode()
+            ).hexdigest()
+            cached = shared.get("llm", cache_key)
+            if cached is not None:
+                try:
+                    return response_model.model_validate(cached), "cache_hit"
+                except ValidationError:
+                    pass
+
+        # Retries move to another server when one is available, so one failing machine costs a single attempt.
+        tried: set[str] = set()
+        for attempt in range(1, max_retries + 2):
+            budget = remaining()
+            if budget is not None and budget < settings.llm_min_attempt_seconds:
+                return None, "deadline"
+            annotate(attempts=attempt)
+            endpoint = self._reserve(request.model, tried)
+            if endpoint is None:
+                return None, "breaker_open"
+            tried.add(endpoint.name)
+            annotate(endpoint=endpoint.base_url)
+            started = time.perf_counter()
+            if settings.llm_hedge_enabled:
+                result, outcome, hedged = self._hedged_call(task, endpoint, request, response_model, tried)
+            else:
+                result, outcome = self._call(endpoint, request, response_model, timeout=budget)
+                hedged = False
+            if result is not None:
+                elapsed = time.perf_counter() - started
+                self._windows[task].record(elapsed, hedged=hedged)
+                LLM_CALL_DURATION.observe(elapsed, task=task.value, hedged=str(hedged).lower())
+                if cache_key is not None:
+                    shared.set("llm", cache_key, result.model_dump(mode="json"), cache_ttl_seconds)
+                return result, "ok"
+            if outcome == "saturated" and len(tried) == len(self.endpoints):
+                return None, "saturated"
+        return None, "failed"
+
+    def _reserve(self, model: str, tried: set[str]) -> OllamaClient | None:
+        with self._lock:
+            endpoint = self.pick(model, tried)
+            if endpoint is not None:
+                endpoint.pending += 1
+            return endpoint
+
+    def _call(
+        self,
+        endpoint: OllamaClient,
+        request: GenerateRequest,
+        response_model: type[T],
+        stream: StreamControl | None = None,
+        wait_seconds: float | None = None,
+        timeout: float | None = None,
+    ) -> tuple[T | None, str]:
+        # Releases the reservation taken by `_reserve`.
+        try:
+            return endpoint.generate_once(
+                request, response_model=response_model, stream=stream, wait_seconds=wait_seconds, timeout=timeout
+            )
+        finally:
+            with self._lock:
+                endpoint.pending -= 1
+
+    def _hedged_call(
+        self,
+        task: LLMTask,
+        primary: OllamaClient,
+        request: GenerateRequest,
+        response_model: type[T],
+        tried: set[str],
+    ) -> tuple[T | None, str, bool]:
+        """Run the call on `primary`; past the task's latency percentile, race a duplicate on another server or slot."""
+        window = self._windows[task]
+        delay = window.hedge_delay()
+        controls: dict[Future[tuple[T | None, str]], StreamControl] = {}
+
+        def launch(endpoint: OllamaClient, wait_seconds: float | None) -> Future[tuple[T | None, str]]:
+            control = StreamControl()
+            future = self._hedge_pool.submit(
+                contextvars.copy_context().run, self._call, endpoint, request, response_model, control, wait_seconds, remaining()
+            )
+            controls[future] = control
+            return future
+
+        primary_future = launch(primary, None)
+        hedge_future = None
+        if delay is not None and not wait([primary_future], timeout=delay).done:
+            if not window.try_hedge():
+                LLM_HEDGES.inc(task=task.value, outcome="over_budget")
+            elif (hedge := self._reserve(request.model, tried | {primary.name})) is None:
+                LLM_HEDGES.inc(task=task.value, outcome="no_capacity")
+            else:
+                # The duplicate never queues for a slot: if the chosen server is full the primary simply runs on.
+                hedge_future = launch(hedge, 0)
+                tried.add(hedge.name)
+                LLM_HEDGES.inc(task=task.value, outcome="sent")
+                annotate(hedged=True, hedge_endpoint=hedge.base_url)
+
+        result, outcome, winner = None, "failed", None
+        pending = set(controls)
+        while pending and winner is None:
+            done, pending = wait(pending, timeout=remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                outcome = "deadline"
+                break
+            for future in done:
+                future_result, outcome = future.result()
+                if future_result is not None and winner is None:
+                    result, winner = future_result, future
+        # The loser stops at its next streamed chunk and closes its connection, which also stops Ollama generating.
+        for future, control in controls.items():
+            if future is not winner:
+                control.cancelled.set()
+        if hedge_future is not None and winner is not None:
+            LLM_HEDGES.inc(task=task.value, outcome="won" if winner is hedge_future else "lost")
+            if winner is hedge_future:
+                LLM_HEDGE_SAVED.observe(_projected_saving(controls[primary_future], controls[hedge_future]), task=task.value)
+        return result, "ok" if winner is not None else outcome, hedge_future is not None
+
+
+def _projected_saving(primary: StreamControl, hedge: StreamControl) -> float:
+    """Estimate how much longer the cancelled primary would have run, from its share of the winner's streamed chunks."""
+    elapsed = time.perf_counter() - primary.started
+    timeout = float(settings.ollama_timeout_seconds)
+    projected = elapsed * hedge.chunks / primary.chunks if primary.chunks else timeout
+    return max(0.0, min(projected, timeout) - elapsed)
+
+
+llm_router = LLMRouter()
@@ -1,23 +1,51 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
+from app.api.admin import router as admin_router
 from app.api.quiz import router as quiz_router
-from app.db.session import create_db_and_tables
-from app.llm.ollama import ollama_client
+from app.api.stats import router as stats_router
+from app.api.transfer import router as transfer_router
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.core.tracing import TracingMiddleware
+from app.db.backup import backup_loop
+from app.db.retention import retention_loop
+from app.db.session import create_db_and_tables, get_engine
+from app.llm.router import llm_router
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-    create_db_and_tables()
+    await create_db_and_tables()
+    tasks = [
+        asyncio.create_task(loop(get_engine()))
+        for loop, interval in ((retention_loop, settings.retention_interval_seconds), (backup_loop, settings.backup_interval_seconds))
+        if interval > 0
+    ]
     yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await get_engine().dispose()
 
 
 app = FastAPI(title="Liarn API", lifespan=lifespan)
+app.add_middleware(TracingMiddleware)
 app.include_router(quiz_router, prefix="/api/v1")
+app.include_router(stats_router, prefix="/api/v1")
+app.include_router(transfer_router, prefix="/api/v1")
+app.include_router(admin_router, prefix="/api/v1")
 
 
 @app.get("/health")
 def health() -> dict[str, object]:
-    reachable, model = ollama_client.check_health()
-    return {"status": "ok", "ollama": {"reachable": reachable, "model": model}}
+    return {"status": "ok", "ollama": llm_router.check_health()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
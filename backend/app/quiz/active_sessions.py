@@ -0,0 +1,102 @@
+import time
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from app.core.cache import LRUCache
+from app.db.mastery import ReviewState, prompt_key
+from app.quiz.evaluator import normalize_answer
+from app.schemas.quiz import QuestionType, SubmitAnswerResponse
+
+
+class QuestionRecord:
+    """Grading view of a stored question with the MCQ outcome precomputed."""
+
+    __slots__ = (
+        "acceptable_variants",
+        "correct_answer",
+        "correct_option_index",
+        "difficulty",
+        "expected_answer",
+        "explanation",
+        "grading_rubric",
+        "id",
+        "normalized_options",
+        "options",
+        "prompt",
+        "prompt_key",
+        "session_id",
+        "topic",
+        "type",
+        "why_others_wrong",
+    )
+
+    def __init__(self, row: Mapping[str, Any]) -> None:
+        self.id: str = row["id"]
+        self.session_id: str = row["session_id"]
+        self.type: str = row["type"]
+        self.topic: str = row["topic_tags"][0]
+        self.difficulty: str = row["difficulty"]
+        self.prompt: str = row["prompt"]
+        self.prompt_key = prompt_key(self.prompt)
+        self.options: tuple[str, ...] | None = tuple(row["options"]) if row["options"] is not None else None
+        self.correct_option_index: int | None = row["correct_option_index"]
+        self.expected_answer: str | None = row["expected_answer"]
+        self.acceptable_variants: list[str] | None = row["acceptable_variants"]
+        self.grading_rubric: str | None = row["grading_rubric"]
+        self.explanation: str = row["explanation"]
+
+        self.normalized_options: tuple[str, ...] = ()
+        self.why_others_wrong: tuple[str, ...] = ()
+        self.correct_answer = self.expected_answer or ""
+        if self.type == QuestionType.mcq.value and self.options and self.correct_option_index is not None:
+            self.correct_answer = self.options[self.correct_option_index]
+            self.normalized_options = tuple(normalize_answer(option) for option in self.options)
+            self.why_others_wrong = tuple(
+                f"'{option}' is incorrect because it does not satisfy the prompt constraints."
+                for index, option in enumerate(self.options)
+                if index != self.correct_option_index
+            )
+
+
+class ActiveSession:
+    __slots__ = ("answers", "questions", "reviews", "session_id", "touched_at")
+
+    def __init__(self, session_id: str, questions: Iterable[QuestionRecord]) -> None:
+        self.session_id = session_id
+        self.questions = {question.id: question for question in questions}
+        self.answers: dict[str, SubmitAnswerResponse] = {}
+        # Review schedules for this session's prompts, so answering can reschedule them without a read; the write only
+        # applies if the stored row still matches, so a copy made stale by another session or worker is re-read.
+        self.reviews: dict[str, ReviewState] = {}
+        self.touched_at = time.monotonic()
+
+
+class ActiveSessionCache:
+    """LRU of in-progress sessions; entries idle for longer than `idle_seconds` are dropped on access."""
+
+    def __init__(self, maxsize: int, idle_seconds: float) -> None:
+        self.idle_seconds = idle_seconds
+        self._sessions: LRUCache[str, ActiveSession] = LRUCache(maxsize)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> ActiveSession | None:
+        active = self._sessions.get(session_id)
+        if active is None:
+            return None
+        now = time.monotonic()
+        if now - active.touched_at > self.idle_seconds:
+            self._sessions.pop(session_id)
+            return None
+        active.touched_at = now
+        return active
+
+    def put(self, active: ActiveSession) -> None:
+        self._sessions.put(active.session_id, active)
+
+    def evict(self, session_id: str) -> None:
+        self._sessions.pop(session_id)
+
+    def clear(self) -> None:
+        self._sessions.clear()
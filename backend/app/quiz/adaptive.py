@@ -0,0 +1,71 @@
+from collections.abc import Mapping, Sequence
+
+from app.db.models import QuizQuestion, TopicMastery
+from app.quiz.generator import GeneratedQuestion, _deduplicate_questions
+from app.schemas.quiz import Difficulty, QuestionType, Topic
+
+# A topic counts as mastered once it has enough answers and its recent error rate is this low.
+MASTERED_MIN_ANSWERED = 5
+MASTERED_ERROR_RATE = 0.15
+# Weight given to topics the learner has not answered yet.
+UNSEEN_WEAKNESS = 0.5
+
+
+def review_question_types(question_type: QuestionType) -> list[str]:
+    if question_type == QuestionType.mixed:
+        return [QuestionType.mcq.value, QuestionType.short_answer.value]
+    return [question_type.value]
+
+
+def topic_weakness(mastery: TopicMastery | None) -> float:
+    if mastery is None or mastery.answered == 0:
+        return UNSEEN_WEAKNESS
+    lifetime = (mastery.answered - mastery.correct + 1) / (mastery.answered + 2)
+    return (lifetime + mastery.error_rate) / 2
+
+
+def is_mastered(mastery: TopicMastery | None) -> bool:
+    return mastery is not None and mastery.answered >= MASTERED_MIN_ANSWERED and mastery.error_rate <= MASTERED_ERROR_RATE
+
+
+def plan_topics(topics: Sequence[Topic], mastery: Mapping[str, TopicMastery], count: int) -> list[Topic]:
+    """Split `count` new questions across topics in proportion to weakness, skipping mastered topics when possible.
+
+    Returns one topic per question, interleaved weakest first, so `generate_questions` assigns them one-to-one.
+    """
+    candidates = [topic for topic in topics if not is_mastered(mastery.get(topic.value))] or list(topics)
+    weights = {topic: topic_weakness(mastery.get(topic.value)) for topic in candidates}
+    ranked = sorted(candidates, key=lambda topic: (-weights[topic], candidates.index(topic)))
+    total = sum(weights.values())
+    shares = {topic: count * weights[topic] / total for topic in ranked}
+    quotas = {topic: int(share) for topic, share in shares.items()}
+    for topic in sorted(ranked, key=lambda topic: -(shares[topic] - quotas[topic]))[: count - sum(quotas.values())]:
+        quotas[topic] += 1
+
+    planned: list[Topic] = []
+    while len(planned) < count:
+        for topic in ranked:
+            if quotas[topic]:
+                planned.append(topic)
+                quotas[topic] -= 1
+    return planned
+
+
+def stored_question(question: QuizQuestion) -> GeneratedQuestion:
+    return GeneratedQuestion(
+        type=QuestionType(question.type),
+        topic_tags=[Topic(topic) for topic in question.topic_tags],
+        difficulty=Difficulty(question.difficulty),
+        prompt=question.prompt,
+        options=question.options,
+        correct_option_index=question.correct_option_index,
+        expected_answer=question.expected_answer,
+        acceptable_variants=question.acceptable_variants,
+        grading_rubric=question.grading_rubric,
+        explanation=question.explanation,
+    )
+
+
+def combine_questions(reviewed: list[GeneratedQuestion], fresh: list[GeneratedQuestion]) -> list[GeneratedQuestion]:
+    # Review questions keep their prompts; fresh ones that repeat a review prompt are regenerated or renamed.
+    return _deduplicate_questions([*reviewed, *fresh]) if fresh else reviewed
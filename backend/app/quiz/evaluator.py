@@ -2,7 +2,9 @@ import re
 
 from pydantic import BaseModel
 
-from app.llm.ollama import ollama_client
+from app.core.config import settings
+from app.core.tracing import record_path, span
+from app.llm.router import LLMTask, llm_router
 
 
 class ShortAnswerJudgeResult(BaseModel):
@@ -20,7 +22,7 @@ def _tokenize(value: str) -> set[str]:
     return {token for token in normalize_answer(value).split(" ") if token}
 
 
-def _deterministic_fallback(
+def fallback_verdict(
     *,
     expected_answer: str,
     acceptable_variants: list[str],
@@ -53,6 +55,43 @@ def evaluate_short_answer(
     grading_rubric: str,
     user_answer: str,
 ) -> tuple[bool, str, dict[str, str]]:
+    with span("grading"):
+        is_correct, feedback, trace = _evaluate_short_answer(
+            prompt=prompt,
+            expected_answer=expected_answer,
+            acceptable_variants=acceptable_variants,
+            grading_rubric=grading_rubric,
+            user_answer=user_answer,
+        )
+        record_path("grading", trace["path"])
+        return is_correct, feedback, trace
+
+
+# Sent as the system message so Ollama can reuse its KV cache across judge calls; the answer to judge goes last.
+JUDGE_SYSTEM_PROMPT = (
+    "You are a strict quiz grader. Return JSON only.\n"
+    "Schema: {\"is_correct\": boolean, \"rationale\": \"2-4 concise sentences\"}.\n"
+    "Do not include markdown, code fences, or additional keys.\n"
+    "Judge the user answer using only the rubric in the message.\n"
+)
+
+
+def _build_judge_prompt(
+    *, prompt: str, expected_answer: str, acceptable_variants: list[str], grading_rubric: str, user_answer: str
+) -> str:
+    return (
+        f"Question: {prompt}\n"
+        f"Expected answer: {expected_answer}\n"
+        f"Acceptable variants: {acceptable_variants}\n"
+        f"Rubric: {grading_rubric}\n"
+        f"User answer: {user_answer}\n"
+    )
+
+
+def local_verdict(
+    *, expected_answer: str, acceptable_variants: list[str], user_answer: str
+) -> tuple[bool, str, dict[str, str]] | None:
+    """The grading tiers that need no model call; None means the answer has to go to the judge."""
     normalized_user = normalize_answer(user_answer)
     normalized_expected = normalize_answer(expected_answer)
     normalized_variants = {normalize_answer(variant) for variant in acceptable_variants if normalize_answer(variant)}
@@ -64,25 +103,57 @@ def evaluate_short_answer(
 
     if normalized_user == normalized_expected or normalized_user in normalized_variants:
         return True, "Matched expected answer or acceptable variant.", {"path": "exact_or_variant_match"}
+    return None
 
-    prompt_text = (
-        "You are a strict quiz grader. Return JSON only.\n"
-        "Schema: {\"is_correct\": boolean, \"rationale\": \"2-4 concise sentences\"}.\n"
-        "Do not include markdown, code fences, or additional keys.\n"
-        "Judge the user answer using only the rubric below.\n"
-        f"Question: {prompt}\n"
-        f"Expected answer: {expected_answer}\n"
-        f"Acceptable variants: {acceptable_variants}\n"
-        f"Rubric: {grading_rubric}\n"
-        f"User answer: {user_answer}\n"
+
+def llm_verdict(
+    *,
+    prompt: str,
+    expected_answer: str,
+    acceptable_variants: list[str],
+    grading_rubric: str,
+    user_answer: str,
+) -> tuple[bool, str, dict[str, str]] | None:
+    """The LLM judge's verdict; None when the judge is unavailable or returns no usable answer."""
+    prompt_text = _build_judge_prompt(
+        prompt=prompt,
+        expected_answer=expected_answer,
+        acceptable_variants=acceptable_variants,
+        grading_rubric=grading_rubric,
+        user_answer=user_answer,
+    )
+    judged = llm_router.generate_json(
+        task=LLMTask.grading,
+        system=JUDGE_SYSTEM_PROMPT,
+        prompt=prompt_text,
+        response_model=ShortAnswerJudgeResult,
+        max_retries=2,
+        cache_ttl_seconds=settings.llm_verdict_cache_ttl_seconds,
     )
-    judged = ollama_client.generate_json(prompt=prompt_text, response_model=ShortAnswerJudgeResult, max_retries=2)
     if judged and judged.rationale.strip():
         trace = {"path": "llm_judge", "rationale": judged.rationale}
         return judged.is_correct, judged.rationale, trace
+    return None
 
-    return _deterministic_fallback(
+
+def _evaluate_short_answer(
+    *,
+    prompt: str,
+    expected_answer: str,
+    acceptable_variants: list[str],
+    grading_rubric: str,
+    user_answer: str,
+) -> tuple[bool, str, dict[str, str]]:
+    local = local_verdict(expected_answer=expected_answer, acceptable_variants=acceptable_variants, user_answer=user_answer)
+    if local is not None:
+        return local
+    judged = llm_verdict(
+        prompt=prompt,
         expected_answer=expected_answer,
         acceptable_variants=acceptable_variants,
+        grading_rubric=grading_rubric,
         user_answer=user_answer,
     )
+    if judged is not None:
+        return judged
+    return fallback_verdict(expected_answer=expected_answer, acceptable_variants=acceptable_variants, user_answer=user_answer)
@@ -3,7 +3,10 @@ from dataclasses import dataclass
 
 from pydantic import BaseModel, Field
 
-from app.llm.ollama import ollama_client
+from app.core.config import settings
+from app.core.deadline import expired
+from app.core.tracing import annotate, record_path, span
+from app.llm.router import LLMTask, llm_router
 from app.schemas.quiz import Difficulty, QuestionType, Topic
 
 
@@ -194,6 +197,26 @@ def _is_valid_generated_question(question: LLMGeneratedQuestion) -> bool:
     return bool(question.expected_answer and question.acceptable_variants is not None and question.grading_rubric)
 
 
+# Fixed instructions for every generation call, sent as the system message so Ollama can reuse their KV cache;
+# the per-call request goes last in the user message.
+GENERATION_SYSTEM_PROMPT = (
+    "You write quiz questions as strict JSON only.\n"
+    "Output schema: {\"questions\": [{"
+    "\"type\": \"mcq|short-answer\", "
+    f"\"topic_tags\": [\"{'|'.join(topic.value for topic in Topic)}\"], "
+    "\"difficulty\": \"easy|medium|hard\", "
+    "\"prompt\": \"string\", "
+    "\"options\": [\"a\",\"b\",\"c\",\"d\"] or null, "
+    "\"correct_option_index\": 0..3 or null, "
+    "\"expected_answer\": \"string\" or null, "
+    "\"acceptable_variants\": [\"string\"] or null, "
+    "\"grading_rubric\": \"string\" or null, "
+    "\"explanation\": \"2-6 sentence explanation\""
+    "}]}.\n"
+    "Rules: concise, unambiguous, non-opinionated, no long copyrighted text, exactly 4 MCQ options, one correct option.\n"
+)
+
+
 def _build_llm_prompt(
     *,
     topics: list[Topic],
@@ -202,20 +225,7 @@ def _build_llm_prompt(
     num_questions: int,
 ) -> str:
     return (
-        "Generate quiz questions as strict JSON only.\n"
-        "Output schema: {\"questions\": [{"
-        "\"type\": \"mcq|short-answer\", "
-        "\"topic_tags\": [\"Machine Learning technical concepts|Deep Learning technical concepts|Statistics|Generative AI|MLOps technical concepts|Agentic AI technical concepts|API technical concepts|LLM and Foundational Model concepts\"], "
-        "\"difficulty\": \"easy|medium|hard\", "
-        "\"prompt\": \"string\", "
-        "\"options\": [\"a\",\"b\",\"c\",\"d\"] or null, "
-        "\"correct_option_index\": 0..3 or null, "
-        "\"expected_answer\": \"string\" or null, "
-        "\"acceptable_variants\": [\"string\"] or null, "
-        "\"grading_rubric\": \"string\" or null, "
-        "\"explanation\": \"2-6 sentence explanation\""
-        "}]}.\n"
-        "Rules: concise, unambiguous, non-opinionated, no long copyrighted text, exactly 4 MCQ options, one correct option.\n"
+        "Generate quiz questions.\n"
         f"Requested topics: {[topic.value for topic in topics]}.\n"
         f"Difficulty: {difficulty.value}.\n"
         f"Question type: {question_type.value}.\n"
@@ -242,32 +252,30 @@ def _with_prompt(question: GeneratedQuestion, prompt: str) -> GeneratedQuestion:
     )
 
 
+def _build_regeneration_prompt(*, original: GeneratedQuestion, used_prompts: set[str]) -> str:
+    return (
+        "Generate exactly one quiz question.\n"
+        f"Required type: {original.type.value}\n"
+        f"Required difficulty: {original.difficulty.value}\n"
+        f"Required topic tag: {original.topic_tags[0].value}\n"
+        f"Avoid prompts matching any of these normalized prompts: {sorted(used_prompts)}\n"
+    )
+
+
 def _regenerate_duplicate_question(
     *,
     original: GeneratedQuestion,
     used_prompts: set[str],
 ) -> GeneratedQuestion | None:
-    allowed_topics = "|".join(topic.value for topic in Topic)
-    prompt = (
-        "Generate exactly one quiz question as strict JSON only.\n"
-        "Output schema: {\"questions\": [{"
-        "\"type\": \"mcq|short-answer\", "
-        f"\"topic_tags\": [\"{allowed_topics}\"], "
-        "\"difficulty\": \"easy|medium|hard\", "
-        "\"prompt\": \"string\", "
-        "\"options\": [\"a\",\"b\",\"c\",\"d\"] or null, "
-        "\"correct_option_index\": 0..3 or null, "
-        "\"expected_answer\": \"string\" or null, "
-        "\"acceptable_variants\": [\"string\"] or null, "
-        "\"grading_rubric\": \"string\" or null, "
-        "\"explanation\": \"2-6 sentence explanation\""
-        "}]}.\n"
-        f"Required type: {original.type.value}\n"
-        f"Required difficulty: {original.difficulty.value}\n"
-        f"Required topic tag: {original.topic_tags[0].value}\n"
-        f"Avoid prompts matching any of these normalized prompts: {sorted(used_prompts)}\n"
+    prompt = _build_regeneration_prompt(original=original, used_prompts=used_prompts)
+    response = llm_router.generate_json(
+        task=LLMTask.generation,
+        call="regeneration",
+        system=GENERATION_SYSTEM_PROMPT,
+        prompt=prompt,
+        response_model=LLMGeneratedQuestions,
+        max_retries=2,
     )
-    response = ollama_client.generate_json(prompt=prompt, response_model=LLMGeneratedQuestions, max_retries=2)
     if not response or len(response.questions) != 1:
         return None
 
@@ -296,18 +304,26 @@ def _regenerate_duplicate_question(
 
 
 def _deduplicate_questions(questions: list[GeneratedQuestion]) -> list[GeneratedQuestion]:
+    with span("generation.deduplicate"):
+        return _deduplicate_question_prompts(questions)
+
+
+def _deduplicate_question_prompts(questions: list[GeneratedQuestion]) -> list[GeneratedQuestion]:
     deduplicated: list[GeneratedQuestion] = []
     used_prompts: set[str] = set()
+    regenerations = 0
 
     for question in questions:
         candidate = question
         attempts = 0
-        while _normalize_prompt(candidate.prompt) in used_prompts and attempts < 3:
+        # Out of budget, duplicates go straight to variation numbering instead of another LLM round trip.
+        while _normalize_prompt(candidate.prompt) in used_prompts and attempts < 3 and not expired(settings.llm_min_attempt_seconds):
             regenerated = _regenerate_duplicate_question(original=candidate, used_prompts=used_prompts)
             if regenerated is None:
                 break
             candidate = regenerated
             attempts += 1
+            regenerations += 1
 
         normalized_candidate_prompt = _normalize_prompt(candidate.prompt)
         if normalized_candidate_prompt in used_prompts:
@@ -320,6 +336,7 @@ def _deduplicate_questions(questions: list[GeneratedQuestion]) -> list[Generated
         deduplicated.append(candidate)
         used_prompts.add(normalized_candidate_prompt)
 
+    annotate(regenerations=regenerations)
     return deduplicated
 
 
@@ -357,6 +374,19 @@ def generate_questions(
     difficulty: Difficulty,
     question_type: QuestionType,
     num_questions: int,
+) -> list[GeneratedQuestion]:
+    with span("generation", num_questions=num_questions):
+        return _generate_questions(
+            topics=topics, difficulty=difficulty, question_type=question_type, num_questions=num_questions
+        )
+
+
+def _generate_questions(
+    *,
+    topics: list[Topic],
+    difficulty: Difficulty,
+    question_type: QuestionType,
+    num_questions: int,
 ) -> list[GeneratedQuestion]:
     prompt = _build_llm_prompt(
         topics=topics,
@@ -364,8 +394,15 @@ def generate_questions(
         question_type=question_type,
         num_questions=num_questions,
     )
-    llm_response = ollama_client.generate_json(prompt=prompt, response_model=LLMGeneratedQuestions, max_retries=2)
+    llm_response = llm_router.generate_json(
+        task=LLMTask.generation,
+        system=GENERATION_SYSTEM_PROMPT,
+        prompt=prompt,
+        response_model=LLMGeneratedQuestions,
+        max_retries=2,
+    )
     if not llm_response or len(llm_response.questions) != num_questions:
+        record_path("generation", "fallback_deadline" if expired(settings.llm_min_attempt_seconds) else "fallback_no_response")
         return _deduplicate_questions(
             _fallback_questions(
                 topics=topics,
@@ -378,6 +415,7 @@ def generate_questions(
     generated: list[GeneratedQuestion] = []
     for question in llm_response.questions:
         if not _is_valid_generated_question(question):
+            record_path("generation", "fallback_invalid_question")
             return _deduplicate_questions(
                 _fallback_questions(
                     topics=topics,
@@ -401,4 +439,5 @@ def generate_questions(
             )
         )
 
+    record_path("generation", "llm")
     return _deduplicate_questions(generated)
@@ -0,0 +1,339 @@
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import UTC, date, datetime
+from typing import Any
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.db.dialects import dialect_insert
+from app.db.mastery import shift_topic_mastery
+from app.db.models import QuizAnswer, QuizQuestion, RegradeCheckpoint
+from app.db.scores import add_answer_rollup, rebuild_session_scores
+from app.db.session import (
+    get_engine,
+    open_session,
+    prepare_async_database,
+    run_with_busy_retry,
+)
+from app.quiz.evaluator import (
+    fallback_verdict,
+    llm_verdict,
+    local_verdict,
+    normalize_answer,
+)
+from app.schemas.quiz import QuestionType
+
+logger = logging.getLogger(__name__)
+
+Verdict = tuple[bool, str, dict[str, str]]
+
+
+class JudgeUnavailableError(RuntimeError):
+    """The LLM judge gave no verdict; the job stops at its checkpoint so a later run re-grades from there."""
+
+
+@dataclass(frozen=True)
+class RegradeItem:
+    answer_id: str
+    session_id: str
+    user_answer: str
+    is_correct: bool
+    previous_path: str | None
+    answered_on: date
+    topic: str
+    difficulty: str
+    prompt: str
+    expected_answer: str
+    acceptable_variants: list[str]
+    grading_rubric: str
+
+
+@dataclass
+class RegradeResult:
+    job: str
+    processed: int
+    changed: int
+    resumed: bool
+    finished: bool
+
+
+def _load_batch(db: Session, after: str | None, limit: int) -> list[RegradeItem]:
+    # Keyset paging on the answer primary key keeps each read bounded and gives a stable resume point.
+    statement = (
+        select(
+            QuizAnswer.id,
+            QuizAnswer.session_id,
+            QuizAnswer.user_answer,
+            QuizAnswer.is_correct,
+            QuizAnswer.judge_trace,
+            QuizAnswer.created_at,
+            QuizQuestion.topic_tags,
+            QuizQuestion.difficulty,
+            QuizQuestion.prompt,
+            QuizQuestion.expected_answer,
+            QuizQuestion.acceptable_variants,
+            QuizQuestion.grading_rubric,
+        )
+        .join(QuizQuestion, QuizQuestion.id == QuizAnswer.question_id)
+        .where(QuizQuestion.type == QuestionType.short_answer.value)
+        .order_by(QuizAnswer.id)
+        .limit(limit)
+    )
+    if after is not None:
+        statement = statement.where(QuizAnswer.id > after)
+    items: list[RegradeItem] = []
+    for (
+        answer_id,
+        session_id,
+        user_answer,
+        is_correct,
+        judge_trace,
+        created_at,
+        topic_tags,
+        difficulty,
+        prompt,
+        expected,
+        variants,
+        rubric,
+    ) in db.exec(statement).all():
+        items.append(
+            RegradeItem(
+                answer_id=answer_id,
+                session_id=session_id,
+                user_answer=user_answer or "",
+                is_correct=is_correct,
+                previous_path=judge_trace.get("path") if isinstance(judge_trace, dict) else None,
+                answered_on=created_at.replace(tzinfo=created_at.tzinfo or UTC).astimezone(UTC).date(),
+                topic=topic_tags[0],
+                difficulty=difficulty,
+                prompt=prompt,
+                expected_answer=expected or "",
+                acceptable_variants=variants or [],
+                grading_rubric=rubric or "",
+            )
+        )
+    return items
+
+
+def _grade_locally(items: list[RegradeItem], use_llm: bool) -> list[Verdict | None]:
+    """Runs in the process pool; None marks answers that still need the LLM judge."""
+    verdicts: list[Verdict | None] = []
+    for item in items:
+        verdict = local_verdict(
+            expected_answer=item.expected_answer, acceptable_variants=item.acceptable_variants, user_answer=item.user_answer
+        )
+        if verdict is None and not use_llm:
+            verdict = fallback_verdict(
+                expected_answer=item.expected_answer, acceptable_variants=item.acceptable_variants, user_answer=item.user_answer
+            )
+        verdicts.append(verdict)
+    return verdicts
+
+
+async def _grade_batch(
+    items: list[RegradeItem], *, pool: ProcessPoolExecutor | None, workers: int, use_llm: bool, llm_concurrency: int
+) -> list[Verdict | None]:
+    """Verdicts in item order; None where the judge was unavailable, so the stored verdict must be kept."""
+    if pool is None:
+        verdicts = await asyncio.to_thread(_grade_locally, items, use_llm)
+    else:
+        loop = asyncio.get_running_loop()
+        size = -(-len(items) // workers)
+        parts = await asyncio.gather(
+            *(loop.run_in_executor(pool, _grade_locally, items[start : start + size], use_llm) for start in range(0, len(items), size))
+        )
+        verdicts = [verdict for part in parts for verdict in part]
+
+    # Judge calls are I/O bound and go through the router's slots and breaker, so threads are enough here.
+    semaphore = asyncio.Semaphore(llm_concurrency)
+
+    async def judge(index: int) -> None:
+        item = items[index]
+        async with semaphore:
+            verdicts[index] = await asyncio.to_thread(
+                llm_verdict,
+                prompt=item.prompt,
+                expected_answer=item.expected_answer,
+                acceptable_variants=item.acceptable_variants,
+                grading_rubric=item.grading_rubric,
+                user_answer=item.user_answer,
+            )
+
+    await asyncio.gather(*(judge(index) for index, verdict in enumerate(verdicts) if verdict is None))
+    return verdicts
+
+
+def _store_batch(db: Session, job: str, items: list[RegradeItem], verdicts: list[Verdict], regraded_at: datetime) -> int:
+    rows: list[dict[str, Any]] = []
+    flipped_sessions: set[str] = set()
+    rollup_deltas: dict[tuple[str, str, date], int] = defaultdict(int)
+    mastery_deltas: dict[tuple[str, str], int] = defaultdict(int)
+    changed = 0
+    for item, (is_correct, feedback, trace) in zip(items, verdicts):
+        provenance = {"job": job, "at": regraded_at.isoformat(), "previous_correct": item.is_correct, "previous_path": item.previous_path}
+        rows.append(
+            {
+                "id": item.answer_id,
+                "is_correct": is_correct,
+                "feedback": feedback,
+                "normalized_user_answer": normalize_answer(item.user_answer),
+                "judge_trace": {**trace, "regrade": provenance},
+            }
+        )
+        if is_correct != item.is_correct:
+            changed += 1
+            flipped_sessions.add(item.session_id)
+            rollup_deltas[(item.topic, item.difficulty, item.answered_on)] += 1 if is_correct else -1
+            mastery_deltas[(item.topic, item.difficulty)] += 1 if is_correct else -1
+    db.exec(update(QuizAnswer), params=rows)
+    if flipped_sessions:
+        rebuild_session_scores(db.connection(), sorted(flipped_sessions))
+    # Daily tallies and mastery also cover archived sessions, so flipped verdicts shift them instead of a rebuild
+    # from the hot tables.
+    for (topic, difficulty, answered_on), delta in rollup_deltas.items():
+        if delta:
+            add_answer_rollup(
+                db,
+                topic=topic,
+                difficulty=difficulty,
+                question_type=QuestionType.short_answer.value,
+                answered_on=answered_on,
+                answered=0,
+                correct=delta,
+            )
+    for (topic, difficulty), delta in mastery_deltas.items():
+        if delta:
+            shift_topic_mastery(db, topic=topic, difficulty=difficulty, correct=delta)
+    # Advancing the checkpoint in the same transaction as the verdicts makes a resumed run pick up exactly here.
+    db.exec(
+        update(RegradeCheckpoint)
+        .where(RegradeCheckpoint.job == job)
+        .values(
+            last_answer_id=items[-1].answer_id,
+            processed=RegradeCheckpoint.processed + len(items),
+            changed=RegradeCheckpoint.changed + changed,
+            updated_at=regraded_at,
+        )
+    )
+    return changed
+
+
+def _open_checkpoint(db: Session, job: str, restart: bool, now: datetime) -> tuple[str | None, int, int, bool, bool]:
+    """Returns (last_answer_id, processed, changed, finished, resumed) for the job, creating or resetting it as asked."""
+    existing = db.exec(
+        select(
+            RegradeCheckpoint.last_answer_id, RegradeCheckpoint.processed, RegradeCheckpoint.changed, RegradeCheckpoint.finished_at
+        ).where(RegradeCheckpoint.job == job)
+    ).first()
+    if existing is not None and not restart:
+        last_answer_id, processed, changed, finished_at = existing
+        return last_answer_id, processed, changed, finished_at is not None, True
+    fresh = {"last_answer_id": None, "processed": 0, "changed": 0, "started_at": now, "updated_at": now, "finished_at": None}
+    db.exec(dialect_insert(db, RegradeCheckpoint).values(job=job, **fresh).on_conflict_do_update(index_elements=["job"], set_=fresh))
+    return None, 0, 0, False, False
+
+
+def _finish(db: Session, job: str, now: datetime) -> None:
+    db.exec(update(RegradeCheckpoint).where(RegradeCheckpoint.job == job).values(finished_at=now, updated_at=now))
+
+
+async def run_regrade(
+    target_engine: AsyncEngine,
+    *,
+    job: str = "default",
+    restart: bool = False,
+    use_llm: bool = True,
+    workers: int | None = None,
+    batch_size: int | None = None,
+    llm_concurrency: int | None = None,
+) -> RegradeResult:
+    """Re-grade every stored short answer with the current grading code, resuming `job` from its checkpoint."""
+    # One worker would only add pickling on top of inline grading, e.g. on a single-core host.
+    workers = min(settings.regrade_workers if workers is None else workers, os.cpu_count() or 1)
+    batch_size = batch_size or settings.regrade_batch_size
+    llm_concurrency = llm_concurrency or settings.regrade_llm_concurrency
+
+    async with open_session(target_engine) as db:
+        last_answer_id, processed, changed, finished, resumed = await run_with_busy_retry(
+            db, lambda tx: _open_checkpoint(tx, job, restart, datetime.now(UTC))
+        )
+        if finished:
+            return RegradeResult(job=job, processed=processed, changed=changed, resumed=resumed, finished=True)
+
+        # Spawned workers do not inherit the event loop, database connections or HTTP clients of this process.
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) if workers > 1 else None
+        try:
+            while items := await run_with_busy_retry(db, lambda tx, after=last_answer_id: _load_batch(tx, after, batch_size)):
+                graded = await _grade_batch(items, pool=pool, workers=workers, use_llm=use_llm, llm_concurrency=llm_concurrency)
+                # A fallback verdict would overwrite the judge's and the checkpoint would never come back to it, so the
+                # batch is only stored up to the first answer the judge could not grade.
+                unjudged = next((index for index, verdict in enumerate(graded) if verdict is None), len(items))
+                items, verdicts = items[:unjudged], [verdict for verdict in graded[:unjudged] if verdict is not None]
+                if items:
+                    regraded_at = datetime.now(UTC)
+                    changed += await run_with_busy_retry(
+                        db, lambda tx, items=items, verdicts=verdicts, at=regraded_at: _store_batch(tx, job, items, verdicts, at)
+                    )
+                    processed += len(items)
+                    last_answer_id = items[-1].answer_id
+                logger.info("Re-grade %s: %d answers processed, %d verdicts changed", job, processed, changed)
+                if unjudged < len(graded):
+                    raise JudgeUnavailableError(
+                        f"Re-grade {job} stopped after {processed} answers: the judge is unavailable; run it again to resume"
+                    )
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        await run_with_busy_retry(db, lambda tx: _finish(tx, job, datetime.now(UTC)))
+    return RegradeResult(job=job, processed=processed, changed=changed, resumed=resumed, finished=True)
+
+
+async def _run(args: argparse.Namespace) -> RegradeResult:
+    target_engine = get_engine()
+    try:
+        await prepare_async_database(target_engine)
+        return await run_regrade(
+            target_engine,
+            job=args.job,
+            restart=args.restart,
+            use_llm=not args.no_llm,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            llm_concurrency=args.llm_concurrency,
+        )
+    finally:
+        await target_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-grade stored short answers with the current grading code and model.")
+    parser.add_argument("--job", default="default", help="Checkpoint name; running the same job again resumes it.")
+    parser.add_argument("--restart", action="store_true", help="Discard the job's checkpoint and start from the first answer.")
+    parser.add_argument("--no-llm", action="store_true", help="Grade with the deterministic fallback instead of the LLM judge.")
+    parser.add_argument(
+        "--workers", type=int, default=settings.regrade_workers, help="Local grading processes, capped at the CPU count; 0 or 1 grades inline."
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.regrade_batch_size)
+    parser.add_argument("--llm-concurrency", type=int, default=settings.regrade_llm_concurrency)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        result = asyncio.run(_run(args))
+    except JudgeUnavailableError as exc:
+        parser.exit(1, f"{exc}\n")
+    print(json.dumps(asdict(result)))
+
+
+if __name__ == "__main__":
+    main()
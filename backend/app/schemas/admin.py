@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class StorageReport(BaseModel):
+    database_bytes: int
+    free_bytes: int
+    page_size: int
+    page_count: int
+    freelist_count: int
+    incremental_auto_vacuum: bool
+
+
+class RetentionReport(BaseModel):
+    sessions_archived: int
+    answers_trimmed: int
+    reclaimed_bytes: int
+    storage: StorageReport | None = None
+
+
+class BackupFile(BaseModel):
+    name: str
+    size_bytes: int
+    compressed: bool
+    created_at: datetime
+
+
+class BackupVerificationReport(BaseModel):
+    ok: bool
+    integrity: str
+    schema_version: int | None = None
+    sessions: int | None = None
+    answers: int | None = None
+
+
+class BackupReport(BaseModel):
+    backup: BackupFile
+    page_count: int
+    duration_ms: float
+    restarts: int
+    verification: BackupVerificationReport | None = None
+    removed: list[str]
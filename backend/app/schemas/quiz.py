@@ -1,6 +1,7 @@
 from enum import Enum
+from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class Topic(str, Enum):
@@ -26,11 +27,24 @@ class QuestionType(str, Enum):
     mixed = "mixed"
 
 
+class SessionMode(str, Enum):
+    standard = "standard"
+    adaptive = "adaptive"
+
+
 class CreateQuizSessionRequest(BaseModel):
-    topics: list[Topic] = Field(min_length=1)
+    # Adaptive sessions may leave topics empty to draw from every topic.
+    topics: list[Topic] = Field(default_factory=list)
     difficulty: Difficulty
     question_type: QuestionType
     num_questions: int = Field(ge=1, le=15)
+    mode: SessionMode = SessionMode.standard
+
+    @model_validator(mode="after")
+    def _require_topics_for_standard_sessions(self) -> "CreateQuizSessionRequest":
+        if not self.topics and self.mode == SessionMode.standard:
+            raise ValueError("topics must contain at least one topic unless mode is adaptive")
+        return self
 
 
 class QuizQuestionPublic(BaseModel):
@@ -48,6 +62,7 @@ class CreateQuizSessionResponse(BaseModel):
     created_at: str
     config: CreateQuizSessionRequest
     questions: list[QuizQuestionPublic]
+    reviewed_questions: int = 0
 
 
 class SubmitAnswerRequest(BaseModel):
@@ -63,6 +78,38 @@ class SubmitAnswerResponse(BaseModel):
     normalized_user_answer: str
 
 
+class ChannelAnswerMessage(SubmitAnswerRequest):
+    """An answer sent over the session WebSocket; its result comes back tagged with `question_id`."""
+
+    type: Literal["answer"]
+    question_id: str
+
+
+class ChannelSessionEvent(BaseModel):
+    type: Literal["session"] = "session"
+    session_id: str
+    total: int
+    answered: int
+
+
+class ChannelQuestionEvent(BaseModel):
+    type: Literal["question"] = "question"
+    question: QuizQuestionPublic
+
+
+class ChannelResultEvent(BaseModel):
+    type: Literal["result"] = "result"
+    question_id: str
+    result: SubmitAnswerResponse
+
+
+class ChannelErrorEvent(BaseModel):
+    type: Literal["error"] = "error"
+    question_id: str | None = None
+    status: int
+    detail: str
+
+
 class TopicScore(BaseModel):
     topic: Topic
     correct: int
@@ -82,6 +129,11 @@ class SessionSummaryResponse(BaseModel):
     completed_at: str | None
 
 
+class ChannelCompletedEvent(BaseModel):
+    type: Literal["completed"] = "completed"
+    summary: SessionSummaryResponse
+
+
 class SessionListItem(BaseModel):
     session_id: str
     created_at: str
@@ -94,3 +146,4 @@ class SessionListResponse(BaseModel):
     limit: int
     offset: int
     items: list[SessionListItem]
+    next_cursor: str | None = None
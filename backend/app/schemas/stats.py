@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+
+from app.schemas.quiz import Topic
+
+
+class AccuracyStats(BaseModel):
+    answered: int
+    correct: int
+    accuracy: float | None
+
+
+class TopicStats(AccuracyStats):
+    topic: Topic
+
+
+class DailyStats(AccuracyStats):
+    day: str
+
+
+class StatsResponse(BaseModel):
+    days: int
+    since: str
+    totals: AccuracyStats
+    by_topic: list[TopicStats]
+    daily: list[DailyStats]
+    weak_topics: list[Topic]
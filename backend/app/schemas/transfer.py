@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class ImportReport(BaseModel):
+    sessions: int
+    questions: int
+    answers: int
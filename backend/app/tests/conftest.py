@@ -0,0 +1,20 @@
+import pytest
+
+from app.core.coordination import SharedState
+from app.db.session import build_async_engine, prepare_async_database
+
+
+@pytest.fixture(autouse=True)
+def shared_state(tmp_path, monkeypatch):
+    # Each test gets its own cross-worker store so breaker and cache state never leak between tests.
+    state = SharedState(str(tmp_path / "lairn.coord"))
+    monkeypatch.setattr("app.core.coordination.shared_state", state)
+    return state
+
+
+@pytest.fixture
+async def db_engine(tmp_path):
+    engine = build_async_engine(f"sqlite:///{tmp_path / 'lairn.db'}")
+    await prepare_async_database(engine)
+    yield engine
+    await engine.dispose()
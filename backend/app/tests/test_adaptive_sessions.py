@@ -0,0 +1,178 @@
+from datetime import UTC, datetime
+
+from sqlmodel import select
+
+from app.api.quiz import create_quiz_session, submit_answer
+from app.db.mastery import (
+    MAX_INTERVAL_DAYS,
+    next_review,
+    prompt_key,
+    rebuild_mastery,
+    review_state,
+)
+from app.db.models import QuestionReview, QuizQuestion, TopicMastery
+from app.db.session import open_session
+from app.quiz.adaptive import plan_topics
+from app.quiz.generator import generate_questions
+from app.schemas.quiz import (
+    CreateQuizSessionRequest,
+    Difficulty,
+    QuestionType,
+    SessionMode,
+    SubmitAnswerRequest,
+    Topic,
+)
+
+
+def _mastery(topic: Topic, answered: int, correct: int, error_rate: float) -> TopicMastery:
+    return TopicMastery(
+        topic=topic.value,
+        difficulty="easy",
+        answered=answered,
+        correct=correct,
+        error_rate=error_rate,
+        last_answered_at=datetime(2026, 1, 1, tzinfo=UTC),
+    )
+
+
+def test_plan_topics_favours_weak_topics_and_skips_mastered_ones():
+    mastery = {
+        Topic.statistics.value: _mastery(Topic.statistics, 10, 3, 0.8),
+        Topic.mlops.value: _mastery(Topic.mlops, 10, 10, 0.0),
+    }
+
+    planned = plan_topics([Topic.statistics, Topic.mlops, Topic.generative_ai], mastery, 5)
+
+    assert Topic.mlops not in planned
+    assert planned.count(Topic.statistics) > planned.count(Topic.generative_ai) >= 1
+    assert len(planned) == 5
+    assert plan_topics([Topic.mlops], mastery, 2) == [Topic.mlops, Topic.mlops]
+
+
+async def _answer_all(db, created, correct_prompts: set[str] = frozenset()) -> None:
+    for public in created.questions:
+        question = await db.get(QuizQuestion, public.id)
+        chosen = question.correct_option_index if question.prompt in correct_prompts else (question.correct_option_index + 1) % 4
+        await submit_answer(created.session_id, public.id, SubmitAnswerRequest(option_index=chosen), db)
+
+
+async def test_adaptive_sessions_serve_missed_questions_before_generating(monkeypatch, db_engine):
+    generate_calls: list[dict] = []
+
+    def counting_generate_questions(**kwargs):
+        generate_calls.append(kwargs)
+        return generate_questions(**kwargs)
+
+    monkeypatch.setattr("app.api.quiz.generate_questions", counting_generate_questions)
+    standard = CreateQuizSessionRequest(
+        topics=[Topic.statistics, Topic.mlops], difficulty=Difficulty.easy, question_type=QuestionType.mcq, num_questions=2
+    )
+    async with open_session(db_engine) as db:
+        first = await create_quiz_session(standard, db)
+        statistics_prompt = first.questions[0].prompt
+        await _answer_all(db, first, correct_prompts={first.questions[1].prompt})
+
+        generate_calls.clear()
+        adaptive = await create_quiz_session(
+            CreateQuizSessionRequest(
+                difficulty=Difficulty.easy, question_type=QuestionType.mcq, num_questions=3, mode=SessionMode.adaptive
+            ),
+            db,
+        )
+
+        assert adaptive.reviewed_questions == 1
+        assert adaptive.questions[0].prompt == statistics_prompt
+        assert [call["num_questions"] for call in generate_calls] == [2]
+        assert Topic.statistics in generate_calls[0]["topics"]
+
+        # Answering the review correctly pushes it out of the due queue.
+        await _answer_all(db, adaptive, correct_prompts={question.prompt for question in adaptive.questions})
+        review = (await db.exec(select(QuestionReview).where(QuestionReview.prompt_key == prompt_key(statistics_prompt)))).one()
+        assert (review.lapses, review.last_correct) == (1, True) and review.repetitions >= 1
+        assert review_state(review).due_at > datetime.now(UTC)
+
+
+async def test_fully_due_adaptive_session_skips_generation(monkeypatch, db_engine):
+    async with open_session(db_engine) as db:
+        first = await create_quiz_session(
+            CreateQuizSessionRequest(
+                topics=[Topic.statistics, Topic.mlops], difficulty=Difficulty.hard, question_type=QuestionType.mcq, num_questions=2
+            ),
+            db,
+        )
+        await _answer_all(db, first)
+
+        monkeypatch.setattr("app.api.quiz.generate_questions", lambda **_: (_ for _ in ()).throw(AssertionError("generated")))
+        adaptive = await create_quiz_session(
+            CreateQuizSessionRequest(
+                topics=[Topic.statistics, Topic.mlops],
+                difficulty=Difficulty.hard,
+                question_type=QuestionType.mixed,
+                num_questions=2,
+                mode=SessionMode.adaptive,
+            ),
+            db,
+        )
+
+    assert adaptive.reviewed_questions == 2
+    assert {question.prompt for question in adaptive.questions} == {question.prompt for question in first.questions}
+
+
+async def test_rebuild_replays_history_into_the_same_review_state(db_engine):
+    async with open_session(db_engine) as db:
+        payload = CreateQuizSessionRequest(
+            topics=[Topic.deep_learning, Topic.generative_ai], difficulty=Difficulty.medium, question_type=QuestionType.mcq, num_questions=2
+        )
+        for correct in (set(), None):
+            created = await create_quiz_session(payload, db)
+            await _answer_all(db, created, correct_prompts={question.prompt for question in created.questions} if correct is None else correct)
+
+        def snapshot(rows):
+            return sorted((row.model_dump() for row in rows), key=lambda row: sorted(row.items()).__repr__())
+
+        incremental = (snapshot((await db.exec(select(QuestionReview))).all()), snapshot((await db.exec(select(TopicMastery))).all()))
+        await db.run_sync(lambda tx: rebuild_mastery(tx.connection()))
+        await db.commit()
+        rebuilt = (snapshot((await db.exec(select(QuestionReview))).all()), snapshot((await db.exec(select(TopicMastery))).all()))
+
+    assert rebuilt == incremental
+    assert {row["repetitions"] for row in rebuilt[0]} == {1}
+
+
+async def test_sessions_sharing_a_prompt_both_advance_its_review(monkeypatch, db_engine):
+    shared: list = []
+
+    def repeating_generate_questions(**kwargs):
+        # Fallback prompts repeat across sessions, so two open sessions can hold the same question.
+        if not shared:
+            shared.extend(generate_questions(**kwargs))
+        return shared
+
+    monkeypatch.setattr("app.api.quiz.generate_questions", repeating_generate_questions)
+    payload = CreateQuizSessionRequest(
+        topics=[Topic.statistics], difficulty=Difficulty.easy, question_type=QuestionType.mcq, num_questions=1
+    )
+    async with open_session(db_engine) as db:
+        first = await create_quiz_session(payload, db)
+        second = await create_quiz_session(payload, db)
+        for created in (first, second):
+            await _answer_all(db, created, correct_prompts={created.questions[0].prompt})
+
+        review = (await db.exec(select(QuestionReview))).one()
+    assert (review.repetitions, review.question_id) == (2, second.questions[0].id)
+
+
+def test_review_intervals_stop_growing_at_the_cap():
+    state = None
+    for _ in range(60):
+        state = next_review(
+            state,
+            question_id="q",
+            session_id="s",
+            topic=Topic.statistics.value,
+            difficulty="easy",
+            question_type="mcq",
+            is_correct=True,
+            answered_at=datetime(2026, 1, 1, tzinfo=UTC),
+        )
+    assert state.interval_days == MAX_INTERVAL_DAYS
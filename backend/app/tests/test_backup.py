@@ -0,0 +1,107 @@
+import asyncio
+import gzip
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import select
+
+from app.api.admin import get_backups, run_backup_now, verify_backup_file
+from app.api.quiz import create_quiz_session, submit_answer
+from app.core import coordination
+from app.db.backup import BackupBusyError, list_backups, run_backup, verify_backup
+from app.db.migrations import SCHEMA_VERSION
+from app.db.models import QuizAnswer
+from app.db.retention import sqlite_database_path
+from app.db.session import open_session
+from app.schemas.quiz import (
+    CreateQuizSessionRequest,
+    Difficulty,
+    QuestionType,
+    SubmitAnswerRequest,
+    Topic,
+)
+
+
+def _mcq_request(num_questions: int) -> CreateQuizSessionRequest:
+    return CreateQuizSessionRequest(
+        topics=[Topic.statistics], difficulty=Difficulty.easy, question_type=QuestionType.mcq, num_questions=num_questions
+    )
+
+
+async def _completed_session(db) -> str:
+    created = await create_quiz_session(_mcq_request(3), db)
+    for question in created.questions:
+        await submit_answer(created.session_id, question.id, SubmitAnswerRequest(option_index=0), db)
+    return created.session_id
+
+
+async def test_backups_are_verified_compressed_and_rotated(monkeypatch, db_engine):
+    monkeypatch.setattr("app.core.config.settings.backup_keep", 2)
+    async with open_session(db_engine) as db:
+        for _ in range(2):
+            await _completed_session(db)
+
+    results = [await run_backup(db_engine) for _ in range(3)]
+
+    database_path = sqlite_database_path(db_engine)
+    assert list_backups(database_path) == [results[2].path, results[1].path]
+    assert results[2].removed == [results[0].path.name]
+    verification = results[2].verification
+    assert verification is not None and verification.ok
+    assert (verification.schema_version, verification.sessions, verification.answers) == (SCHEMA_VERSION, 2, 6)
+    with gzip.open(results[2].path, "rb") as backup:
+        assert backup.read(16) == b"SQLite format 3\x00"
+    # No partial copies or restore scratch space are left next to the backups.
+    assert sorted(results[2].path.parent.iterdir()) == sorted(list_backups(database_path))
+
+    results[2].path.write_bytes(gzip.compress(b"not a database" * 100))
+    assert not verify_backup(results[2].path).ok
+
+
+async def test_backup_under_concurrent_answers_never_blocks_writers(monkeypatch, db_engine):
+    # One-page steps keep the copy running across many writes, so writers restart it and it falls back to one step.
+    monkeypatch.setattr("app.core.config.settings.backup_step_pages", 1)
+    monkeypatch.setattr("app.core.config.settings.backup_step_sleep_ms", 2)
+    monkeypatch.setattr("app.core.config.settings.backup_max_restarts", 2)
+    monkeypatch.setattr("app.core.config.settings.backup_compress", False)
+    async with open_session(db_engine) as db:
+        created = [await create_quiz_session(_mcq_request(10), db) for _ in range(4)]
+
+    async def answer_all(session) -> None:
+        async with open_session(db_engine) as db:
+            for question in session.questions:
+                await submit_answer(session.session_id, question.id, SubmitAnswerRequest(option_index=1), db)
+                await asyncio.sleep(0.005)
+
+    backup = asyncio.create_task(run_backup(db_engine))
+    await asyncio.gather(*(answer_all(session) for session in created))
+    result = await backup
+
+    assert result is not None and result.verification is not None and result.verification.ok
+    assert result.restarts > 2 and result.verification.sessions == 4
+    assert 0 <= result.verification.answers <= 40
+    async with open_session(db_engine) as db:
+        assert len((await db.exec(select(QuizAnswer))).all()) == 40
+
+
+async def test_admin_backup_endpoints_are_single_flight(monkeypatch, db_engine):
+    monkeypatch.setattr("app.api.admin.get_engine", lambda: db_engine)
+    async with open_session(db_engine) as db:
+        await _completed_session(db)
+
+    report = await run_backup_now()
+
+    assert report.backup.compressed and report.verification is not None and report.verification.answers == 3
+    assert [backup.name for backup in await get_backups()] == [report.backup.name]
+    assert (await verify_backup_file(report.backup.name)).ok
+    with pytest.raises(HTTPException) as missing:
+        await verify_backup_file("lairn.db.bak.20000101_000000_000000.gz")
+    assert missing.value.status_code == 404
+
+    # Another worker holding the host-wide backup slot turns a second run into a conflict, not a second copy.
+    with coordination.shared_state.slot("backup", limit=1, wait_seconds=0, lease_seconds=60):
+        with pytest.raises(BackupBusyError):
+            await run_backup(db_engine)
+        with pytest.raises(HTTPException) as busy:
+            await run_backup_now()
+    assert busy.value.status_code == 409
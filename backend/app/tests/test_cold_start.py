@@ -0,0 +1,35 @@
+from sqlalchemy import event
+
+from app.db.session import build_async_engine, prepare_async_database
+from benchmarks.cold_start import measure_cold_start
+
+# Generous enough for a loaded CI runner; a regression such as opening resources at import blows well past it.
+IMPORT_BUDGET_MS = 3000
+FIRST_HEALTH_BUDGET_MS = 5000
+
+
+def test_restart_reaches_first_health_within_budget(tmp_path):
+    database_path = tmp_path / "cold.db"
+    measure_cold_start(database_path)
+    restart = measure_cold_start(database_path)
+
+    assert restart["import_ms"] < IMPORT_BUDGET_MS
+    assert restart["first_health_ms"] < FIRST_HEALTH_BUDGET_MS
+
+
+async def test_current_schema_skips_ddl_on_restart(tmp_path):
+    url = f"sqlite:///{tmp_path / 'lairn.db'}"
+    first = build_async_engine(url)
+    await prepare_async_database(first)
+    async with first.connect() as connection:
+        assert (await connection.exec_driver_sql("PRAGMA user_version")).scalar() > 0
+    await first.dispose()
+
+    restarted = build_async_engine(url)
+    statements: list[str] = []
+    event.listen(restarted.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    await prepare_async_database(restarted)
+    await restarted.dispose()
+
+    assert len(statements) == 2
+    assert not any(statement.lstrip().upper().startswith(("CREATE", "ALTER")) for statement in statements)
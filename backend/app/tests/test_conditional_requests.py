@@ -0,0 +1,76 @@
+from fastapi import Response
+from sqlalchemy import event
+
+from app.api.quiz import (
+    create_quiz_session,
+    get_session_summary,
+    list_sessions,
+    submit_answer,
+)
+from app.db.session import open_session
+from app.schemas.quiz import (
+    CreateQuizSessionRequest,
+    Difficulty,
+    QuestionType,
+    SubmitAnswerRequest,
+    Topic,
+)
+
+
+def _payload(num_questions: int) -> CreateQuizSessionRequest:
+    return CreateQuizSessionRequest(
+        topics=[Topic.statistics], difficulty=Difficulty.easy, question_type=QuestionType.mcq, num_questions=num_questions
+    )
+
+
+async def test_summary_etag_changes_with_each_answer(db_engine):
+    async with open_session(db_engine) as db:
+        created = await create_quiz_session(_payload(2), db)
+        first = Response()
+        await get_session_summary(created.session_id, first, db)
+        etag = first.headers["ETag"]
+        assert etag.startswith('W/"')
+
+        not_modified = await get_session_summary(created.session_id, Response(), db, if_none_match=etag)
+        assert isinstance(not_modified, Response) and not_modified.status_code == 304
+
+        await submit_answer(created.session_id, created.questions[0].id, SubmitAnswerRequest(option_index=0), db)
+        refreshed = Response()
+        summary = await get_session_summary(created.session_id, refreshed, db, if_none_match=etag)
+        assert summary.score.total == 2
+        assert refreshed.headers["ETag"] != etag
+
+
+async def test_completed_summaries_are_served_from_cache_after_a_version_probe(db_engine):
+    async with open_session(db_engine) as db:
+        created = await create_quiz_session(_payload(1), db)
+        await submit_answer(created.session_id, created.questions[0].id, SubmitAnswerRequest(option_index=0), db)
+        expected = await get_session_summary(created.session_id, Response(), db)
+
+        statements: list[str] = []
+
+        def capture(*args) -> None:
+            statements.append(args[2])
+
+        event.listen(db_engine.sync_engine, "before_cursor_execute", capture)
+        cached = await get_session_summary(created.session_id, Response(), db)
+        event.remove(db_engine.sync_engine, "before_cursor_execute", capture)
+
+    assert cached == expected
+    assert len(statements) == 1
+    assert "quizsessiontopicscore" not in statements[0]
+
+
+async def test_history_page_etag_tracks_new_sessions(db_engine):
+    async with open_session(db_engine) as db:
+        await create_quiz_session(_payload(1), db)
+        first = Response()
+        await list_sessions(response=first, limit=10, db=db)
+        etag = first.headers["ETag"]
+
+        not_modified = await list_sessions(response=Response(), limit=10, db=db, if_none_match=f'"other", {etag}')
+        assert isinstance(not_modified, Response) and not_modified.status_code == 304
+
+        await create_quiz_session(_payload(1), db)
+        page = await list_sessions(response=Response(), limit=10, db=db, if_none_match=etag)
+        assert len(page.items) == 2
@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+
+import httpx
+from pydantic import BaseModel
+
+from app.core.coordination import SharedState, default_coordination_path
+from app.llm.ollama import OllamaClient
+from app.llm.router import LLMRouter, LLMTask
+
+
+class _Verdict(BaseModel):
+    is_correct: bool
+    rationale: str
+
+
+class _FakeResponse:
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return {"response": '{"is_correct": true, "rationale": "Shared."}'}
+
+
+class _CountingHttpClient:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = 0
+
+    def post(self, *_args, **_kwargs):
+        self.calls += 1
+        if self.fail:
+            raise httpx.ConnectError("refused")
+        return _FakeResponse()
+
+
+def test_in_flight_slots_are_limited_across_independent_connections(shared_state):
+    # Separate SharedState instances on one file stand in for separate worker processes.
+    workers = [SharedState(shared_state.path) for _ in range(6)]
+    peak = 0
+    lock = threading.Lock()
+
+    def hold_slot(state: SharedState) -> None:
+        nonlocal peak
+        with state.slot("ollama", limit=2, wait_seconds=5, lease_seconds=30) as acquired:
+            assert acquired
+            with lock:
+                peak = max(peak, state.in_use("ollama"))
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=hold_slot, args=(state,)) for state in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+    assert shared_state.in_use("ollama") == 0
+
+
+def test_slot_wait_gives_up_and_expired_leases_are_reclaimed(shared_state):
+    with (
+        shared_state.slot("ollama", limit=1, wait_seconds=1, lease_seconds=30) as first,
+        SharedState(shared_state.path).slot("ollama", limit=1, wait_seconds=0.05, lease_seconds=30) as second,
+    ):
+        assert first and not second
+
+    with shared_state.slot("ollama", limit=1, wait_seconds=1, lease_seconds=0.01) as abandoned:
+        time.sleep(0.05)
+        with SharedState(shared_state.path).slot("ollama", limit=1, wait_seconds=1, lease_seconds=30) as reclaimed:
+            assert abandoned and reclaimed
+
+
+def test_breaker_and_verdict_cache_are_shared_between_workers(monkeypatch, shared_state):
+    monkeypatch.setattr("app.core.config.settings.ollama_breaker_threshold", 2)
+    failing_server, healthy_server = OllamaClient(), OllamaClient()
+    failing_worker, healthy_worker = LLMRouter([failing_server]), LLMRouter([healthy_server])
+    failing_http, healthy_http = _CountingHttpClient(fail=True), _CountingHttpClient()
+    monkeypatch.setattr(failing_server, "_client", failing_http)
+    monkeypatch.setattr(healthy_server, "_client", healthy_http)
+
+    assert failing_worker.generate_json(task=LLMTask.grading, prompt="judge", response_model=_Verdict, max_retries=3) is None
+    assert failing_http.calls == 2
+    assert shared_state.breaker_open(failing_server.name)
+    assert healthy_worker.generate_json(task=LLMTask.grading, prompt="judge", response_model=_Verdict) is None
+    assert healthy_http.calls == 0
+
+    shared_state.record_success(failing_server.name)
+    first = healthy_worker.generate_json(task=LLMTask.grading, prompt="judge", response_model=_Verdict, cache_ttl_seconds=60)
+    monkeypatch.setattr(failing_server, "_client", healthy_http)
+    second = failing_worker.generate_json(task=LLMTask.grading, prompt="judge", response_model=_Verdict, cache_ttl_seconds=60)
+    assert first == second == _Verdict(is_correct=True, rationale="Shared.")
+    assert healthy_http.calls == 1
+
+
+def test_health_probe_results_are_shared_for_their_ttl(monkeypatch):
+    probes: list[int] = []
+    first_worker, second_worker = OllamaClient(), OllamaClient()
+    monkeypatch.setattr(first_worker, "_probe_model", lambda _model: probes.append(1) or True)
+    monkeypatch.setattr(second_worker, "_probe_model", lambda _model: probes.append(1) or False)
+
+    assert first_worker.check_health("judge-model") is True
+    assert second_worker.check_health("judge-model") is True
+    assert len(probes) == 1
+
+
+def test_default_coordination_file_sits_next_to_the_resolved_database(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("app.core.config.settings.coordination_path", None)
+    monkeypatch.setattr("app.core.config.settings.sqlite_path", "./data/lairn.db")
+
+    assert default_coordination_path() == os.path.join(str(tmp_path), "data", "lairn.db.coord")
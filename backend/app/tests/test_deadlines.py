@@ -0,0 +1,85 @@
+import time
+
+from pydantic import BaseModel
+
+from app.api.quiz import create_quiz_session, submit_answer
+from app.core import coordination
+from app.core.deadline import deadline, expired, remaining, request_budget
+from app.core.metrics import PATH_TOTAL
+from app.db.session import open_session
+from app.llm.ollama import OllamaClient
+from app.llm.router import LLMRouter, LLMTask, llm_router
+from app.schemas.quiz import (
+    CreateQuizSessionRequest,
+    Difficulty,
+    QuestionType,
+    SubmitAnswerRequest,
+    Topic,
+)
+from benchmarks.ollama_stand_in import OllamaStandIn, StandInProfile
+
+
+class _Verdict(BaseModel):
+    is_correct: bool
+    rationale: str
+
+
+def test_client_timeouts_only_shorten_the_budget_and_scopes_only_tighten():
+    assert request_budget(20.0, None) == 20.0
+    assert request_budget(20.0, 1500) == 1.5
+    assert request_budget(20.0, 60_000) == 20.0
+    assert request_budget(0, None) is None
+
+    assert remaining() is None and not expired(5.0)
+    with deadline(2.0):
+        with deadline(30.0):
+            assert remaining() <= 2.0
+        with deadline(0.5):
+            assert expired(1.0)
+        assert not expired(1.0)
+    assert remaining() is None
+
+
+def test_an_llm_call_is_cut_at_the_deadline_without_tripping_the_breaker(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.ollama_breaker_threshold", 1)
+    monkeypatch.setattr("app.core.config.settings.llm_min_attempt_seconds", 0.2)
+    with OllamaStandIn(StandInProfile(latency_ms=5000), model=llm_router.model_for(LLMTask.grading)) as slow:
+        endpoint = OllamaClient(slow.url)
+        started = time.perf_counter()
+        with deadline(0.6):
+            verdict = LLMRouter([endpoint]).generate_json(
+                task=LLMTask.grading, prompt="You are a strict quiz grader.\n", response_model=_Verdict
+            )
+        elapsed = time.perf_counter() - started
+
+    assert verdict is None
+    assert elapsed < 1.0
+    # The first attempt timed out at the deadline and no retry was started with the few milliseconds left.
+    assert slow.calls == 1
+    assert not coordination.shared_state.breaker_open(endpoint.name)
+
+
+async def test_request_timeout_header_returns_fallback_questions_within_budget(monkeypatch, db_engine):
+    deadline_fallbacks = PATH_TOTAL.value(stage="generation", path="fallback_deadline")
+    payload = CreateQuizSessionRequest(
+        topics=[Topic.statistics], difficulty=Difficulty.easy, question_type=QuestionType.short_answer, num_questions=3
+    )
+    with OllamaStandIn(StandInProfile(latency_ms=5000), model=llm_router.model_for(LLMTask.generation)) as slow:
+        monkeypatch.setattr(llm_router, "endpoints", [OllamaClient(slow.url)])
+        async with open_session(db_engine) as db:
+            started = time.perf_counter()
+            created = await create_quiz_session(payload, db, request_timeout_ms=1500)
+            elapsed = time.perf_counter() - started
+
+            assert len(created.questions) == 3
+            assert elapsed < 2.5
+            # Fallback duplicates were numbered as variations rather than regenerated after the budget ran out.
+            assert slow.calls == 1
+            assert PATH_TOTAL.value(stage="generation", path="fallback_deadline") == deadline_fallbacks + 1
+
+            started = time.perf_counter()
+            answered = await submit_answer(
+                created.session_id, created.questions[0].id, SubmitAnswerRequest(answer="anything"), db, request_timeout_ms=1500
+            )
+            assert time.perf_counter() - started < 2.5
+            assert "deterministic token overlap" in answered.explanation
@@ -0,0 +1,185 @@
+import gzip
+import json
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi import Response
+from sqlmodel import func, select
+
+from app.api.quiz import create_quiz_session, get_session_summary, submit_answer
+from app.api.stats import get_stats
+from app.db.models import (
+    QuestionReview,
+    QuizAnswer,
+    QuizAnswerRollup,
+    QuizQuestion,
+    QuizSession,
+    TopicMastery,
+)
+from app.db.retention import run_retention
+from app.db.session import build_async_engine, open_session, prepare_async_database
+from app.db.transfer import ImportRecordError, export_stream, import_records
+from app.schemas.quiz import (
+    CreateQuizSessionRequest,
+    Difficulty,
+    QuestionType,
+    SubmitAnswerRequest,
+    Topic,
+)
+
+
+async def _seed_history(engine) -> list[str]:
+    session_ids: list[str] = []
+    async with open_session(engine) as db:
+        for index in range(3):
+            created = await create_quiz_session(
+                CreateQuizSessionRequest(
+                    topics=[Topic.statistics, Topic.mlops],
+                    difficulty=Difficulty.easy,
+                    question_type=QuestionType.mcq,
+                    num_questions=4,
+                ),
+                db,
+            )
+            for question in created.questions[: index + 2]:
+                await submit_answer(created.session_id, question.id, SubmitAnswerRequest(option_index=0), db)
+            session_ids.append(created.session_id)
+    return session_ids
+
+
+async def _collect(stream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+
+async def _chunked(payload: bytes, size: int = 1000):
+    for start in range(0, len(payload), size):
+        yield payload[start : start + size]
+
+
+async def _table_counts(engine) -> tuple[int, int, int]:
+    async with open_session(engine) as db:
+        return tuple(
+            [(await db.exec(select(func.count()).select_from(model))).one() for model in (QuizSession, QuizQuestion, QuizAnswer)]
+        )
+
+
+@pytest.fixture
+async def target_engine(tmp_path):
+    engine = build_async_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    await prepare_async_database(engine)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.parametrize("compress", [False, True])
+async def test_export_import_round_trip_is_idempotent(db_engine, target_engine, compress):
+    session_ids = await _seed_history(db_engine)
+    async with open_session(db_engine) as db:
+        summaries = [await get_session_summary(session_id, Response(), db) for session_id in session_ids]
+        stats = await get_stats(days=30, db=db)
+
+    payload = await _collect(export_stream(db_engine, compress=compress))
+    if compress:
+        assert payload[:2] == b"\x1f\x8b"
+    lines = (gzip.decompress(payload) if compress else payload).decode().splitlines()
+    assert json.loads(lines[0])["kind"] == "header"
+    assert [json.loads(line)["kind"] for line in lines[1:4]] == ["session"] * 3
+
+    first = await import_records(target_engine, _chunked(payload))
+    second = await import_records(target_engine, _chunked(payload))
+
+    assert first.counts == second.counts == {"session": 3, "question": 12, "answer": 9}
+    assert await _table_counts(target_engine) == (3, 12, 9)
+    async with open_session(target_engine) as db:
+        assert [await get_session_summary(session_id, Response(), db) for session_id in session_ids] == summaries
+        assert await get_stats(days=30, db=db) == stats
+
+
+async def test_export_includes_archived_sessions(db_engine, target_engine):
+    session_ids = await _seed_history(db_engine)
+    async with open_session(db_engine) as db:
+        # Only the fully answered session is completed and eligible for archiving.
+        completed = await db.get(QuizSession, session_ids[2])
+        summary = await get_session_summary(session_ids[2], Response(), db)
+        assert completed is not None and completed.completed_at is not None
+    await run_retention(db_engine, now=datetime.now(UTC) + timedelta(days=365))
+    assert await _table_counts(db_engine) == (3, 8, 5)
+
+    await import_records(target_engine, _chunked(await _collect(export_stream(db_engine))))
+
+    assert await _table_counts(target_engine) == (3, 12, 9)
+    async with open_session(target_engine) as db:
+        assert await get_session_summary(session_ids[2], Response(), db) == summary
+        restored = await db.get(QuizSession, session_ids[2])
+        assert restored is not None and restored.archived_at is None
+
+
+async def test_reimporting_into_an_archived_database_keeps_archives_and_rollups(db_engine):
+    session_ids = await _seed_history(db_engine)
+    later = datetime.now(UTC) + timedelta(days=365)
+    await run_retention(db_engine, now=later)
+    async with open_session(db_engine) as db:
+        stats = await get_stats(days=30, db=db)
+        summary = await get_session_summary(session_ids[2], Response(), db)
+
+    result = await import_records(db_engine, _chunked(await _collect(export_stream(db_engine))))
+
+    # The archived session's questions and answers stay in its archive rather than coming back as new rows.
+    assert result.counts == {"session": 3, "question": 8, "answer": 5}
+    assert await _table_counts(db_engine) == (3, 8, 5)
+    async with open_session(db_engine) as db:
+        assert await get_stats(days=30, db=db) == stats
+        assert await get_session_summary(session_ids[2], Response(), db) == summary
+        archived = await db.get(QuizSession, session_ids[2])
+        assert archived is not None and archived.archived_at is not None
+
+    rerun = await run_retention(db_engine, now=later)
+    assert rerun.sessions_archived == 0
+
+
+async def test_import_after_retention_adds_to_mastery_of_archived_sessions(db_engine, target_engine):
+    await _seed_history(db_engine)
+    await _seed_history(target_engine)
+    await run_retention(target_engine, now=datetime.now(UTC) + timedelta(days=365))
+
+    await import_records(target_engine, _chunked(await _collect(export_stream(db_engine))))
+
+    async with open_session(target_engine) as db:
+        answered = (await db.exec(select(func.sum(TopicMastery.answered)))).one()
+        reviewed = (await db.exec(select(QuestionReview.question_id))).all()
+        imported = set((await db.exec(select(QuizAnswer.question_id))).all())
+    # Nine answers from before retention plus nine imported ones, with schedules pointing at the imported copies.
+    assert answered == 18
+    assert reviewed and set(reviewed) <= imported
+
+
+async def test_import_rejects_invalid_records_with_line_numbers(target_engine):
+    payload = b'{"kind":"session","id":"s1"}\n'
+    with pytest.raises(ImportRecordError) as raised:
+        await import_records(target_engine, _chunked(payload))
+    assert raised.value.line_number == 1
+
+    with pytest.raises(ImportRecordError, match="line 2: invalid JSON"):
+        await import_records(target_engine, _chunked(b"\n{not json\n"))
+
+
+async def test_import_rejects_dangling_and_conflicting_answers_without_writing_them(db_engine, target_engine):
+    await _seed_history(db_engine)
+    lines = (await _collect(export_stream(db_engine))).decode().splitlines()
+    first_answer = next(index for index, line in enumerate(lines) if json.loads(line)["kind"] == "answer")
+    answer = json.loads(lines[first_answer])
+
+    dangling = [*lines[:first_answer], json.dumps({**answer, "question_id": "missing"})]
+    with pytest.raises(ImportRecordError, match="unknown question 'missing'") as raised:
+        await import_records(target_engine, _chunked("\n".join(dangling).encode()))
+    assert raised.value.line_number == first_answer + 1
+    async with open_session(target_engine) as db:
+        assert (await db.exec(select(func.sum(QuizAnswerRollup.answered)))).one() is None
+        assert (await db.exec(select(func.count()).select_from(TopicMastery))).one() == 0
+
+    # A second answer to the same question under a new id trips the unique index and is reported, not a server error.
+    duplicate = [*lines[: first_answer + 1], json.dumps({**answer, "id": "another-answer"})]
+    with pytest.raises(ImportRecordError, match="rejected by the database") as raised:
+        await import_records(target_engine, _chunked("\n".join(duplicate).encode()))
+    assert raised.value.line_number == first_answer + 1
+    assert (await _table_counts(target_engine))[2] == 0
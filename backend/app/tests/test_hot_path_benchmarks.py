@@ -0,0 +1,22 @@
+import json
+
+from benchmarks.hot_paths import BASELINE_PATH, CASES, compare, run_cases
+
+
+def test_every_case_runs_at_its_smallest_scale_and_has_a_baseline():
+    smallest = {}
+    for case in CASES:
+        if case.name not in smallest or case.scale < smallest[case.name].scale:
+            smallest[case.name] = case
+
+    results = run_cases(list(smallest.values()), repeat=1, min_time=0.001)
+
+    assert all(micros > 0 for micros in results.values())
+    assert {case.key for case in CASES} <= set(json.loads(BASELINE_PATH.read_text())["results"])
+
+
+def test_compare_flags_only_slowdowns_beyond_the_threshold():
+    rows = compare({"a[1]": 130.0, "b[1]": 110.0, "c[1]": 5.0}, {"a[1]": 100.0, "b[1]": 100.0}, threshold=0.25)
+
+    assert [(row["case"], row["regressed"]) for row in rows] == [("a[1]", True), ("b[1]", False), ("c[1]", False)]
+    assert rows[2]["baseline_us"] is None
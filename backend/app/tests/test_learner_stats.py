@@ -0,0 +1,73 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import event
+from sqlmodel import select
+
+from app.api.quiz import create_quiz_session, submit_answer
+from app.api.stats import get_stats
+from app.db.models import QuizAnswerRollup, QuizQuestion
+from app.db.scores import rebuild_answer_rollups
+from app.db.session import open_session
+from app.schemas.quiz import (
+    CreateQuizSessionRequest,
+    Difficulty,
+    QuestionType,
+    SubmitAnswerRequest,
+    Topic,
+)
+
+
+async def _answer_session(db, topic: Topic, difficulty: Difficulty, correct_answers: int, num_questions: int) -> None:
+    created = await create_quiz_session(
+        CreateQuizSessionRequest(
+            topics=[topic], difficulty=difficulty, question_type=QuestionType.mcq, num_questions=num_questions
+        ),
+        db,
+    )
+    questions = (
+        await db.exec(select(QuizQuestion).where(QuizQuestion.session_id == created.session_id).order_by(QuizQuestion.order_index))
+    ).all()
+    for index, question in enumerate(questions):
+        chosen = question.correct_option_index if index < correct_answers else (question.correct_option_index + 1) % 4
+        await submit_answer(created.session_id, question.id, SubmitAnswerRequest(option_index=chosen), db)
+
+
+async def test_stats_are_read_from_rollups_and_flag_weak_topics(db_engine):
+    async with open_session(db_engine) as db:
+        await _answer_session(db, Topic.statistics, Difficulty.easy, correct_answers=5, num_questions=6)
+        await _answer_session(db, Topic.mlops, Difficulty.hard, correct_answers=1, num_questions=6)
+
+        statements: list[str] = []
+
+        def capture(*args) -> None:
+            statements.append(args[2])
+
+        event.listen(db_engine.sync_engine, "before_cursor_execute", capture)
+        stats = await get_stats(days=30, db=db)
+        hard_only = await get_stats(days=30, difficulty=Difficulty.hard, db=db)
+        event.remove(db_engine.sync_engine, "before_cursor_execute", capture)
+
+    assert all("quizanswerrollup" in statement and "quizanswer " not in statement for statement in statements)
+    assert (stats.totals.answered, stats.totals.correct) == (12, 6)
+    assert [(item.topic, item.answered, item.correct) for item in stats.by_topic] == [
+        (Topic.mlops, 6, 1),
+        (Topic.statistics, 6, 5),
+    ]
+    assert stats.weak_topics == [Topic.mlops]
+    assert [(item.day, item.answered) for item in stats.daily] == [(datetime.now(UTC).date().isoformat(), 12)]
+    assert [item.topic for item in hard_only.by_topic] == [Topic.mlops]
+
+
+async def test_rollup_rebuild_matches_incremental_counts(db_engine):
+    async with open_session(db_engine) as db:
+        await _answer_session(db, Topic.statistics, Difficulty.medium, correct_answers=2, num_questions=3)
+        await _answer_session(db, Topic.statistics, Difficulty.medium, correct_answers=3, num_questions=3)
+        incremental = [row.model_dump() for row in (await db.exec(select(QuizAnswerRollup))).all()]
+
+    async with db_engine.begin() as connection:
+        await connection.run_sync(rebuild_answer_rollups)
+
+    async with open_session(db_engine) as db:
+        rebuilt = [row.model_dump() for row in (await db.exec(select(QuizAnswerRollup))).all()]
+    assert rebuilt == incremental
+    assert [(row["answered"], row["correct"]) for row in rebuilt] == [(6, 5)]
@@ -0,0 +1,73 @@
+import time
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.metrics import LLM_HEDGE_SAVED, LLM_HEDGES
+from app.llm.ollama import OllamaClient
+from app.llm.router import LLMRouter, LLMTask
+from benchmarks.ollama_stand_in import OllamaStandIn, StandInProfile
+
+_PROMPT = "You are a strict quiz grader.\nExpected answer: overfitting\nUser answer: overfitting\n"
+
+
+class _Verdict(BaseModel):
+    is_correct: bool
+    rationale: str
+
+
+def _router_with_history(slow: OllamaStandIn, fast: OllamaStandIn) -> tuple[LLMRouter, OllamaClient]:
+    stalled, healthy = OllamaClient(slow.url), OllamaClient(fast.url)
+    # Make the stalled server look fastest so it gets the primary attempt.
+    stalled.latency_seconds, healthy.latency_seconds = 0.01, 0.05
+    router = LLMRouter([stalled, healthy])
+    for _ in range(settings.llm_hedge_min_samples):
+        router._windows[LLMTask.grading].record(0.05, hedged=False)
+    return router, stalled
+
+
+def _wait_for(condition, seconds: float = 5.0) -> bool:
+    deadline = time.monotonic() + seconds
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+
+def test_hedge_wins_against_a_stalled_server_and_cancels_it(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.llm_hedge_enabled", True)
+    monkeypatch.setattr("app.core.config.settings.llm_hedge_max_ratio", 1.0)
+    won, saved = LLM_HEDGES.value(task="grading", outcome="won"), LLM_HEDGE_SAVED.count(task="grading")
+    with (
+        OllamaStandIn(StandInProfile(latency_ms=4000), model=settings.ollama_model) as slow,
+        OllamaStandIn(StandInProfile(latency_ms=20), model=settings.ollama_model) as fast,
+    ):
+        router, _ = _router_with_history(slow, fast)
+        started = time.perf_counter()
+        verdict = router.generate_json(task=LLMTask.grading, prompt=_PROMPT, response_model=_Verdict, max_retries=0)
+        elapsed = time.perf_counter() - started
+
+        assert verdict is not None and verdict.is_correct
+        assert elapsed < 1.0
+        assert (slow.calls, fast.calls) == (1, 1)
+        assert _wait_for(lambda: slow.cancelled == 1)
+
+    assert LLM_HEDGES.value(task="grading", outcome="won") == won + 1
+    assert LLM_HEDGE_SAVED.count(task="grading") == saved + 1
+
+
+def test_hedges_stay_within_the_budget(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.llm_hedge_enabled", True)
+    monkeypatch.setattr("app.core.config.settings.llm_hedge_max_ratio", 0.0)
+    over_budget = LLM_HEDGES.value(task="grading", outcome="over_budget")
+    with (
+        OllamaStandIn(StandInProfile(latency_ms=400), model=settings.ollama_model) as slow,
+        OllamaStandIn(StandInProfile(latency_ms=20), model=settings.ollama_model) as fast,
+    ):
+        router, stalled = _router_with_history(slow, fast)
+        verdict = router.generate_json(task=LLMTask.grading, prompt=_PROMPT, response_model=_Verdict, max_retries=0)
+
+    assert verdict is not None
+    assert (slow.calls, fast.calls, slow.cancelled) == (1, 0, 0)
+    assert LLM_HEDGES.value(task="grading", outcome="over_budget") == over_budget + 1
+    # The primary still streamed to completion and fed the server's latency estimate.
+    assert stalled.latency_seconds > 0.01
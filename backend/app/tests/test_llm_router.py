@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.llm.ollama import OllamaClient
+from app.llm.router import LLMRouter, LLMTask
+from app.quiz.evaluator import evaluate_short_answer
+from app.quiz.generator import generate_questions
+from app.schemas.quiz import Difficulty, QuestionType, Topic
+from benchmarks.ollama_stand_in import OllamaStandIn, StandInProfile
+
+
+class _Questions(BaseModel):
+    questions: list[dict]
+
+
+_PROMPT = "Requested topics: ['Statistics']\nQuestion type: mcq\nDifficulty: easy\nNum questions: 1\n"
+
+
+def test_tasks_use_their_assigned_models(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.ollama_generation_model", "large")
+    monkeypatch.setattr("app.core.config.settings.ollama_grading_model", "small")
+    with OllamaStandIn(StandInProfile(latency_ms=0), model=["large", "small"]) as stand_in:
+        monkeypatch.setattr("app.llm.router.llm_router.endpoints", [OllamaClient(stand_in.url)])
+        questions = generate_questions(
+            topics=[Topic.statistics], difficulty=Difficulty.easy, question_type=QuestionType.short_answer, num_questions=1
+        )
+        _, _, trace = evaluate_short_answer(
+            prompt=questions[0].prompt,
+            expected_answer=questions[0].expected_answer,
+            acceptable_variants=[],
+            grading_rubric="",
+            user_answer="something else",
+        )
+
+    assert stand_in.calls_by_model == {"large": 1, "small": 1}
+    assert trace["path"] == "llm_judge"
+
+
+def test_concurrent_calls_spread_over_servers_and_prefer_the_faster_one():
+    with (
+        OllamaStandIn(StandInProfile(latency_ms=20), model=settings.ollama_model) as fast,
+        OllamaStandIn(StandInProfile(latency_ms=200), model=settings.ollama_model) as slow,
+    ):
+        router = LLMRouter([OllamaClient(fast.url), OllamaClient(slow.url)])
+        call = lambda _: router.generate_json(task=LLMTask.generation, prompt=_PROMPT, response_model=_Questions)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(call, range(4)))
+        assert all(results) and fast.calls and slow.calls
+
+        for _ in range(10):
+            call(None)
+
+    # Once both latencies are known, sequential calls all go to the faster server.
+    assert fast.calls >= 10
+
+
+def test_down_or_modelless_servers_are_skipped(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.ollama_breaker_threshold", 1)
+    monkeypatch.setattr("app.core.config.settings.ollama_timeout_seconds", 1)
+    with (
+        OllamaStandIn(StandInProfile(latency_ms=0), model=settings.ollama_model) as healthy,
+        OllamaStandIn(StandInProfile(latency_ms=0), model="other") as missing_model,
+    ):
+        down, modelless, serving = OllamaClient("http://127.0.0.1:9"), OllamaClient(missing_model.url), OllamaClient(healthy.url)
+        router = LLMRouter([down, modelless, serving])
+        assert modelless.check_health(settings.ollama_model) is False
+
+        for _ in range(3):
+            assert router.generate_json(task=LLMTask.generation, prompt=_PROMPT, response_model=_Questions, max_retries=1)
+
+    assert healthy.calls == 3
+    assert missing_model.calls == 0
+    assert not down.is_available(settings.ollama_model)
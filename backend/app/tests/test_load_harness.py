@@ -0,0 +1,26 @@
+import httpx
+
+from app.core.config import settings
+from app.llm.ollama import OllamaClient
+from app.llm.router import llm_router
+from app.main import app
+from benchmarks.load_test import LoadConfig, run_load
+from benchmarks.ollama_stand_in import PROFILES, OllamaStandIn
+
+
+async def test_load_harness_drives_full_flows_and_reports_slos(monkeypatch, db_engine):
+    with OllamaStandIn(PROFILES["fast"], model=settings.ollama_model) as stand_in:
+        monkeypatch.setattr(llm_router, "endpoints", [OllamaClient(stand_in.url)])
+        monkeypatch.setattr("app.db.session.get_engine", lambda: db_engine)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            report = await run_load(client, LoadConfig(sessions=6, concurrency=3, questions_per_session=3), stand_in)
+
+    assert report["sessions_completed"] == 6
+    assert report["error_rate"] == 0
+    assert set(report["endpoints"]) == {"create_session", "submit_answer", "session_summary", "history"}
+    assert report["endpoints"]["submit_answer"]["requests"] == 18
+    for endpoint in report["endpoints"].values():
+        assert endpoint["p50_ms"] <= endpoint["p95_ms"] <= endpoint["p99_ms"]
+    assert report["generation_fallback_rate"] == 0
+    assert report["ollama_calls_per_session"] >= 1
+    assert sum(report["answers"].values()) == 18
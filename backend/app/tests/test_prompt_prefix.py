@@ -0,0 +1,76 @@
+from app.core.metrics import LLM_PROMPT_EVAL_DURATION, LLM_PROMPT_EVAL_TOKENS
+from app.llm.ollama import OllamaClient
+from app.llm.router import LLMRouter
+from app.quiz.evaluator import JUDGE_SYSTEM_PROMPT, evaluate_short_answer
+from benchmarks.prompt_prefix import compare_layouts
+
+
+class _FakeResponse:
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return {
+            "message": {"role": "assistant", "content": '{"is_correct": false, "rationale": "Misses the key idea."}'},
+            "prompt_eval_count": 12,
+            "prompt_eval_duration": 30_000_000,
+        }
+
+
+class _RecordingHttpClient:
+    def __init__(self):
+        self.requests: list[tuple[str, dict]] = []
+
+    def post(self, path, json, **_kwargs):
+        self.requests.append((path, json))
+        return _FakeResponse()
+
+
+def _grade(monkeypatch, client: _RecordingHttpClient) -> tuple[bool, str, dict]:
+    server = OllamaClient()
+    monkeypatch.setattr(server, "_client", client)
+    monkeypatch.setattr("app.quiz.evaluator.llm_router", LLMRouter([server]))
+    return evaluate_short_answer(
+        prompt="What is overfitting?",
+        expected_answer="Fitting noise in the training data",
+        acceptable_variants=[],
+        grading_rubric="Must mention noise.",
+        user_answer="It is when the model is too simple",
+    )
+
+
+def test_judge_calls_send_instructions_as_a_stable_system_message(monkeypatch):
+    seconds, tokens = LLM_PROMPT_EVAL_DURATION.sum(call="grading", api="chat"), LLM_PROMPT_EVAL_TOKENS.value(call="grading", api="chat")
+    client = _RecordingHttpClient()
+    is_correct, _, trace = _grade(monkeypatch, client)
+
+    path, body = client.requests[0]
+    assert (is_correct, trace["path"], path) == (False, "llm_judge", "/api/chat")
+    assert [message["role"] for message in body["messages"]] == ["system", "user"]
+    assert body["messages"][0]["content"] == JUDGE_SYSTEM_PROMPT
+    assert body["messages"][1]["content"].endswith("User answer: It is when the model is too simple\n")
+    assert LLM_PROMPT_EVAL_DURATION.sum(call="grading", api="chat") - seconds == 0.03
+    assert LLM_PROMPT_EVAL_TOKENS.value(call="grading", api="chat") - tokens == 12
+
+
+def test_single_prompt_layout_stays_available(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.ollama_chat_prefix", False)
+    client = _RecordingHttpClient()
+    _grade(monkeypatch, client)
+
+    path, body = client.requests[0]
+    assert path == "/api/generate"
+    assert body["prompt"].startswith(JUDGE_SYSTEM_PROMPT) and "messages" not in body
+
+
+def test_prefix_benchmark_reports_prompt_eval_per_call_type():
+    report = compare_layouts(None, rounds=3)
+
+    assert {call: report["system_prefix"][call]["calls"] for call in ("generation", "regeneration", "grading")} == {
+        "generation": 3,
+        "regeneration": 3,
+        "grading": 9,
+    }
+    # Generation and regeneration now share one cached instruction prefix.
+    assert report["prompt_eval_change_percent"]["generation"] < 0
+    assert report["prompt_eval_change_percent"]["regeneration"] < 0
@@ -0,0 +1,91 @@
+import functools
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.db.session import build_async_engine
+from app.main import app
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # The engine is built on first use, inside the client's event loop, like the app's own engine.
+    engine = functools.cache(lambda: build_async_engine(f"sqlite:///{tmp_path / 'lairn.db'}"))
+    for target in ("app.db.session.get_engine", "app.api.quiz.get_engine", "app.main.get_engine"):
+        monkeypatch.setattr(target, engine)
+    monkeypatch.setattr("app.core.config.settings.retention_interval_seconds", 0)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _create_session(client: TestClient, question_type: str, num_questions: int) -> dict:
+    response = client.post(
+        "/api/v1/quiz/sessions",
+        json={"topics": ["Statistics"], "difficulty": "easy", "question_type": question_type, "num_questions": num_questions},
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def _receive_until(socket, event_type: str) -> list[dict]:
+    events = []
+    while not events or events[-1]["type"] != event_type:
+        events.append(socket.receive_json())
+    return events
+
+
+def test_answers_over_the_socket_push_questions_results_and_completion(client):
+    session = _create_session(client, "mcq", 3)
+    question_ids = [question["id"] for question in session["questions"]]
+
+    with client.websocket_connect(f"/api/v1/quiz/sessions/{session['session_id']}/ws") as socket:
+        assert socket.receive_json() == {"type": "session", "session_id": session["session_id"], "total": 3, "answered": 0}
+        assert socket.receive_json()["question"]["id"] == question_ids[0]
+
+        socket.send_json({"type": "answer", "question_id": question_ids[0], "option_index": 0})
+        socket.send_json({"type": "answer", "question_id": "missing", "option_index": 0})
+        socket.send_json({"type": "answer", "question_id": question_ids[1]})
+        socket.send_json({"type": "answer", "question_id": question_ids[1], "option_index": 1})
+        socket.send_json({"type": "answer", "question_id": question_ids[2], "option_index": 2})
+        socket.send_text("not json")
+        events = _receive_until(socket, "completed")
+
+    pushed = [event["question"]["id"] for event in events if event["type"] == "question"]
+    results = {event["question_id"]: event["result"] for event in events if event["type"] == "result"}
+    errors = {(event["question_id"], event["status"]) for event in events if event["type"] == "error"}
+    assert pushed == question_ids[1:]
+    assert set(results) == set(question_ids)
+    assert {("missing", 404), (question_ids[1], 422), (None, 422)} <= errors
+    assert events[-1]["summary"]["score"]["total"] == 3
+    assert events[-1]["summary"]["completed_at"] is not None
+
+    # Reconnecting replays stored results instead of grading again.
+    with client.websocket_connect(f"/api/v1/quiz/sessions/{session['session_id']}/ws") as socket:
+        replayed = _receive_until(socket, "completed")
+    assert {event["question_id"]: event["result"] for event in replayed if event["type"] == "result"} == results
+
+
+def test_results_are_pushed_as_grading_finishes(client, monkeypatch):
+    def evaluate_short_answer(**kwargs):
+        if kwargs["user_answer"] == "slow":
+            time.sleep(0.5)
+        return True, "Accepted.", {"path": "llm_judge", "rationale": "Accepted."}
+
+    monkeypatch.setattr("app.api.quiz.evaluate_short_answer", evaluate_short_answer)
+    session = _create_session(client, "short-answer", 2)
+    first, second = (question["id"] for question in session["questions"])
+
+    with client.websocket_connect(f"/api/v1/quiz/sessions/{session['session_id']}/ws") as socket:
+        socket.send_json({"type": "answer", "question_id": first, "answer": "slow"})
+        socket.send_json({"type": "answer", "question_id": second, "answer": "fast"})
+        events = _receive_until(socket, "completed")
+
+    assert [event["question_id"] for event in events if event["type"] == "result"] == [second, first]
+
+
+def test_unknown_sessions_are_refused(client):
+    with pytest.raises(WebSocketDisconnect) as refused, client.websocket_connect("/api/v1/quiz/sessions/missing/ws"):
+        pass
+    assert refused.value.code == 1008
@@ -83,7 +83,7 @@ def test_generate_questions_deduplicates_prompts_with_targeted_regeneration(monk
             return initial
         return regenerated
 
-    monkeypatch.setattr("app.quiz.generator.ollama_client.generate_json", fake_generate_json)
+    monkeypatch.setattr("app.quiz.generator.llm_router.generate_json", fake_generate_json)
 
     questions = generate_questions(
         topics=[Topic.machine_learning, Topic.deep_learning, Topic.statistics],
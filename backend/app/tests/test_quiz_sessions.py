@@ -1,83 +1,217 @@
-from pathlib import Path
+import asyncio
+import time
 
-from sqlmodel import Session, SQLModel, create_engine, select
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import event
+from sqlmodel import select
 
-from app.api.quiz import create_quiz_session, get_session_summary, list_sessions, submit_answer
-from app.db.models import QuizQuestion
+from app.api.quiz import (
+    _active_sessions,
+    _generate_and_store_session,
+    create_quiz_session,
+    get_session_summary,
+    list_sessions,
+    submit_answer,
+)
+from app.db.idempotency import claim_idempotency_key, request_fingerprint
+from app.db.models import QuizAnswer, QuizQuestion, QuizSession
+from app.db.session import open_session, run_with_busy_retry
+from app.quiz.generator import generate_questions
 from app.schemas.quiz import CreateQuizSessionRequest, Difficulty, QuestionType, SubmitAnswerRequest, Topic
 
 
-def test_create_quiz_session_hides_correct_answers():
-    test_db_path = Path("./test_sessions.db")
-    if test_db_path.exists():
-        test_db_path.unlink()
-
-    engine = create_engine(f"sqlite:///{test_db_path}", connect_args={"check_same_thread": False})
-    SQLModel.metadata.create_all(engine)
-
+async def test_create_quiz_session_hides_correct_answers(db_engine):
     payload = CreateQuizSessionRequest(
         topics=[Topic.machine_learning, Topic.mlops],
         difficulty=Difficulty.medium,
         question_type=QuestionType.mixed,
         num_questions=4,
     )
-    try:
-        with Session(engine) as db:
-            response = create_quiz_session(payload, db)
-
-        assert response.session_id
-        assert len(response.questions) == 4
-        assert response.config == payload
-        assert {question.type for question in response.questions} == {QuestionType.mcq, QuestionType.short_answer}
-        for question in response.questions:
-            serialized = question.model_dump()
-            assert "correct_option_index" not in serialized
-            assert "expected_answer" not in serialized
-            assert "acceptable_variants" not in serialized
-            assert "explanation" not in serialized
-    finally:
-        if test_db_path.exists():
-            test_db_path.unlink()
-
-
-def test_submit_answer_summary_and_list():
-    test_db_path = Path("./test_answers.db")
-    if test_db_path.exists():
-        test_db_path.unlink()
-
-    engine = create_engine(f"sqlite:///{test_db_path}", connect_args={"check_same_thread": False})
-    SQLModel.metadata.create_all(engine)
-    try:
-        with Session(engine) as db:
-            created = create_quiz_session(
-                CreateQuizSessionRequest(
-                    topics=[Topic.machine_learning],
-                    difficulty=Difficulty.easy,
-                    question_type=QuestionType.mcq,
-                    num_questions=1,
-                ),
-                db,
-            )
-            question = db.exec(select(QuizQuestion).where(QuizQuestion.session_id == created.session_id)).first()
-            assert question is not None
-            assert question.correct_option_index is not None
-
-            answer_response = submit_answer(
-                created.session_id,
-                question.id,
-                SubmitAnswerRequest(option_index=question.correct_option_index),
-                db,
-            )
-            assert answer_response.is_correct is True
-
-            summary = get_session_summary(created.session_id, db)
-            assert summary.score.correct == 1
-            assert summary.score.total == 1
-            assert summary.completed_at is not None
-
-            sessions = list_sessions(limit=20, offset=0, db=db)
-            assert len(sessions.items) == 1
-            assert sessions.items[0].session_id == created.session_id
-    finally:
-        if test_db_path.exists():
-            test_db_path.unlink()
+    async with open_session(db_engine) as db:
+        response = await create_quiz_session(payload, db)
+
+    assert response.session_id
+    assert len(response.questions) == 4
+    assert response.config == payload
+    assert {question.type for question in response.questions} == {QuestionType.mcq, QuestionType.short_answer}
+    for question in response.questions:
+        serialized = question.model_dump()
+        assert "correct_option_index" not in serialized
+        assert "expected_answer" not in serialized
+        assert "acceptable_variants" not in serialized
+        assert "explanation" not in serialized
+
+
+async def test_submit_answer_summary_and_list(db_engine):
+    async with open_session(db_engine) as db:
+        created = await create_quiz_session(
+            CreateQuizSessionRequest(
+                topics=[Topic.machine_learning],
+                difficulty=Difficulty.easy,
+                question_type=QuestionType.mcq,
+                num_questions=1,
+            ),
+            db,
+        )
+        question = (await db.exec(select(QuizQuestion).where(QuizQuestion.session_id == created.session_id))).first()
+        assert question is not None
+        assert question.correct_option_index is not None
+
+        answer_response = await submit_answer(
+            created.session_id,
+            question.id,
+            SubmitAnswerRequest(option_index=question.correct_option_index),
+            db,
+        )
+        assert answer_response.is_correct is True
+
+        summary = await get_session_summary(created.session_id, Response(), db)
+        assert summary.score.correct == 1
+        assert summary.score.total == 1
+        assert summary.completed_at is not None
+
+        sessions = await list_sessions(response=Response(), limit=20, offset=0, db=db)
+        assert len(sessions.items) == 1
+        assert sessions.items[0].session_id == created.session_id
+
+
+async def test_concurrent_duplicate_submissions_grade_once_and_store_one_answer(monkeypatch, db_engine):
+    grading_calls: list[str] = []
+
+    def slow_evaluate_short_answer(**kwargs):
+        grading_calls.append(kwargs["user_answer"])
+        time.sleep(0.2)
+        return True, "Looks right.", {"path": "llm_judge", "rationale": "Looks right."}
+
+    monkeypatch.setattr("app.api.quiz.evaluate_short_answer", slow_evaluate_short_answer)
+
+    async with open_session(db_engine) as db:
+        created = await create_quiz_session(
+            CreateQuizSessionRequest(
+                topics=[Topic.statistics],
+                difficulty=Difficulty.easy,
+                question_type=QuestionType.short_answer,
+                num_questions=1,
+            ),
+            db,
+        )
+    question_id = created.questions[0].id
+
+    async def submit_once():
+        async with open_session(db_engine) as db:
+            return await submit_answer(created.session_id, question_id, SubmitAnswerRequest(answer="square root"), db)
+
+    responses = await asyncio.gather(*(submit_once() for _ in range(5)))
+
+    assert len(grading_calls) == 1
+    assert all(response == responses[0] for response in responses)
+    async with open_session(db_engine) as db:
+        answers = (await db.exec(select(QuizAnswer).where(QuizAnswer.session_id == created.session_id))).all()
+        stored_session = await db.get(QuizSession, created.session_id)
+        assert len(answers) == 1
+        assert stored_session is not None
+        assert stored_session.answered_count == 1
+        assert stored_session.completed_at is not None
+
+
+async def test_idempotency_key_replays_the_stored_session_without_regenerating(monkeypatch, db_engine):
+    generate_calls: list[int] = []
+
+    def slow_generate_questions(**kwargs):
+        generate_calls.append(kwargs["num_questions"])
+        time.sleep(0.2)
+        return generate_questions(**kwargs)
+
+    monkeypatch.setattr("app.api.quiz.generate_questions", slow_generate_questions)
+    payload = CreateQuizSessionRequest(
+        topics=[Topic.statistics], difficulty=Difficulty.easy, question_type=QuestionType.mcq, num_questions=2
+    )
+
+    async def create_once():
+        async with open_session(db_engine) as db:
+            return await create_quiz_session(payload, db, idempotency_key="checkout-1")
+
+    concurrent = await asyncio.gather(*(create_once() for _ in range(3)))
+    replayed = await create_once()
+
+    assert len(generate_calls) == 1
+    assert all(response == replayed for response in concurrent)
+    async with open_session(db_engine) as db:
+        assert len((await db.exec(select(QuizSession))).all()) == 1
+        with pytest.raises(HTTPException) as raised:
+            await create_quiz_session(payload.model_copy(update={"num_questions": 3}), db, idempotency_key="checkout-1")
+    assert raised.value.status_code == 422
+
+
+async def test_idempotency_key_waits_for_a_generation_owned_by_another_worker(db_engine):
+    payload = CreateQuizSessionRequest(
+        topics=[Topic.mlops], difficulty=Difficulty.hard, question_type=QuestionType.mcq, num_questions=1
+    )
+    request_hash = request_fingerprint(payload.model_dump(mode="json"))
+    async with open_session(db_engine) as db:
+        assert await run_with_busy_retry(db, lambda tx: claim_idempotency_key(tx, "other-worker", request_hash)) is None
+
+    async def finish_elsewhere():
+        await asyncio.sleep(0.3)
+        async with open_session(db_engine) as db:
+            return await _generate_and_store_session(db, payload, "other-worker")
+
+    async def wait_for_key():
+        async with open_session(db_engine) as db:
+            return await create_quiz_session(payload, db, idempotency_key="other-worker")
+
+    finished, waited = await asyncio.gather(finish_elsewhere(), wait_for_key())
+    assert waited == finished
+
+
+async def test_failed_generation_releases_the_idempotency_key(monkeypatch, db_engine):
+    attempts: list[int] = []
+
+    def flaky_generate_questions(**kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("generation failed")
+        return generate_questions(**kwargs)
+
+    monkeypatch.setattr("app.api.quiz.generate_questions", flaky_generate_questions)
+    payload = CreateQuizSessionRequest(
+        topics=[Topic.statistics], difficulty=Difficulty.easy, question_type=QuestionType.mcq, num_questions=1
+    )
+    async with open_session(db_engine) as db:
+        with pytest.raises(RuntimeError):
+            await create_quiz_session(payload, db, idempotency_key="retry-me")
+        response = await create_quiz_session(payload, db, idempotency_key="retry-me")
+
+    assert len(attempts) == 2
+    assert response.session_id
+
+
+async def test_mcq_submissions_on_an_active_session_only_write(db_engine):
+    async with open_session(db_engine) as db:
+        created = await create_quiz_session(
+            CreateQuizSessionRequest(
+                topics=[Topic.deep_learning],
+                difficulty=Difficulty.medium,
+                question_type=QuestionType.mcq,
+                num_questions=2,
+            ),
+            db,
+        )
+        statements: list[str] = []
+
+        def capture(*args) -> None:
+            statements.append(args[2])
+
+        event.listen(db_engine.sync_engine, "before_cursor_execute", capture)
+        first = await submit_answer(created.session_id, created.questions[0].id, SubmitAnswerRequest(option_index=0), db)
+        repeated = await submit_answer(created.session_id, created.questions[0].id, SubmitAnswerRequest(option_index=1), db)
+        event.remove(db_engine.sync_engine, "before_cursor_execute", capture)
+
+        assert repeated == first
+        assert statements and not any(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+
+        await submit_answer(created.session_id, created.questions[1].id, SubmitAnswerRequest(option_index=0), db)
+        assert _active_sessions.get(created.session_id) is None
+        # Completed sessions are answered from the database on later reads.
+        assert await submit_answer(created.session_id, created.questions[0].id, SubmitAnswerRequest(option_index=1), db) == first
@@ -0,0 +1,164 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlmodel import func, select
+
+from app.api.quiz import create_quiz_session, submit_answer
+from app.db.models import (
+    QuizAnswer,
+    QuizAnswerRollup,
+    QuizQuestion,
+    QuizSession,
+    RegradeCheckpoint,
+    TopicMastery,
+)
+from app.db.retention import run_retention
+from app.db.session import open_session
+from app.quiz import regrade
+from app.quiz.regrade import JudgeUnavailableError, run_regrade
+from app.schemas.quiz import (
+    CreateQuizSessionRequest,
+    Difficulty,
+    QuestionType,
+    SubmitAnswerRequest,
+    Topic,
+)
+
+
+async def _answered_session(monkeypatch, db_engine, num_questions: int) -> str:
+    # Every answer is stored with a stale "incorrect" verdict, as if graded by an older judge.
+    monkeypatch.setattr("app.api.quiz.evaluate_short_answer", lambda **_: (False, "Stale verdict.", {"path": "llm_judge"}))
+    async with open_session(db_engine) as db:
+        created = await create_quiz_session(
+            CreateQuizSessionRequest(
+                topics=[Topic.statistics, Topic.mlops],
+                difficulty=Difficulty.easy,
+                question_type=QuestionType.short_answer,
+                num_questions=num_questions,
+            ),
+            db,
+        )
+        questions = (await db.exec(select(QuizQuestion).where(QuizQuestion.session_id == created.session_id))).all()
+        for index, question in enumerate(sorted(questions, key=lambda question: question.order_index)):
+            # Even positions repeat the expected answer and are correct; odd ones are off topic.
+            answer = question.expected_answer if index % 2 == 0 else "something unrelated entirely"
+            await submit_answer(created.session_id, question.id, SubmitAnswerRequest(answer=answer), db)
+    return created.session_id
+
+
+async def test_regrade_rewrites_stale_verdicts_with_provenance_and_rebuilds_scores(monkeypatch, db_engine):
+    session_id = await _answered_session(monkeypatch, db_engine, num_questions=4)
+
+    result = await run_regrade(db_engine, job="rubric-v2", use_llm=False, workers=2, batch_size=3)
+
+    assert (result.processed, result.changed, result.resumed, result.finished) == (4, 2, False, True)
+    async with open_session(db_engine) as db:
+        answers = (await db.exec(select(QuizAnswer).where(QuizAnswer.session_id == session_id))).all()
+        quiz_session = await db.get(QuizSession, session_id)
+        checkpoint = await db.get(RegradeCheckpoint, "rubric-v2")
+    assert sum(answer.is_correct for answer in answers) == 2
+    for answer in answers:
+        assert answer.judge_trace["regrade"]["job"] == "rubric-v2"
+        assert answer.judge_trace["regrade"]["previous_correct"] is False
+        assert answer.judge_trace["regrade"]["previous_path"] == "llm_judge"
+    assert quiz_session is not None and quiz_session.correct_count == 2
+    assert checkpoint is not None and checkpoint.finished_at is not None
+
+    # A finished job is not run again until it is restarted.
+    assert (await run_regrade(db_engine, job="rubric-v2", use_llm=False, workers=0)).resumed is True
+    assert (await run_regrade(db_engine, job="rubric-v2", use_llm=False, workers=0, restart=True)).changed == 0
+
+
+async def test_interrupted_regrade_resumes_after_the_last_stored_batch(monkeypatch, db_engine):
+    await _answered_session(monkeypatch, db_engine, num_questions=5)
+    graded: list[str] = []
+    grade_locally = regrade._grade_locally
+
+    def counting_grade_locally(items, use_llm):
+        if len(graded) >= 2:
+            raise RuntimeError("worker lost")
+        graded.extend(item.answer_id for item in items)
+        return grade_locally(items, use_llm)
+
+    monkeypatch.setattr("app.quiz.regrade._grade_locally", counting_grade_locally)
+    with pytest.raises(RuntimeError):
+        await run_regrade(db_engine, job="resume", use_llm=False, workers=0, batch_size=2)
+    async with open_session(db_engine) as db:
+        checkpoint = await db.get(RegradeCheckpoint, "resume")
+    assert checkpoint is not None and (checkpoint.processed, checkpoint.finished_at) == (2, None)
+
+    graded_before = list(graded)
+    graded.clear()
+    monkeypatch.setattr("app.quiz.regrade._grade_locally", grade_locally)
+    result = await run_regrade(db_engine, job="resume", use_llm=False, workers=0, batch_size=2)
+
+    assert (result.processed, result.resumed, result.finished) == (5, True, True)
+    async with open_session(db_engine) as db:
+        regraded = (await db.exec(select(QuizAnswer))).all()
+    assert all(answer.judge_trace["regrade"]["job"] == "resume" for answer in regraded)
+    assert len({answer.id for answer in regraded} - set(graded_before)) == 3
+
+
+async def test_answers_the_local_tiers_cannot_decide_go_to_the_judge(monkeypatch, db_engine):
+    session_id = await _answered_session(monkeypatch, db_engine, num_questions=2)
+    judged: list[str] = []
+
+    def fake_judge(**kwargs):
+        judged.append(kwargs["user_answer"])
+        return True, "Accepted by the new judge.", {"path": "llm_judge", "rationale": "Accepted by the new judge."}
+
+    monkeypatch.setattr("app.quiz.regrade.llm_verdict", fake_judge)
+    result = await run_regrade(db_engine, job="new-model", workers=0)
+
+    assert judged == ["something unrelated entirely"]
+    assert result.changed == 2
+    async with open_session(db_engine) as db:
+        quiz_session = await db.get(QuizSession, session_id)
+    assert quiz_session is not None and quiz_session.correct_count == 2
+
+
+async def test_judge_outage_stops_the_regrade_before_the_unjudged_answer(monkeypatch, db_engine):
+    session_id = await _answered_session(monkeypatch, db_engine, num_questions=4)
+    monkeypatch.setattr("app.quiz.evaluator.llm_router.generate_json", lambda **_: None)
+
+    with pytest.raises(JudgeUnavailableError):
+        await run_regrade(db_engine, job="outage", workers=0, batch_size=4)
+
+    # Nothing after the first answer the judge could not grade is touched, and the checkpoint stays before it.
+    async with open_session(db_engine) as db:
+        answers = (await db.exec(select(QuizAnswer).order_by(QuizAnswer.id))).all()
+        checkpoint = await db.get(RegradeCheckpoint, "outage")
+    unjudged = next(index for index, answer in enumerate(answers) if answer.user_answer == "something unrelated entirely")
+    assert all("regrade" in answer.judge_trace for answer in answers[:unjudged])
+    assert all(answer.judge_trace == {"path": "llm_judge"} and not answer.is_correct for answer in answers[unjudged:])
+    assert checkpoint is not None and checkpoint.finished_at is None
+    assert checkpoint.last_answer_id == (answers[unjudged - 1].id if unjudged else None)
+
+    def fake_judge(**_):
+        return False, "Still wrong.", {"path": "llm_judge", "rationale": "Still wrong."}
+
+    monkeypatch.setattr("app.quiz.regrade.llm_verdict", fake_judge)
+    result = await run_regrade(db_engine, job="outage", workers=0, batch_size=4)
+
+    assert result.resumed and result.processed == 4
+    async with open_session(db_engine) as db:
+        quiz_session = await db.get(QuizSession, session_id)
+        answers = (await db.exec(select(QuizAnswer))).all()
+    assert all(answer.judge_trace["regrade"]["job"] == "outage" for answer in answers)
+    assert quiz_session is not None and quiz_session.correct_count == 2
+
+
+async def test_regrade_after_retention_keeps_archived_tallies_and_mastery(monkeypatch, db_engine):
+    await _answered_session(monkeypatch, db_engine, num_questions=4)
+    await run_retention(db_engine, now=datetime.now(UTC) + timedelta(days=365))
+    await _answered_session(monkeypatch, db_engine, num_questions=4)
+
+    result = await run_regrade(db_engine, job="after-retention", use_llm=False, workers=0)
+
+    # Only the hot session is re-graded; the archived one still counts in the daily tallies and topic mastery.
+    assert (result.processed, result.changed) == (4, 2)
+    async with open_session(db_engine) as db:
+        rollups = (await db.exec(select(func.sum(QuizAnswerRollup.answered), func.sum(QuizAnswerRollup.correct)))).one()
+        mastery = (await db.exec(select(func.sum(TopicMastery.answered), func.sum(TopicMastery.correct)))).one()
+    assert tuple(rollups) == (8, 2)
+    assert tuple(mastery) == (8, 2)
@@ -0,0 +1,132 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlmodel import select
+
+from app.api.admin import run_retention_now
+from app.api.quiz import (
+    create_quiz_session,
+    get_session_summary,
+    list_sessions,
+    submit_answer,
+)
+from app.core import coordination
+from app.db.models import QuizAnswer, QuizQuestion, QuizSession, QuizSessionArchive
+from app.db.retention import (
+    RetentionBusyError,
+    decode_archive,
+    read_storage_stats,
+    run_retention,
+    sqlite_database_path,
+)
+from app.db.session import build_async_engine, open_session, prepare_async_database
+from app.schemas.quiz import (
+    CreateQuizSessionRequest,
+    Difficulty,
+    QuestionType,
+    SubmitAnswerRequest,
+    Topic,
+)
+
+
+async def _completed_session(db) -> str:
+    created = await create_quiz_session(
+        CreateQuizSessionRequest(
+            topics=[Topic.statistics],
+            difficulty=Difficulty.easy,
+            question_type=QuestionType.mcq,
+            num_questions=3,
+        ),
+        db,
+    )
+    for question in created.questions:
+        await submit_answer(created.session_id, question.id, SubmitAnswerRequest(option_index=0), db)
+    return created.session_id
+
+
+async def test_retention_archives_old_sessions_and_keeps_scores_hot(db_engine):
+    async with open_session(db_engine) as db:
+        session_ids = [await _completed_session(db) for _ in range(30)]
+        answers = (await db.exec(select(QuizAnswer))).all()
+        for answer in answers:
+            answer.judge_trace = {"path": "llm_judge", "rationale": "x" * 2000}
+        await db.commit()
+        summary_before = await get_session_summary(session_ids[0], Response(), db)
+
+    result = await run_retention(db_engine, now=datetime.now(UTC) + timedelta(days=365))
+
+    assert result.sessions_archived == 30
+    assert result.reclaimed_bytes > 0
+    assert result.after is not None and result.after.auto_vacuum == 2
+    async with open_session(db_engine) as db:
+        assert (await db.exec(select(QuizQuestion))).all() == []
+        assert (await db.exec(select(QuizAnswer))).all() == []
+        archive = await db.get(QuizSessionArchive, session_ids[0])
+        assert archive is not None
+        records = decode_archive(archive.payload)
+        assert [record["kind"] for record in records] == ["session"] + ["question"] * 3 + ["answer"] * 3
+        assert len(records[-1]["judge_trace"]["rationale"]) == 2000
+        assert await get_session_summary(session_ids[0], Response(), db) == summary_before
+        history = await list_sessions(response=Response(), limit=50, db=db)
+        assert len(history.items) == 30
+        stored = await db.get(QuizSession, session_ids[0])
+        assert stored is not None and stored.archived_at is not None
+
+    rerun = await run_retention(db_engine, now=datetime.now(UTC) + timedelta(days=365))
+    assert rerun.sessions_archived == 0
+
+
+async def test_retention_trims_judge_traces_on_recent_answers(db_engine):
+    async with open_session(db_engine) as db:
+        session_id = await _completed_session(db)
+        answers = (await db.exec(select(QuizAnswer).where(QuizAnswer.session_id == session_id))).all()
+        answers[0].judge_trace = {"path": "llm_judge", "rationale": "long explanation"}
+        answers[1].judge_trace = {"path": "exact_or_variant_match"}
+        await db.commit()
+
+    result = await run_retention(db_engine, now=datetime.now(UTC) + timedelta(days=60))
+
+    assert result.sessions_archived == 0
+    assert result.answers_trimmed == 1
+    async with open_session(db_engine) as db:
+        traces = {
+            answer.id: answer.judge_trace
+            for answer in (await db.exec(select(QuizAnswer).where(QuizAnswer.session_id == session_id))).all()
+        }
+    assert traces[answers[0].id] == {"path": "llm_judge"}
+    assert traces[answers[1].id] == {"path": "exact_or_variant_match"}
+    assert traces[answers[2].id] is None
+    database_path = sqlite_database_path(db_engine)
+    assert database_path is not None
+    assert read_storage_stats(database_path).freelist_count <= result.after.freelist_count
+
+
+async def test_scheduled_retention_leaves_the_auto_vacuum_switch_to_an_admin_run(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.core.config.settings.sqlite_auto_vacuum", "NONE")
+    legacy_engine = build_async_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    await prepare_async_database(legacy_engine)
+    monkeypatch.setattr("app.api.admin.get_engine", lambda: legacy_engine)
+    try:
+        async with open_session(legacy_engine) as db:
+            await _completed_session(db)
+
+        # The full-file VACUUM would hold an exclusive lock past writers' busy timeout, so the schedule skips it.
+        scheduled = await run_retention(legacy_engine)
+        assert scheduled.after is not None and scheduled.after.auto_vacuum == 0
+
+        report = await run_retention_now()
+        assert report.storage is not None and report.storage.incremental_auto_vacuum
+    finally:
+        await legacy_engine.dispose()
+
+
+async def test_only_one_worker_runs_retention_at_a_time(monkeypatch, db_engine):
+    monkeypatch.setattr("app.api.admin.get_engine", lambda: db_engine)
+    with coordination.shared_state.slot("retention", limit=1, wait_seconds=0, lease_seconds=60):
+        with pytest.raises(RetentionBusyError):
+            await run_retention(db_engine)
+        with pytest.raises(HTTPException) as busy:
+            await run_retention_now()
+    assert busy.value.status_code == 409
+    assert (await run_retention(db_engine)).sessions_archived == 0
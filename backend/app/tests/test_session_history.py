@@ -0,0 +1,100 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import event
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.quiz import list_sessions
+from app.db.models import QuizSession, QuizSessionTopicScore
+from app.db.session import open_session
+from app.schemas.quiz import Difficulty, Topic
+
+
+async def _seed_sessions(db: AsyncSession, count: int) -> list[str]:
+    base = datetime(2026, 1, 1, tzinfo=UTC)
+    ids: list[str] = []
+    for index in range(count):
+        topic = Topic.statistics if index % 2 else Topic.mlops
+        quiz_session = QuizSession(
+            id=f"session-{index:03d}",
+            topics=[topic.value],
+            difficulty=Difficulty.hard.value if index % 3 == 0 else Difficulty.easy.value,
+            question_type="mcq",
+            num_questions=1,
+            # Pairs of sessions share a timestamp so the id tiebreaker is exercised.
+            created_at=base + timedelta(minutes=index // 2),
+            completed_at=base if index % 4 == 0 else None,
+        )
+        db.add(quiz_session)
+        db.add(QuizSessionTopicScore(session_id=quiz_session.id, topic=topic.value, position=0, total=1))
+        ids.append(quiz_session.id)
+    await db.commit()
+    return ids
+
+
+async def test_cursor_pagination_walks_history_newest_first_without_gaps(db_engine):
+    async with open_session(db_engine) as db:
+        ids = await _seed_sessions(db, 25)
+
+        seen: list[str] = []
+        cursor = None
+        while True:
+            page = await list_sessions(response=Response(), limit=10, cursor=cursor, db=db)
+            seen.extend(item.session_id for item in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert seen == list(reversed(ids))
+
+
+async def test_history_filters_combine_with_cursor(db_engine):
+    async with open_session(db_engine) as db:
+        await _seed_sessions(db, 40)
+
+        first = await list_sessions(response=Response(), limit=3, topic=Topic.mlops, difficulty=Difficulty.hard, db=db)
+        second = await list_sessions(response=Response(), limit=3, topic=Topic.mlops, difficulty=Difficulty.hard, cursor=first.next_cursor, db=db)
+        completed = await list_sessions(response=Response(), limit=100, completed=True, db=db)
+        open_sessions = await list_sessions(response=Response(), limit=100, completed=False, db=db)
+
+    assert [item.session_id for item in first.items + second.items] == [
+        "session-036",
+        "session-030",
+        "session-024",
+        "session-018",
+        "session-012",
+        "session-006",
+    ]
+    assert all(item.completed_at is not None for item in completed.items)
+    assert all(item.completed_at is None for item in open_sessions.items)
+    assert len(completed.items) + len(open_sessions.items) == 40
+
+
+async def test_deep_history_pages_use_the_ordering_index(db_engine):
+    captured: list[tuple[str, tuple]] = []
+
+    def capture(*args) -> None:
+        captured.append((args[2], args[3]))
+
+    async with open_session(db_engine) as db:
+        await _seed_sessions(db, 30)
+        first = await list_sessions(response=Response(), limit=5, db=db)
+        event.listen(db_engine.sync_engine, "before_cursor_execute", capture)
+        for completed in (None, True, False):
+            await list_sessions(response=Response(), limit=5, cursor=first.next_cursor, completed=completed, db=db)
+        event.remove(db_engine.sync_engine, "before_cursor_execute", capture)
+
+    async with db_engine.connect() as connection:
+        for statement, parameters in captured:
+            rows = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plan = " ".join(row[3] for row in rows)
+            assert "USING INDEX ix_quizsession_" in plan
+            assert "TEMP B-TREE" not in plan
+
+
+async def test_invalid_cursor_is_rejected(db_engine):
+    async with open_session(db_engine) as db:
+        with pytest.raises(HTTPException) as raised:
+            await list_sessions(response=Response(), cursor="not-a-cursor", db=db)
+    assert raised.value.status_code == 400
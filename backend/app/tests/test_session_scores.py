@@ -0,0 +1,112 @@
+from fastapi import Response
+from sqlalchemy import event, text
+from sqlmodel import select
+
+from app.api.quiz import (
+    create_quiz_session,
+    get_session_summary,
+    list_sessions,
+    submit_answer,
+)
+from app.db.models import QuizAnswer, QuizQuestion, QuizSession
+from app.db.session import build_async_engine, open_session, prepare_async_database
+from app.schemas.quiz import (
+    CreateQuizSessionRequest,
+    Difficulty,
+    QuestionType,
+    SubmitAnswerRequest,
+    Topic,
+)
+
+
+def _count_statements(engine) -> list[str]:
+    statements: list[str] = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+async def test_scores_are_maintained_on_submit_and_read_in_one_query(db_engine):
+    async with open_session(db_engine) as db:
+        for _ in range(3):
+            created = await create_quiz_session(
+                CreateQuizSessionRequest(
+                    topics=[Topic.machine_learning, Topic.statistics],
+                    difficulty=Difficulty.easy,
+                    question_type=QuestionType.mcq,
+                    num_questions=3,
+                ),
+                db,
+            )
+        questions = (
+            await db.exec(
+                select(QuizQuestion).where(QuizQuestion.session_id == created.session_id).order_by(QuizQuestion.order_index)
+            )
+        ).all()
+        for question in questions:
+            chosen = question.correct_option_index if question.topic_tags[0] == Topic.machine_learning.value else 0
+            await submit_answer(created.session_id, question.id, SubmitAnswerRequest(option_index=chosen), db)
+
+        statements = _count_statements(db_engine)
+        summary = await get_session_summary(created.session_id, Response(), db)
+        assert len(statements) == 1
+        assert summary.score.correct == 2
+        assert summary.score.total == 3
+        assert summary.completed_at is not None
+        assert [(score.topic, score.correct, score.total) for score in summary.by_topic] == [
+            (Topic.machine_learning, 2, 2),
+            (Topic.statistics, 0, 1),
+        ]
+
+        statements.clear()
+        history = await list_sessions(response=Response(), limit=20, offset=0, db=db)
+        assert len(statements) == 1
+        assert len(history.items) == 3
+        assert {item.score.correct for item in history.items} == {0, 2}
+
+
+async def test_migrations_backfill_scores_and_drop_duplicate_answers_in_legacy_databases(tmp_path):
+    engine = build_async_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    async with engine.begin() as connection:
+        for statement in (
+            (
+                "CREATE TABLE quizsession (id VARCHAR PRIMARY KEY, topics JSON NOT NULL, difficulty VARCHAR NOT NULL, "
+                "question_type VARCHAR NOT NULL, num_questions INTEGER NOT NULL, created_at DATETIME NOT NULL, completed_at DATETIME)"
+            ),
+            (
+                "CREATE TABLE quizquestion (id VARCHAR PRIMARY KEY, session_id VARCHAR NOT NULL REFERENCES quizsession(id), "
+                "order_index INTEGER NOT NULL, type VARCHAR NOT NULL, topic_tags JSON NOT NULL, difficulty VARCHAR NOT NULL, "
+                "prompt VARCHAR NOT NULL, options JSON, correct_option_index INTEGER, expected_answer VARCHAR, "
+                "acceptable_variants JSON, grading_rubric VARCHAR, explanation VARCHAR NOT NULL)"
+            ),
+            (
+                "CREATE TABLE quizanswer (id VARCHAR PRIMARY KEY, session_id VARCHAR NOT NULL REFERENCES quizsession(id), "
+                "question_id VARCHAR NOT NULL REFERENCES quizquestion(id), user_answer VARCHAR, option_index INTEGER, "
+                "normalized_user_answer VARCHAR NOT NULL, is_correct BOOLEAN NOT NULL, feedback VARCHAR NOT NULL, "
+                "why_others_wrong JSON, judge_trace JSON, created_at DATETIME NOT NULL)"
+            ),
+            (
+                "INSERT INTO quizsession VALUES ('s1', '[\"Statistics\", \"MLOps technical concepts\"]', 'easy', 'mcq', 3, "
+                "'2026-01-01 00:00:00', NULL)"
+            ),
+            "INSERT INTO quizquestion VALUES ('q1', 's1', 1, 'mcq', '[\"Statistics\"]', 'easy', 'p1', '[]', 0, NULL, NULL, NULL, 'e')",
+            "INSERT INTO quizquestion VALUES ('q2', 's1', 2, 'mcq', '[\"MLOps technical concepts\"]', 'easy', 'p2', '[]', 0, NULL, NULL, NULL, 'e')",
+            "INSERT INTO quizquestion VALUES ('q3', 's1', 3, 'mcq', '[\"Statistics\"]', 'easy', 'p3', '[]', 0, NULL, NULL, NULL, 'e')",
+            "INSERT INTO quizanswer VALUES ('a1', 's1', 'q1', NULL, 0, 'x', 1, 'f', NULL, NULL, '2026-01-01 00:01:00')",
+            "INSERT INTO quizanswer VALUES ('a2', 's1', 'q2', NULL, 1, 'y', 0, 'f', NULL, NULL, '2026-01-01 00:02:00')",
+            "INSERT INTO quizanswer VALUES ('a3', 's1', 'q1', NULL, 0, 'x', 1, 'f', NULL, NULL, '2026-01-01 00:03:00')",
+        ):
+            await connection.execute(text(statement))
+
+    await prepare_async_database(engine)
+
+    async with open_session(engine) as db:
+        legacy_session = await db.get(QuizSession, "s1")
+        assert legacy_session is not None
+        assert (legacy_session.answered_count, legacy_session.correct_count) == (2, 1)
+        assert [answer.id for answer in (await db.exec(select(QuizAnswer).order_by(QuizAnswer.id))).all()] == ["a1", "a2"]
+        summary = await get_session_summary("s1", Response(), db)
+        assert [(score.topic, score.correct, score.total) for score in summary.by_topic] == [
+            (Topic.statistics, 1, 2),
+            (Topic.mlops, 0, 1),
+        ]
+    await engine.dispose()
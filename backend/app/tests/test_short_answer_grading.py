@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 
 from app.llm.ollama import OllamaClient
+from app.llm.router import LLMRouter, LLMTask
 from app.quiz.evaluator import evaluate_short_answer
 
 
@@ -10,7 +11,7 @@ class _JudgePayload(BaseModel):
 
 
 def test_short_answer_uses_deterministic_fallback_when_llm_unavailable(monkeypatch):
-    monkeypatch.setattr("app.quiz.evaluator.ollama_client.generate_json", lambda **_: None)
+    monkeypatch.setattr("app.quiz.evaluator.llm_router.generate_json", lambda **_: None)
 
     is_correct, explanation, trace = evaluate_short_answer(
         prompt="What is overfitting?",
@@ -50,7 +51,8 @@ def test_ollama_client_recovers_from_json_parse_error_with_retry(monkeypatch):
     fake_http_client = _FakeHttpClient()
     monkeypatch.setattr(client, "_client", fake_http_client)
 
-    parsed = client.generate_json(
+    parsed = LLMRouter([client]).generate_json(
+        task=LLMTask.grading,
         prompt="judge this",
         response_model=_JudgePayload,
         max_retries=2,
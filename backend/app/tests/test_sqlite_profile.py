@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from sqlalchemy import func, text
+from sqlmodel import Session, SQLModel, select
+
+from app.db.dialects import UnsupportedDialectError
+from app.db.models import QuizSession
+from app.db.session import (
+    build_async_engine,
+    build_engine,
+    open_session,
+    run_with_busy_retry,
+)
+
+
+def _new_session_row(index: int) -> QuizSession:
+    return QuizSession(
+        topics=["Statistics"],
+        difficulty="easy",
+        question_type="mcq",
+        num_questions=index % 15 + 1,
+    )
+
+
+def test_engines_refuse_dialects_without_on_conflict_upserts():
+    with pytest.raises(UnsupportedDialectError, match="'mysql'"):
+        build_async_engine("mysql://lairn@localhost/lairn")
+    with pytest.raises(UnsupportedDialectError):
+        build_engine("mssql+pyodbc://lairn@localhost/lairn")
+
+
+async def test_sqlite_connections_use_production_pragmas(db_engine):
+    async with db_engine.connect() as connection:
+        assert (await connection.exec_driver_sql("PRAGMA journal_mode")).scalar() == "wal"
+        assert (await connection.exec_driver_sql("PRAGMA synchronous")).scalar() == 1
+        assert (await connection.exec_driver_sql("PRAGMA foreign_keys")).scalar() == 1
+        assert (await connection.exec_driver_sql("PRAGMA busy_timeout")).scalar() == 5000
+        assert (await connection.exec_driver_sql("PRAGMA cache_size")).scalar() == -20000
+    assert db_engine.pool.size() == 10
+
+
+def test_readers_are_not_blocked_by_an_open_write_transaction(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+    SQLModel.metadata.create_all(engine)
+
+    writer_started = threading.Event()
+    release_writer = threading.Event()
+
+    def hold_write_transaction() -> None:
+        with engine.connect() as connection:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            connection.execute(
+                text(
+                    "INSERT INTO quizsession (id, topics, difficulty, question_type, num_questions, created_at) "
+                    "VALUES ('held', '[]', 'easy', 'mcq', 1, '2026-01-01 00:00:00')"
+                )
+            )
+            writer_started.set()
+            release_writer.wait(timeout=5)
+            connection.exec_driver_sql("COMMIT")
+
+    writer = threading.Thread(target=hold_write_transaction)
+    writer.start()
+    try:
+        assert writer_started.wait(timeout=5)
+        started = time.perf_counter()
+        with Session(engine) as db:
+            visible = db.exec(select(func.count()).select_from(QuizSession)).one()
+        assert visible == 0
+        assert time.perf_counter() - started < 0.5
+    finally:
+        release_writer.set()
+        writer.join()
+
+
+async def test_concurrent_readers_and_writers_do_not_fail_with_database_locked(db_engine):
+    writers, rows_per_writer, readers = 8, 25, 8
+    writers_done = asyncio.Event()
+
+    async def write_rows(worker: int) -> None:
+        for index in range(rows_per_writer):
+            row_number = worker * rows_per_writer + index
+            async with open_session(db_engine) as db:
+                await run_with_busy_retry(db, lambda tx, number=row_number: tx.add(_new_session_row(number)))
+
+    async def read_history() -> int:
+        reads = 0
+        while not writers_done.is_set():
+            async with open_session(db_engine) as db:
+                (await db.exec(select(QuizSession).limit(20))).all()
+            reads += 1
+        return reads
+
+    reader_tasks = [asyncio.create_task(read_history()) for _ in range(readers)]
+    await asyncio.gather(*(write_rows(worker) for worker in range(writers)))
+    writers_done.set()
+    reads = await asyncio.gather(*reader_tasks)
+
+    assert sum(reads) > 0
+    async with open_session(db_engine) as db:
+        assert (await db.exec(select(func.count()).select_from(QuizSession))).one() == writers * rows_per_writer
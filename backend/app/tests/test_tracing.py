@@ -0,0 +1,65 @@
+import httpx
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+
+from app.core.metrics import HTTP_REQUEST_DURATION, PATH_TOTAL, Registry
+from app.core.tracing import TracingMiddleware, span
+from app.main import app
+from app.quiz.generator import generate_questions
+from app.schemas.quiz import Difficulty, QuestionType, Topic
+
+
+async def test_threadpool_work_attaches_to_the_request_span_tree():
+    fallbacks_before = PATH_TOTAL.value(stage="generation", path="fallback_no_response")
+    with span("request") as root:
+        await run_in_threadpool(
+            generate_questions,
+            topics=[Topic.statistics],
+            difficulty=Difficulty.easy,
+            question_type=QuestionType.mcq,
+            num_questions=2,
+        )
+
+    [generation] = root.children
+    assert generation.name == "generation"
+    assert generation.attributes["path"] == "fallback_no_response"
+    assert [child.name for child in generation.children] == ["llm.generate_json", "generation.deduplicate"]
+    assert generation.children[0].attributes["path"] in {"failed", "breaker_open"}
+    assert generation.duration is not None and generation.duration >= generation.children[0].duration
+    assert PATH_TOTAL.value(stage="generation", path="fallback_no_response") == fallbacks_before + 1
+
+
+def test_histograms_render_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram("demo_seconds", "Demo latency.", ("route",))
+    for value in (0.004, 0.2, 3.0):
+        latency.observe(value, route='/items/{id}')
+
+    rendered = registry.render()
+    assert '# TYPE demo_seconds histogram' in rendered
+    assert 'demo_seconds_bucket{route="/items/{id}",le="0.005"} 1' in rendered
+    assert 'demo_seconds_bucket{route="/items/{id}",le="0.25"} 2' in rendered
+    assert 'demo_seconds_bucket{route="/items/{id}",le="+Inf"} 3' in rendered
+    assert 'demo_seconds_count{route="/items/{id}"} 3' in rendered
+
+
+async def test_middleware_labels_latency_by_route_template_and_serves_metrics():
+    demo = FastAPI()
+    demo.add_middleware(TracingMiddleware)
+
+    @demo.get("/items/{item_id}")
+    def read_item(item_id: str) -> dict[str, str]:
+        return {"id": item_id}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=demo), base_url="http://test") as client:
+        for item_id in ("a", "b"):
+            assert (await client.get(f"/items/{item_id}")).status_code == 200
+        assert (await client.get("/missing")).status_code == 404
+
+    assert HTTP_REQUEST_DURATION.count(method="GET", route="/items/{item_id}", status="200") >= 2
+    assert HTTP_REQUEST_DURATION.count(method="GET", route="unmatched", status="404") >= 1
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'lairn_http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="200"}' in response.text
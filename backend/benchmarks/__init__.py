@@ -0,0 +1 @@
+# Marks benchmarks as a package so scripts run with `python -m benchmarks.<name>`.
@@ -0,0 +1,57 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+
+# Runs in a fresh interpreter so module caches from the caller do not hide import cost.
+_CHILD = """
+import json, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    status = client.get("/health").status_code
+healthy = time.perf_counter()
+print(json.dumps({"import_ms": (imported - started) * 1000, "first_health_ms": (healthy - started) * 1000, "status": status}))
+"""
+
+
+def measure_cold_start(database_path: Path) -> dict[str, float]:
+    env = {
+        **os.environ,
+        "SQLITE_PATH": str(database_path),
+        # A closed local port: /health reports Ollama as unreachable without waiting on a timeout.
+        "OLLAMA_BASE_URL": "http://127.0.0.1:9",
+        "PYTHONPATH": str(BACKEND_ROOT),
+    }
+    completed = subprocess.run(
+        [sys.executable, "-c", _CHILD], cwd=BACKEND_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    if result["status"] != 200:
+        raise RuntimeError(f"/health returned {result['status']}")
+    return {"import_ms": round(result["import_ms"], 1), "first_health_ms": round(result["first_health_ms"], 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time app import and the first /health response in a new process.")
+    parser.add_argument("--restarts", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = Path(directory) / "cold-start.db"
+        first_boot = measure_cold_start(database_path)
+        restarts = [measure_cold_start(database_path) for _ in range(args.restarts)]
+
+    restarts.sort(key=lambda run: run["first_health_ms"])
+    print(json.dumps({"first_boot": first_boot, "median_restart": restarts[len(restarts) // 2]}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import argparse
+import json
+import platform
+import sys
+import timeit
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import insert
+
+from app.db.models import QuizAnswer, QuizQuestion, QuizSession
+from app.db.scores import rebuild_session_scores
+from app.db.session import build_engine, prepare_database
+from app.quiz import generator
+from app.quiz.evaluator import _tokenize, fallback_verdict, normalize_answer
+from app.schemas.quiz import Difficulty, QuestionType, Topic
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "hot_paths.json"
+DEFAULT_THRESHOLD = 0.25
+
+_ANSWER_SENTENCE = "The model memorizes training-data noise, and performs POORLY on unseen examples!  "
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    scale: int
+    # Builds the inputs once and returns the call to time, so setup cost stays out of the measurement.
+    prepare: Callable[[int], Callable[[], object]]
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.scale}]"
+
+
+def _answer_text(words: int) -> str:
+    sentence = _ANSWER_SENTENCE.split()
+    return " ".join(sentence[index % len(sentence)] for index in range(words))
+
+
+def _normalize_answer(words: int) -> Callable[[], object]:
+    text = _answer_text(words)
+    return lambda: normalize_answer(text)
+
+
+def _tokenize_answer(words: int) -> Callable[[], object]:
+    text = _answer_text(words)
+    return lambda: _tokenize(text)
+
+
+def _fallback_grading(words: int) -> Callable[[], object]:
+    user_answer = _answer_text(words)
+    variants = ["memorizes training data", "poor generalization on unseen data", "fits noise instead of signal"]
+    return lambda: fallback_verdict(
+        expected_answer="A model learns training noise and fails to generalize.",
+        acceptable_variants=variants,
+        user_answer=user_answer,
+    )
+
+
+def _fallback_questions(count: int) -> Callable[[], object]:
+    return lambda: generator._fallback_questions(
+        topics=list(Topic), difficulty=Difficulty.medium, question_type=QuestionType.mixed, num_questions=count
+    )
+
+
+@contextmanager
+def _without_regeneration() -> Iterator[None]:
+    # Regeneration is an LLM round trip; the benchmark measures the pure-Python variation numbering around it.
+    with mock.patch.object(generator, "_regenerate_duplicate_question", lambda **_: None):
+        yield
+
+
+def _deduplicate_repeated_prompts(count: int) -> Callable[[], object]:
+    # A single-topic fallback session repeats one prompt, the worst case for variation numbering.
+    questions = generator._fallback_questions(
+        topics=[Topic.statistics], difficulty=Difficulty.easy, question_type=QuestionType.mcq, num_questions=count
+    )
+
+    def run() -> object:
+        with _without_regeneration():
+            return generator._deduplicate_question_prompts(questions)
+
+    return run
+
+
+def _session_score_rebuild(answers: int) -> Callable[[], object]:
+    engine = build_engine("sqlite://")
+    prepare_database(engine)
+    topics = [topic.value for topic in Topic]
+    created_at = datetime(2026, 1, 1, tzinfo=UTC)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(QuizSession),
+            [{"id": "bench", "topics": topics, "difficulty": "easy", "question_type": "mcq", "num_questions": answers, "created_at": created_at}],
+        )
+        connection.execute(
+            insert(QuizQuestion),
+            [
+                {
+                    "id": f"q{index}",
+                    "session_id": "bench",
+                    "order_index": index,
+                    "type": "mcq",
+                    "topic_tags": [topics[index % len(topics)]],
+                    "difficulty": "easy",
+                    "prompt": f"prompt {index}",
+                    "options": ["a", "b", "c", "d"],
+                    "correct_option_index": 0,
+                    "explanation": "e",
+                }
+                for index in range(answers)
+            ],
+        )
+        connection.execute(
+            insert(QuizAnswer),
+            [
+                {
+                    "id": f"a{index}",
+                    "session_id": "bench",
+                    "question_id": f"q{index}",
+                    "option_index": index % 4,
+                    "normalized_user_answer": "a",
+                    "is_correct": index % 4 == 0,
+                    "feedback": "f",
+                    "created_at": created_at,
+                }
+                for index in range(answers)
+            ],
+        )
+
+    def run() -> object:
+        with engine.begin() as connection:
+            rebuild_session_scores(connection, ["bench"])
+        return None
+
+    return run
+
+
+CASES: list[Case] = [
+    *(Case("normalize_answer", words, _normalize_answer) for words in (8, 64, 512)),
+    *(Case("tokenize", words, _tokenize_answer) for words in (8, 64, 512)),
+    *(Case("deterministic_fallback", words, _fallback_grading) for words in (8, 64, 512)),
+    *(Case("fallback_questions", count, _fallback_questions) for count in (15, 100, 1000)),
+    *(Case("deduplicate_repeated_prompts", count, _deduplicate_repeated_prompts) for count in (15, 100, 1000)),
+    *(Case("session_score_rebuild", answers, _session_score_rebuild) for answers in (1, 100, 1000, 10000)),
+]
+
+
+def _seconds_per_call(call: Callable[[], object], repeat: int, min_time: float) -> float:
+    timer = timeit.Timer(call)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 10
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run_cases(cases: list[Case], *, repeat: int = 5, min_time: float = 0.05) -> dict[str, float]:
+    """Best-of-`repeat` microseconds per call for each case."""
+    return {case.key: round(_seconds_per_call(case.prepare(case.scale), repeat, min_time) * 1e6, 3) for case in cases}
+
+
+def compare(current: dict[str, float], baseline: dict[str, float], threshold: float = DEFAULT_THRESHOLD) -> list[dict[str, object]]:
+    rows: list[dict[str, object]] = []
+    for key, micros in current.items():
+        reference = baseline.get(key)
+        ratio = round(micros / reference, 3) if reference else None
+        rows.append({"case": key, "us": micros, "baseline_us": reference, "ratio": ratio, "regressed": bool(ratio and ratio > 1 + threshold)})
+    return rows
+
+
+def _environment() -> dict[str, str]:
+    return {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time generator, evaluator and score hot paths across input sizes.")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", action="store_true", help=f"Store results as the baseline ({BASELINE_PATH.name}).")
+    parser.add_argument("--compare", action="store_true", help="Compare with the stored baseline; exit 1 on regressions.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown before a case is flagged.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    results = run_cases([case for case in CASES if args.filter in case.name], repeat=args.repeat)
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {"results": {}}
+        stored = {"environment": _environment(), "results": {**stored["results"], **results}}
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+
+    if not args.compare:
+        print(json.dumps(results, indent=2))
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    rows = compare(results, baseline["results"], args.threshold)
+    print(json.dumps({"baseline_environment": baseline["environment"], "environment": _environment(), "cases": rows}, indent=2))
+    if any(row["regressed"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
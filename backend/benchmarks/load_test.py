@@ -0,0 +1,346 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from app.core.config import settings
+from app.quiz.generator import TOPIC_BANK
+from app.schemas.quiz import QuestionType, Topic
+from benchmarks.ollama_stand_in import PROFILES, OllamaStandIn
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+ANSWER_KINDS = ("correct", "paraphrased", "wrong")
+_PATH_SAMPLE = re.compile(r'^lairn_path_total\{stage="(?P<stage>[^"]+)",path="(?P<path>[^"]+)"\} (?P<value>\S+)$')
+_HEDGE_SAMPLE = re.compile(r'^lairn_llm_hedges_total\{task="[^"]+",outcome="(?P<outcome>[^"]+)"\} (?P<value>\S+)$')
+_VARIATION_SUFFIX = re.compile(r" \(variation \d+\)$")
+
+
+@dataclass
+class LoadConfig:
+    sessions: int = 50
+    concurrency: int = 10
+    # New users per second with Poisson arrivals; 0 starts every user at once, bounded by `concurrency`.
+    arrival_rate: float = 0.0
+    questions_per_session: int = 5
+    answer_mix: dict[str, float] = field(default_factory=lambda: {"correct": 0.5, "paraphrased": 0.3, "wrong": 0.2})
+    seed: int = 0
+
+
+@dataclass
+class AnswerKey:
+    correct_option_index: int | None
+    expected_answer: str | None
+
+
+@dataclass
+class LoadRecorder:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    answers: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    sessions_completed: int = 0
+
+    async def call(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[endpoint] += 1
+            raise
+        finally:
+            self.latencies[endpoint].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[endpoint] += 1
+            response.raise_for_status()
+        return response
+
+
+def _normalize_prompt(prompt: str) -> str:
+    return _VARIATION_SUFFIX.sub("", prompt)
+
+
+def fallback_answer_key() -> dict[str, AnswerKey]:
+    keys: dict[str, AnswerKey] = {}
+    for bank in TOPIC_BANK.values():
+        for source in bank.values():
+            keys[str(source["prompt"])] = AnswerKey(source.get("correct_option_index"), source.get("expected_answer"))  # type: ignore[arg-type]
+    return keys
+
+
+def _answer_key(prompt: str, stand_in: OllamaStandIn | None, fallback: dict[str, AnswerKey]) -> AnswerKey | None:
+    prompt = _normalize_prompt(prompt)
+    if stand_in is not None and prompt in stand_in.questions:
+        question = stand_in.questions[prompt]
+        return AnswerKey(question["correct_option_index"], question["expected_answer"])
+    return fallback.get(prompt)
+
+
+def _paraphrase(expected: str) -> str:
+    # Reordered words defeat the substring fast path, so the answer goes to the LLM judge (or its fallback).
+    return "basically " + " ".join(reversed(expected.rstrip(".").split()))
+
+
+def _answer_payload(question: dict[str, Any], key: AnswerKey | None, kind: str, rng: random.Random) -> dict[str, Any]:
+    if question["type"] == QuestionType.mcq.value:
+        options = len(question.get("options") or []) or 4
+        correct = key.correct_option_index if key and key.correct_option_index is not None else rng.randrange(options)
+        return {"option_index": correct if kind != "wrong" else (correct + 1) % options}
+    expected = key.expected_answer if key and key.expected_answer else question["prompt"]
+    if kind == "correct":
+        return {"answer": expected}
+    if kind == "paraphrased":
+        return {"answer": _paraphrase(expected)}
+    return {"answer": "I am not sure, something about databases"}
+
+
+async def _user_flow(
+    client: httpx.AsyncClient,
+    recorder: LoadRecorder,
+    config: LoadConfig,
+    rng: random.Random,
+    stand_in: OllamaStandIn | None,
+    fallback: dict[str, AnswerKey],
+) -> None:
+    payload = {
+        "topics": [topic.value for topic in rng.sample(list(Topic), rng.randint(1, 3))],
+        "difficulty": rng.choice(["easy", "medium", "hard"]),
+        "question_type": rng.choice([question_type.value for question_type in QuestionType]),
+        "num_questions": config.questions_per_session,
+    }
+    created = (
+        await recorder.call(
+            client, "create_session", "POST", "/api/v1/quiz/sessions", json=payload, headers={"Idempotency-Key": str(uuid.uuid4())}
+        )
+    ).json()
+    session_id = created["session_id"]
+    kinds, weights = zip(*config.answer_mix.items())
+    for question in created["questions"]:
+        kind = rng.choices(kinds, weights)[0]
+        recorder.answers[kind] += 1
+        await recorder.call(
+            client,
+            "submit_answer",
+            "POST",
+            f"/api/v1/quiz/sessions/{session_id}/questions/{question['id']}/answer",
+            json=_answer_payload(question, _answer_key(question["prompt"], stand_in, fallback), kind, rng),
+        )
+    await recorder.call(client, "session_summary", "GET", f"/api/v1/quiz/sessions/{session_id}/summary")
+    first_page = (await recorder.call(client, "history", "GET", "/api/v1/quiz/sessions", params={"limit": 10})).json()
+    if first_page.get("next_cursor"):
+        await recorder.call(client, "history", "GET", "/api/v1/quiz/sessions", params={"limit": 10, "cursor": first_page["next_cursor"]})
+    recorder.sessions_completed += 1
+
+
+async def _path_counts(client: httpx.AsyncClient) -> dict[tuple[str, str], float]:
+    response = await client.get("/metrics")
+    if response.status_code != 200:
+        return {}
+    counts: dict[tuple[str, str], float] = defaultdict(float)
+    for line in response.text.splitlines():
+        if match := _PATH_SAMPLE.match(line):
+            counts[(match["stage"], match["path"])] = float(match["value"])
+        elif match := _HEDGE_SAMPLE.match(line):
+            # Summed over tasks and reported apart from the stage paths.
+            counts[("hedge", match["outcome"])] += float(match["value"])
+    return counts
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    # Nearest-rank percentile, reported in milliseconds.
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return round(sorted_values[index] * 1000, 2)
+
+
+def _rate(numerator: float, denominator: float) -> float | None:
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def _path_rates(before: dict[tuple[str, str], float], after: dict[tuple[str, str], float]) -> dict[str, Any]:
+    delta: dict[str, dict[str, float]] = defaultdict(dict)
+    for (stage, path), value in after.items():
+        delta[stage][path] = value - before.get((stage, path), 0.0)
+    hedges = delta.pop("hedge", {})
+    generation = delta.get("generation", {})
+    grading = delta.get("grading", {})
+    llm_graded = grading.get("llm_judge", 0.0) + grading.get("deterministic_fallback", 0.0)
+    return {
+        "generation_fallback_rate": _rate(sum(value for path, value in generation.items() if path.startswith("fallback")), sum(generation.values())),
+        # Only answers that needed the LLM judge count; exact and variant matches never call it.
+        "grading_fallback_rate": _rate(grading.get("deterministic_fallback", 0.0), llm_graded),
+        "paths": {stage: {path: int(value) for path, value in paths.items() if value} for stage, paths in delta.items()},
+        "llm_hedges": {outcome: int(value) for outcome, value in hedges.items() if value},
+    }
+
+
+async def run_load(client: httpx.AsyncClient, config: LoadConfig, stand_in: OllamaStandIn | None = None) -> dict[str, Any]:
+    rng = random.Random(config.seed)
+    fallback = fallback_answer_key()
+    recorder = LoadRecorder()
+    limiter = asyncio.Semaphore(config.concurrency)
+    calls_before = stand_in.calls if stand_in else 0
+    cancelled_before = len(stand_in.cancelled_remaining_ms) if stand_in else 0
+    paths_before = await _path_counts(client)
+    failed_sessions = 0
+
+    async def user(user_rng: random.Random) -> None:
+        nonlocal failed_sessions
+        async with limiter:
+            try:
+                await _user_flow(client, recorder, config, user_rng, stand_in, fallback)
+            except httpx.HTTPError:
+                failed_sessions += 1
+
+    started = time.perf_counter()
+    tasks: list[asyncio.Task[None]] = []
+    for _ in range(config.sessions):
+        tasks.append(asyncio.create_task(user(random.Random(rng.random()))))
+        if config.arrival_rate > 0:
+            await asyncio.sleep(rng.expovariate(config.arrival_rate))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    endpoints: dict[str, Any] = {}
+    for endpoint, values in sorted(recorder.latencies.items()):
+        ordered = sorted(values)
+        endpoints[endpoint] = {
+            "requests": len(ordered),
+            "errors": recorder.errors.get(endpoint, 0),
+            "error_rate": _rate(recorder.errors.get(endpoint, 0), len(ordered)),
+            "p50_ms": _percentile(ordered, 0.50),
+            "p95_ms": _percentile(ordered, 0.95),
+            "p99_ms": _percentile(ordered, 0.99),
+        }
+    total_requests = sum(len(values) for values in recorder.latencies.values())
+    return {
+        "config": {
+            "sessions": config.sessions,
+            "concurrency": config.concurrency,
+            "arrival_rate": config.arrival_rate,
+            "questions_per_session": config.questions_per_session,
+            "answer_mix": config.answer_mix,
+        },
+        "elapsed_seconds": round(elapsed, 2),
+        "sessions_completed": recorder.sessions_completed,
+        "sessions_failed": failed_sessions,
+        "throughput_sessions_per_second": _rate(recorder.sessions_completed, elapsed),
+        "error_rate": _rate(sum(recorder.errors.values()), total_requests),
+        "answers": dict(recorder.answers),
+        "endpoints": endpoints,
+        **_path_rates(paths_before, await _path_counts(client)),
+        "ollama_calls_per_session": _rate(stand_in.calls - calls_before, config.sessions) if stand_in else None,
+        # Exact for the stand-in: how long each call cancelled by a winning hedge still had left to run.
+        "hedge_saved_ms": _saved_summary(stand_in.cancelled_remaining_ms[cancelled_before:]) if stand_in else None,
+    }
+
+
+def _saved_summary(remaining_ms: list[float]) -> dict[str, Any]:
+    ordered = sorted(value / 1000 for value in remaining_ms)
+    if not ordered:
+        return {"cancelled_calls": 0}
+    return {"cancelled_calls": len(ordered), "p50_ms": _percentile(ordered, 0.50), "max_ms": _percentile(ordered, 1.0)}
+
+
+@contextmanager
+def _spawned_app(port: int, ollama_url: str, model: str, hedge: bool = False) -> Iterator[str]:
+    directory = tempfile.mkdtemp(prefix="lairn-load-")
+    env = {
+        **os.environ,
+        "SQLITE_PATH": str(Path(directory) / "load.db"),
+        "OLLAMA_BASE_URL": ollama_url,
+        "OLLAMA_MODEL": model,
+        "LLM_HEDGE_ENABLED": str(hedge).lower(),
+        "PYTHONPATH": str(BACKEND_ROOT),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"], cwd=BACKEND_ROOT, env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                time.sleep(0.2)
+        else:
+            raise RuntimeError("The app did not become healthy within 30 seconds")
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def _parse_mix(value: str) -> dict[str, float]:
+    mix = {kind: float(weight) for kind, weight in (part.split("=", 1) for part in value.split(","))}
+    unknown = set(mix) - set(ANSWER_KINDS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown answer kinds: {sorted(unknown)}")
+    return mix
+
+
+async def _main(args: argparse.Namespace) -> dict[str, Any]:
+    config = LoadConfig(
+        sessions=args.sessions,
+        concurrency=args.concurrency,
+        arrival_rate=args.rate,
+        questions_per_session=args.questions,
+        answer_mix=args.mix,
+        seed=args.seed,
+    )
+    stand_in = OllamaStandIn(PROFILES[args.llm], model=args.model, port=args.stand_in_port) if args.llm in PROFILES else None
+    with stand_in or nullcontext():
+        ollama_url = stand_in.url if stand_in else "http://127.0.0.1:9" if args.llm == "down" else args.ollama_url
+        with _spawned_app(args.app_port, ollama_url, args.model, args.hedge) if args.spawn_app else nullcontext(args.base_url) as base_url:
+            async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout) as client:
+                return await run_load(client, config, stand_in)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drive realistic quiz flows against a running app and report latency SLOs.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="App to target when --spawn-app is not set.")
+    parser.add_argument("--spawn-app", action="store_true", help="Start uvicorn on a temporary database wired to the LLM stand-in.")
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=0.0, help="New users per second (Poisson); 0 starts all at once.")
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--mix", type=_parse_mix, default={"correct": 0.5, "paraphrased": 0.3, "wrong": 0.2})
+    parser.add_argument(
+        "--llm",
+        choices=[*PROFILES, "down", "real"],
+        default="fast",
+        help="LLM stand-in profile; 'down' points at a closed port, 'real' uses --ollama-url.",
+    )
+    parser.add_argument("--hedge", action="store_true", help="Enable LLM request hedging in the spawned app.")
+    parser.add_argument("--stand-in-port", type=int, default=11435, help="Point the target app's OLLAMA_BASE_URL here.")
+    parser.add_argument("--ollama-url", default="http://localhost:11434")
+    parser.add_argument("--model", default=settings.ollama_model)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Also write the JSON report here.")
+    args = parser.parse_args()
+
+    report = asyncio.run(_main(args))
+    rendered = json.dumps(report, indent=2)
+    print(rendered)
+    if args.output:
+        args.output.write_text(rendered + "\n")
+
+
+if __name__ == "__main__":
+    main()
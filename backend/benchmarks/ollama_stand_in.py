@@ -0,0 +1,255 @@
+import ast
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Self
+
+
+@dataclass(frozen=True)
+class StandInProfile:
+    latency_ms: float
+    jitter_ms: float = 0.0
+    # Share of /api/generate calls answered with HTTP 500 and with a body that is not the requested JSON.
+    error_rate: float = 0.0
+    invalid_rate: float = 0.0
+    # Share of calls that stall for `stall_ms` instead, the long tail hedging is meant to cut.
+    stall_rate: float = 0.0
+    stall_ms: float = 0.0
+    # Simulated prompt evaluation: cost per prompt word not covered by a cached prefix, and how many recent
+    # prompts per model keep their prefix cached (Ollama's parallel slots).
+    prompt_eval_ms_per_word: float = 0.5
+    prompt_cache_slots: int = 4
+
+
+PROFILES: dict[str, StandInProfile] = {
+    "fast": StandInProfile(latency_ms=20, jitter_ms=10),
+    "realistic": StandInProfile(latency_ms=800, jitter_ms=400, invalid_rate=0.05),
+    "slow": StandInProfile(latency_ms=4000, jitter_ms=1000),
+    "flaky": StandInProfile(latency_ms=200, jitter_ms=100, error_rate=0.2, invalid_rate=0.1),
+    "tail": StandInProfile(latency_ms=300, jitter_ms=100, stall_rate=0.05, stall_ms=8000),
+}
+
+
+def _line_value(prompt: str, label: str) -> str | None:
+    match = re.search(rf"^{re.escape(label)}:\s*(.+?)\.?$", prompt, flags=re.MULTILINE)
+    return match.group(1).strip() if match else None
+
+
+def _tokens(value: str) -> set[str]:
+    return set(re.findall(r"[a-z0-9]+", value.lower()))
+
+
+def _shared_prefix(words: list[str], other: list[str]) -> int:
+    count = 0
+    for word, other_word in zip(words, other):
+        if word != other_word:
+            break
+        count += 1
+    return count
+
+
+def _content(text: str, chat: bool) -> dict[str, Any]:
+    return {"message": {"role": "assistant", "content": text}} if chat else {"response": text}
+
+
+class OllamaStandIn:
+    """Local HTTP server speaking the slice of the Ollama API the backend uses, with scripted latency and faults.
+
+    Generated questions get unique prompts and are remembered, so load drivers can look up the right answer.
+    `model` may list several installed models; calls for any other model get Ollama's 404.
+    Streamed calls spread their latency over chunks; a client that disconnects early is counted in `cancelled`, with
+    the time the call still had left in `cancelled_remaining_ms`.
+    `/api/generate` and `/api/chat` both report `prompt_eval_count`/`prompt_eval_duration` for the words past the
+    longest prefix shared with a recent prompt to the same model, like Ollama's KV cache reuse.
+    """
+
+    def __init__(
+        self, profile: StandInProfile, *, model: str | list[str], host: str = "127.0.0.1", port: int = 0, seed: int = 0
+    ) -> None:
+        self.profile = profile
+        self.models = [model] if isinstance(model, str) else list(model)
+        self.model = self.models[0]
+        self.questions: dict[str, dict[str, Any]] = {}
+        self.calls = 0
+        self.calls_by_model: Counter[str] = Counter()
+        self.cancelled = 0
+        self.cancelled_remaining_ms: list[float] = []
+        self._recent_prompts: dict[str, deque[list[str]]] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *_args: object) -> None:
+                return None
+
+            def do_GET(self) -> None:
+                if self.path == "/api/tags":
+                    self._send(200, {"models": [{"name": name} for name in stand_in.models]})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                chat = self.path == "/api/chat"
+                model = body.get("model", stand_in.model)
+                if self.path not in ("/api/generate", "/api/chat"):
+                    self._send(404, {"error": "not found"})
+                    return
+                if model not in stand_in.models:
+                    self._send(404, {"error": f"model '{model}' not found"})
+                    return
+                # Chat messages are rendered back to back, the same text the single-prompt layout sends.
+                prompt = "".join(message.get("content", "") for message in body.get("messages", [])) if chat else body.get("prompt", "")
+                status, payload, delay = stand_in.generate(prompt, model=model)
+                if status != 200:
+                    time.sleep(delay)
+                    self._send(status, payload)
+                    return
+                stats = stand_in.prompt_eval(prompt, model)
+                delay += stats["prompt_eval_duration"] / 1e9
+                if body.get("stream"):
+                    self._stream(payload, delay, chat, stats)
+                else:
+                    time.sleep(delay)
+                    text = payload.pop("response")
+                    self._send(200, {**payload, **_content(text, chat), **stats})
+
+            def _stream(self, payload: dict[str, Any], delay: float, chat: bool, stats: dict[str, int], pieces: int = 8) -> None:
+                text = payload["response"]
+                size = -(-len(text) // pieces) or 1
+                chunks = [text[start : start + size] for start in range(0, len(text), size)] or [""]
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                for index, chunk in enumerate(chunks):
+                    time.sleep(delay / len(chunks))
+                    done = index == len(chunks) - 1
+                    line = {"model": payload["model"], **_content(chunk, chat), "done": done, **(stats if done else {})}
+                    try:
+                        self.wfile.write(json.dumps(line).encode() + b"\n")
+                        self.wfile.flush()
+                    except (BrokenPipeError, ConnectionResetError):
+                        with stand_in._lock:
+                            stand_in.cancelled += 1
+                            stand_in.cancelled_remaining_ms.append(delay * (len(chunks) - index - 1) / len(chunks) * 1000)
+                        return
+
+            def _send(self, status: int, payload: dict[str, Any]) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def prompt_eval(self, prompt: str, model: str) -> dict[str, int]:
+        words = prompt.split()
+        with self._lock:
+            recent = self._recent_prompts.setdefault(model, deque(maxlen=max(1, self.profile.prompt_cache_slots)))
+            cached = max((_shared_prefix(words, previous) for previous in recent), default=0)
+            recent.append(words)
+        evaluated = len(words) - cached
+        return {
+            "prompt_eval_count": evaluated,
+            "prompt_eval_duration": int(evaluated * self.profile.prompt_eval_ms_per_word * 1e6),
+        }
+
+    def generate(self, prompt: str, *, model: str | None = None) -> tuple[int, dict[str, Any], float]:
+        """Plan one call: status, body and how long to take (the handler does the waiting)."""
+        model = model or self.model
+        with self._lock:
+            self.calls += 1
+            self.calls_by_model[model] += 1
+            roll = self._rng.random()
+            delay = max(0.0, self.profile.latency_ms + self._rng.uniform(-1, 1) * self.profile.jitter_ms) / 1000
+            if self._rng.random() < self.profile.stall_rate:
+                delay = self.profile.stall_ms / 1000
+        if roll < self.profile.error_rate:
+            return 500, {"error": "model runner crashed"}, delay
+        if roll < self.profile.error_rate + self.profile.invalid_rate:
+            return 200, {"model": model, "response": "I'm sorry, here is some text instead of JSON."}, delay
+        if "strict quiz grader" in prompt:
+            response: dict[str, Any] = self._judge(prompt)
+        elif "Generate exactly one quiz question" in prompt:
+            response = {"questions": [self._question(
+                topic=_line_value(prompt, "Required topic tag") or "Statistics",
+                difficulty=_line_value(prompt, "Required difficulty") or "easy",
+                question_type=_line_value(prompt, "Required type") or "mcq",
+            )]}
+        else:
+            topics = ast.literal_eval(_line_value(prompt, "Requested topics") or "['Statistics']")
+            question_type = _line_value(prompt, "Question type") or "mcq"
+            difficulty = _line_value(prompt, "Difficulty") or "easy"
+            count = int(_line_value(prompt, "Num questions") or 1)
+            response = {"questions": [
+                self._question(
+                    topic=topics[index % len(topics)],
+                    difficulty=difficulty,
+                    question_type=self._rng.choice(["mcq", "short-answer"]) if question_type == "mixed" else question_type,
+                )
+                for index in range(count)
+            ]}
+        return 200, {"model": model, "response": json.dumps(response), "done": True}, delay
+
+    def _question(self, *, topic: str, difficulty: str, question_type: str) -> dict[str, Any]:
+        tag = uuid.uuid4().hex[:8]
+        if question_type == "mcq":
+            with self._lock:
+                correct = self._rng.randrange(4)
+            question: dict[str, Any] = {
+                "type": "mcq",
+                "prompt": f"[{tag}] Which statement about {topic} is accurate?",
+                "options": [f"Statement {letter} about {topic}" for letter in "ABCD"],
+                "correct_option_index": correct,
+                "expected_answer": None,
+                "acceptable_variants": None,
+                "grading_rubric": None,
+            }
+        else:
+            expected = f"{topic} concept {tag} explains model behaviour on unseen data"
+            question = {
+                "type": "short-answer",
+                "prompt": f"[{tag}] Explain the core idea behind this {topic} concept.",
+                "options": None,
+                "correct_option_index": None,
+                "expected_answer": expected,
+                "acceptable_variants": [f"concept {tag}"],
+                "grading_rubric": f"Must mention concept {tag} and unseen data.",
+            }
+        question.update(topic_tags=[topic], difficulty=difficulty, explanation=f"Generated by the stand-in for {topic}.")
+        self.questions[question["prompt"]] = question
+        return question
+
+    @staticmethod
+    def _judge(prompt: str) -> dict[str, Any]:
+        expected = _tokens(_line_value(prompt, "Expected answer") or "")
+        answered = _tokens(_line_value(prompt, "User answer") or "")
+        overlap = len(expected & answered) / max(len(expected), 1)
+        return {"is_correct": overlap >= 0.6, "rationale": f"Token overlap with the expected answer is {overlap:.2f}."}
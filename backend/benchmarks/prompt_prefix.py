@@ -0,0 +1,178 @@
+import argparse
+import json
+import random
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import LLM_PROMPT_EVAL_DURATION, LLM_PROMPT_EVAL_TOKENS
+from app.llm.ollama import OllamaClient
+from app.llm.router import LLMRouter, LLMTask
+from app.quiz import evaluator, generator
+from app.quiz.evaluator import ShortAnswerJudgeResult
+from app.quiz.generator import GeneratedQuestion, LLMGeneratedQuestions
+from app.schemas.quiz import Difficulty, QuestionType, Topic
+from benchmarks.ollama_stand_in import OllamaStandIn, StandInProfile
+
+CALLS = ("generation", "regeneration", "grading")
+# Each round is one session's worth of calls: a batch generation, one duplicate regeneration, then judge calls.
+_ANSWERS = ("basically it is about the data", "I think it relates to the loss", "not sure, maybe variance")
+
+# Single /api/generate prompts as sent before instructions moved into a shared system message.
+_LEGACY_SCHEMA = (
+    "Output schema: {\"questions\": [{"
+    "\"type\": \"mcq|short-answer\", "
+    f"\"topic_tags\": [\"{'|'.join(topic.value for topic in Topic)}\"], "
+    "\"difficulty\": \"easy|medium|hard\", "
+    "\"prompt\": \"string\", "
+    "\"options\": [\"a\",\"b\",\"c\",\"d\"] or null, "
+    "\"correct_option_index\": 0..3 or null, "
+    "\"expected_answer\": \"string\" or null, "
+    "\"acceptable_variants\": [\"string\"] or null, "
+    "\"grading_rubric\": \"string\" or null, "
+    "\"explanation\": \"2-6 sentence explanation\""
+    "}]}.\n"
+)
+
+
+def _legacy_generation(topics: list[Topic], difficulty: Difficulty) -> tuple[None, str]:
+    return None, (
+        "Generate quiz questions as strict JSON only.\n"
+        + _LEGACY_SCHEMA
+        + "Rules: concise, unambiguous, non-opinionated, no long copyrighted text, exactly 4 MCQ options, one correct option.\n"
+        + generator._build_llm_prompt(topics=topics, difficulty=difficulty, question_type=QuestionType.mixed, num_questions=5)
+        .removeprefix("Generate quiz questions.\n")
+    )
+
+
+def _legacy_regeneration(original: GeneratedQuestion, used: set[str]) -> tuple[None, str]:
+    return None, (
+        "Generate exactly one quiz question as strict JSON only.\n"
+        + _LEGACY_SCHEMA
+        + generator._build_regeneration_prompt(original=original, used_prompts=used).removeprefix("Generate exactly one quiz question.\n")
+    )
+
+
+def _legacy_grading(question: GeneratedQuestion, answer: str) -> tuple[None, str]:
+    return None, (
+        "You are a strict quiz grader. Return JSON only.\n"
+        "Schema: {\"is_correct\": boolean, \"rationale\": \"2-4 concise sentences\"}.\n"
+        "Do not include markdown, code fences, or additional keys.\n"
+        "Judge the user answer using only the rubric below.\n"
+        + _judge_prompt(question, answer)
+    )
+
+
+def _generation(topics: list[Topic], difficulty: Difficulty) -> tuple[str, str]:
+    prompt = generator._build_llm_prompt(topics=topics, difficulty=difficulty, question_type=QuestionType.mixed, num_questions=5)
+    return generator.GENERATION_SYSTEM_PROMPT, prompt
+
+
+def _regeneration(original: GeneratedQuestion, used: set[str]) -> tuple[str, str]:
+    return generator.GENERATION_SYSTEM_PROMPT, generator._build_regeneration_prompt(original=original, used_prompts=used)
+
+
+def _grading(question: GeneratedQuestion, answer: str) -> tuple[str, str]:
+    return evaluator.JUDGE_SYSTEM_PROMPT, _judge_prompt(question, answer)
+
+
+def _judge_prompt(question: GeneratedQuestion, answer: str) -> str:
+    return evaluator._build_judge_prompt(
+        prompt=question.prompt,
+        expected_answer=question.expected_answer or "",
+        acceptable_variants=question.acceptable_variants or [],
+        grading_rubric=question.grading_rubric or "",
+        user_answer=answer,
+    )
+
+
+LAYOUTS: dict[str, tuple[Callable[..., tuple[str | None, str]], ...]] = {
+    "legacy": (_legacy_generation, _legacy_regeneration, _legacy_grading),
+    "system_prefix": (_generation, _regeneration, _grading),
+}
+
+
+def _snapshot(api: str) -> dict[str, tuple[float, float, int]]:
+    return {
+        call: (
+            LLM_PROMPT_EVAL_DURATION.sum(call=call, api=api),
+            LLM_PROMPT_EVAL_TOKENS.value(call=call, api=api),
+            LLM_PROMPT_EVAL_DURATION.count(call=call, api=api),
+        )
+        for call in CALLS
+    }
+
+
+def run_layout(router: LLMRouter, layout: str, rounds: int, seed: int = 0) -> dict[str, dict[str, float | None]]:
+    """Mean prompt-eval milliseconds and evaluated tokens per call type for one prompt layout."""
+    generation, regeneration, grading = LAYOUTS[layout]
+    api = "chat" if layout == "system_prefix" else "generate"
+    rng = random.Random(seed)
+    before = _snapshot(api)
+    for _ in range(rounds):
+        topics = rng.sample(list(Topic), 2)
+        difficulty = rng.choice(list(Difficulty))
+        questions = generator._fallback_questions(
+            topics=topics, difficulty=difficulty, question_type=QuestionType.short_answer, num_questions=2
+        )
+        used = {generator._normalize_prompt(question.prompt) for question in questions}
+        calls: list[tuple[str, tuple[str | None, str], type]] = [
+            ("generation", generation(topics, difficulty), LLMGeneratedQuestions),
+            ("regeneration", regeneration(questions[0], used), LLMGeneratedQuestions),
+            *(("grading", grading(questions[1], f"{answer} ({rng.random():.6f})"), ShortAnswerJudgeResult) for answer in _ANSWERS),
+        ]
+        for call, (system, prompt), response_model in calls:
+            task = LLMTask.grading if call == "grading" else LLMTask.generation
+            router.generate_json(task=task, call=call, system=system, prompt=prompt, response_model=response_model, max_retries=0)
+    after = _snapshot(api)
+    report: dict[str, dict[str, float | None]] = {}
+    for call in CALLS:
+        seconds, tokens, count = (end - start for end, start in zip(after[call], before[call]))
+        report[call] = {
+            "calls": count,
+            "prompt_eval_ms": round(seconds / count * 1000, 2) if count else None,
+            "prompt_eval_tokens": round(tokens / count, 1) if count else None,
+        }
+    return report
+
+
+@contextmanager
+def _chat_prefix(enabled: bool) -> Iterator[None]:
+    previous = settings.ollama_chat_prefix
+    settings.ollama_chat_prefix = enabled
+    try:
+        yield
+    finally:
+        settings.ollama_chat_prefix = previous
+
+
+def compare_layouts(ollama_url: str | None, rounds: int) -> dict[str, Any]:
+    models = list(dict.fromkeys(LLMRouter.model_for(task) for task in LLMTask))
+    results: dict[str, Any] = {}
+    for layout in LAYOUTS:
+        # A fresh stand-in per layout so neither starts with the other's cached prefixes.
+        stand_in = OllamaStandIn(StandInProfile(latency_ms=0), model=models) if ollama_url is None else None
+        with stand_in or nullcontext(), _chat_prefix(layout == "system_prefix"):
+            router = LLMRouter([OllamaClient(stand_in.url if stand_in else ollama_url)])
+            results[layout] = run_layout(router, layout, rounds)
+    change = {}
+    for call in CALLS:
+        old, new = results["legacy"][call]["prompt_eval_ms"], results["system_prefix"][call]["prompt_eval_ms"]
+        change[call] = round((new - old) / old * 100, 1) if old and new is not None else None
+    return {**results, "prompt_eval_change_percent": change}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare Ollama prompt-eval time per call type before and after the system-prefix layout.")
+    parser.add_argument("--ollama-url", help="Measure against a real Ollama; default is the local stand-in's simulated prefix cache.")
+    parser.add_argument("--model", default=settings.ollama_model, help="Model for every call type.")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    settings.ollama_model = args.model
+    settings.ollama_generation_model = settings.ollama_grading_model = None
+    print(json.dumps(compare_layouts(args.ollama_url, args.rounds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
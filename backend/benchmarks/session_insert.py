@@ -0,0 +1,100 @@
+import argparse
+import json
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from sqlmodel import Session
+
+from app.api.quiz import _store_session
+from app.db.models import QuizQuestion, QuizSession
+from app.db.session import build_engine, prepare_database
+from app.quiz.generator import GeneratedQuestion, _fallback_questions
+from app.schemas.quiz import CreateQuizSessionRequest, Difficulty, QuestionType, Topic
+
+
+def _legacy_store_session(db: Session, payload: CreateQuizSessionRequest, generated_questions: list[GeneratedQuestion]) -> None:
+    # Per-row ORM path used before the bulk insert: one flush for the session and one per question.
+    quiz_session = QuizSession(
+        topics=[topic.value for topic in payload.topics],
+        difficulty=payload.difficulty.value,
+        question_type=payload.question_type.value,
+        num_questions=payload.num_questions,
+    )
+    db.add(quiz_session)
+    db.flush()
+    for index, generated in enumerate(generated_questions, start=1):
+        db.add(
+            QuizQuestion(
+                session_id=quiz_session.id,
+                order_index=index,
+                type=generated.type.value,
+                topic_tags=[topic.value for topic in generated.topic_tags],
+                difficulty=generated.difficulty.value,
+                prompt=generated.prompt,
+                options=generated.options,
+                correct_option_index=generated.correct_option_index,
+                expected_answer=generated.expected_answer,
+                acceptable_variants=generated.acceptable_variants,
+                grading_rubric=generated.grading_rubric,
+                explanation=generated.explanation,
+            )
+        )
+        db.flush()
+
+
+def _time_path(
+    name: str,
+    store: Callable[[Session, CreateQuizSessionRequest, list[GeneratedQuestion]], object],
+    sessions: int,
+    payload: CreateQuizSessionRequest,
+    questions: list[GeneratedQuestion],
+) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = build_engine(f"sqlite:///{Path(directory) / f'{name}.db'}")
+        prepare_database(engine)
+        durations: list[float] = []
+        with Session(engine) as db:
+            for _ in range(sessions):
+                started = time.perf_counter()
+                store(db, payload, questions)
+                db.commit()
+                durations.append(time.perf_counter() - started)
+        engine.dispose()
+
+    durations.sort()
+    return {
+        "mean_ms": round(sum(durations) / len(durations) * 1000, 3),
+        "p50_ms": round(durations[len(durations) // 2] * 1000, 3),
+        "p95_ms": round(durations[int(len(durations) * 0.95) - 1] * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-row and bulk persistence of 15-question sessions.")
+    parser.add_argument("--sessions", type=int, default=200)
+    args = parser.parse_args()
+
+    payload = CreateQuizSessionRequest(
+        topics=list(Topic),
+        difficulty=Difficulty.medium,
+        question_type=QuestionType.mixed,
+        num_questions=15,
+    )
+    questions = _fallback_questions(
+        topics=payload.topics,
+        difficulty=payload.difficulty,
+        question_type=payload.question_type,
+        num_questions=payload.num_questions,
+    )
+    results = {
+        "per_row_flush": _time_path("legacy", _legacy_store_session, args.sessions, payload, questions),
+        "bulk_insert": _time_path("bulk", _store_session, args.sessions, payload, questions),
+    }
+    results["speedup"] = round(results["per_row_flush"]["mean_ms"] / results["bulk_insert"]["mean_ms"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
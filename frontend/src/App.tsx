@@ -1,6 +1,6 @@
-import { useMemo, useState } from 'react'
+import { useEffect, useMemo, useRef, useState } from 'react'
 import { useMutation, useQuery } from '@tanstack/react-query'
-import { createQuizSession, getHealth, getSessionSummary, submitAnswer } from './api/quiz'
+import { createQuizSession, getHealth, getSessionSummary, openQuizChannel, submitAnswer, type QuizChannel } from './api/quiz'
 import { HealthBanner } from './components/HealthBanner'
 import { NavTabs, type AppView } from './components/NavTabs'
 import { HistoryPage } from './pages/HistoryPage'
@@ -10,6 +10,7 @@ import { SetupPage } from './pages/SetupPage'
 import type {
   CreateQuizSessionRequest,
   CreateQuizSessionResponse,
+  QuizChannelEvent,
   QuizQuestionPublic,
   SubmitAnswerRequest,
   SubmitAnswerResponse,
@@ -26,6 +27,13 @@ function App() {
   const [answers, setAnswers] = useState<Record<string, AnswerRecord>>({})
   const [currentIndex, setCurrentIndex] = useState(0)
   const [summaryError, setSummaryError] = useState<string | null>(null)
+  // Repeated starts with the same settings (double-clicks, retries after a timeout) reuse one idempotency key.
+  const creationKeyRef = useRef<{ payload: string; key: string } | null>(null)
+  // Answers go over the session socket when it is open; results come back as events, keyed by question id.
+  const channelRef = useRef<QuizChannel | null>(null)
+  const pendingRequestsRef = useRef<Record<string, SubmitAnswerRequest>>({})
+  const [pendingQuestionIds, setPendingQuestionIds] = useState<string[]>([])
+  const [channelError, setChannelError] = useState<string | null>(null)
 
   const healthQuery = useQuery({
     queryKey: ['health'],
@@ -34,8 +42,9 @@ function App() {
   })
 
   const createSessionMutation = useMutation({
-    mutationFn: (payload: CreateQuizSessionRequest) => createQuizSession(payload),
+    mutationFn: (payload: CreateQuizSessionRequest) => createQuizSession(payload, creationKey(payload)),
     onSuccess: (data) => {
+      creationKeyRef.current = null
       setSession(data)
       setAnswers({})
       setCurrentIndex(0)
@@ -59,17 +68,83 @@ function App() {
     },
   })
 
+  const sessionId = session?.session_id
+  useEffect(() => {
+    if (!sessionId) {
+      return
+    }
+    const channel = openQuizChannel(sessionId, handleChannelEvent, () => {
+      channelRef.current = null
+      resendPending(sessionId)
+    })
+    channelRef.current = channel
+    return () => {
+      channel.close()
+      channelRef.current = null
+    }
+  }, [sessionId])
+
+  function settlePending(questionId: string): SubmitAnswerRequest | undefined {
+    const request = pendingRequestsRef.current[questionId]
+    delete pendingRequestsRef.current[questionId]
+    setPendingQuestionIds((current) => current.filter((id) => id !== questionId))
+    return request
+  }
+
+  // Answers the dropped socket never settled go over HTTP; the server keeps one answer per question either way.
+  function resendPending(sessionId: string) {
+    for (const [questionId, request] of Object.entries(pendingRequestsRef.current)) {
+      submitAnswer(sessionId, questionId, request)
+        .then((response) => {
+          if (settlePending(questionId)) {
+            setAnswers((current) => ({ ...current, [questionId]: { request, response } }))
+          }
+        })
+        .catch(() => {
+          settlePending(questionId)
+          setChannelError('Could not submit answer. Try again.')
+        })
+    }
+  }
+
+  function handleChannelEvent(event: QuizChannelEvent) {
+    if (event.type === 'result') {
+      const request = settlePending(event.question_id)
+      if (request) {
+        setAnswers((current) => ({ ...current, [event.question_id]: { request, response: event.result } }))
+      }
+    } else if (event.type === 'error' && event.question_id) {
+      settlePending(event.question_id)
+      setChannelError('Could not submit answer. Try again.')
+    }
+  }
+
   const summaryQuery = useQuery({
     queryKey: ['session-summary', session?.session_id],
     queryFn: () => getSessionSummary(session?.session_id as string),
     enabled: activeView === 'results' && session !== null,
   })
 
+  function creationKey(payload: CreateQuizSessionRequest): string {
+    const serialized = JSON.stringify(payload)
+    if (creationKeyRef.current?.payload !== serialized) {
+      creationKeyRef.current = { payload: serialized, key: crypto.randomUUID() }
+    }
+    return creationKeyRef.current.key
+  }
+
   function handleStartQuiz(payload: CreateQuizSessionRequest) {
     createSessionMutation.mutate(payload)
   }
 
   function handleSubmitAnswer(question: QuizQuestionPublic, payload: SubmitAnswerRequest) {
+    setChannelError(null)
+    pendingRequestsRef.current[question.id] = payload
+    if (channelRef.current?.submit(question.id, payload)) {
+      setPendingQuestionIds((current) => [...current, question.id])
+      return
+    }
+    delete pendingRequestsRef.current[question.id]
     submitMutation.mutate({ question, payload })
   }
 
@@ -93,6 +168,9 @@ function App() {
     setAnswers({})
     setCurrentIndex(0)
     setSummaryError(null)
+    pendingRequestsRef.current = {}
+    setPendingQuestionIds([])
+    setChannelError(null)
     createSessionMutation.reset()
     submitMutation.reset()
     setActiveView('setup')
@@ -105,7 +183,9 @@ function App() {
     ? 'Could not create quiz session. Verify backend health and input values.'
     : null
 
-  const submitError = submitMutation.isError ? 'Could not submit answer. Try again.' : null
+  const submitError = channelError ?? (submitMutation.isError ? 'Could not submit answer. Try again.' : null)
+  const isSubmitting =
+    submitMutation.isPending || (session !== null && pendingQuestionIds.includes(session.questions[currentIndex]?.id))
 
   const resolvedSummaryError = useMemo(() => {
     if (summaryError) {
@@ -148,7 +228,7 @@ function App() {
             session={session}
             currentIndex={currentIndex}
             answers={answers}
-            isSubmitting={submitMutation.isPending}
+            isSubmitting={isSubmitting}
             submitError={submitError}
             onSubmitAnswer={handleSubmitAnswer}
             onNext={handleNext}
@@ -3,8 +3,10 @@ import type {
   CreateQuizSessionRequest,
   CreateQuizSessionResponse,
   HealthResponse,
+  QuizChannelEvent,
   SessionListResponse,
   SessionSummaryResponse,
+  StatsResponse,
   SubmitAnswerRequest,
   SubmitAnswerResponse,
 } from '../types/api'
@@ -16,8 +18,11 @@ export async function getHealth(): Promise<HealthResponse> {
 
 export async function createQuizSession(
   payload: CreateQuizSessionRequest,
+  idempotencyKey: string = crypto.randomUUID(),
 ): Promise<CreateQuizSessionResponse> {
-  const { data } = await apiClient.post<CreateQuizSessionResponse>('/api/v1/quiz/sessions', payload)
+  const { data } = await apiClient.post<CreateQuizSessionResponse>('/api/v1/quiz/sessions', payload, {
+    headers: { 'Idempotency-Key': idempotencyKey },
+  })
   return data
 }
 
@@ -33,14 +38,52 @@ export async function submitAnswer(
   return data
 }
 
+export type QuizChannel = {
+  // False when the socket is not open yet (or any more), so the caller can fall back to `submitAnswer`.
+  // `onClosed` only fires when the socket drops, not after `close()`.
+  submit: (questionId: string, payload: SubmitAnswerRequest) => boolean
+  close: () => void
+}
+
+export function openQuizChannel(
+  sessionId: string,
+  onEvent: (event: QuizChannelEvent) => void,
+  onClosed: () => void,
+): QuizChannel {
+  const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:'
+  const socket = new WebSocket(`${protocol}//${window.location.host}/api/v1/quiz/sessions/${sessionId}/ws`)
+  socket.onmessage = (message) => onEvent(JSON.parse(message.data) as QuizChannelEvent)
+  // A failed or dropped socket always ends in `close`, so that one handler covers errors too.
+  socket.onclose = () => onClosed()
+  return {
+    submit: (questionId, payload) => {
+      if (socket.readyState !== WebSocket.OPEN) {
+        return false
+      }
+      socket.send(JSON.stringify({ type: 'answer', question_id: questionId, ...payload }))
+      return true
+    },
+    close: () => {
+      socket.onclose = null
+      socket.close()
+    },
+  }
+}
+
 export async function getSessionSummary(sessionId: string): Promise<SessionSummaryResponse> {
   const { data } = await apiClient.get<SessionSummaryResponse>(`/api/v1/quiz/sessions/${sessionId}/summary`)
   return data
 }
 
-export async function listSessions(limit = 20, offset = 0): Promise<SessionListResponse> {
+// Pass the previous page's `next_cursor` to get the page after it; without one the newest sessions come first.
+export async function listSessions(limit = 20, cursor?: string): Promise<SessionListResponse> {
   const { data } = await apiClient.get<SessionListResponse>('/api/v1/quiz/sessions', {
-    params: { limit, offset },
+    params: cursor ? { limit, cursor } : { limit },
   })
   return data
 }
+
+export async function getStats(days = 30): Promise<StatsResponse> {
+  const { data } = await apiClient.get<StatsResponse>('/api/v1/stats', { params: { days } })
+  return data
+}
@@ -1,14 +1,28 @@
 import { useState } from 'react'
-import { useQuery } from '@tanstack/react-query'
-import { getSessionSummary, listSessions } from '../api/quiz'
+import { useInfiniteQuery, useQuery } from '@tanstack/react-query'
+import { getSessionSummary, getStats, listSessions } from '../api/quiz'
 import { getTopicLabel } from '../constants/topics'
 
+const PAGE_SIZE = 20
+const STATS_DAYS = 30
+
+function formatAccuracy(accuracy: number | null) {
+  return accuracy === null ? '-' : `${Math.round(accuracy * 100)}%`
+}
+
 export function HistoryPage() {
   const [selectedSessionId, setSelectedSessionId] = useState<string | null>(null)
 
-  const sessionsQuery = useQuery({
+  const sessionsQuery = useInfiniteQuery({
     queryKey: ['history-sessions'],
-    queryFn: () => listSessions(20, 0),
+    queryFn: ({ pageParam }) => listSessions(PAGE_SIZE, pageParam),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
+  })
+
+  const statsQuery = useQuery({
+    queryKey: ['history-stats', STATS_DAYS],
+    queryFn: () => getStats(STATS_DAYS),
   })
 
   const summaryQuery = useQuery({
@@ -21,11 +35,38 @@ export function HistoryPage() {
     <section className="panel" data-testid="history-page">
       <h2>History</h2>
 
+      {statsQuery.isError ? <p className="error-text">Could not load learner stats.</p> : null}
+      {statsQuery.data ? (
+        <article className="history-stats" aria-label="Learner stats">
+          <div className="stat-grid">
+            <div className="stat-card">
+              <p>Answered (last {statsQuery.data.days} days)</p>
+              <strong>{statsQuery.data.totals.answered}</strong>
+            </div>
+            <div className="stat-card">
+              <p>Accuracy</p>
+              <strong>{formatAccuracy(statsQuery.data.totals.accuracy)}</strong>
+            </div>
+          </div>
+          {statsQuery.data.weak_topics.length > 0 ? (
+            <p className="muted">Needs practice: {statsQuery.data.weak_topics.map(getTopicLabel).join(', ')}</p>
+          ) : null}
+          <ul className="topic-summary">
+            {statsQuery.data.by_topic.map((topic) => (
+              <li key={topic.topic}>
+                <span>{getTopicLabel(topic.topic)}</span>
+                <strong>{formatAccuracy(topic.accuracy)}</strong>
+              </li>
+            ))}
+          </ul>
+        </article>
+      ) : null}
+
       {sessionsQuery.isLoading ? <p>Loading sessions...</p> : null}
       {sessionsQuery.isError ? <p className="error-text">Could not load session history.</p> : null}
 
       <div className="history-table" role="table" aria-label="Session history">
-        {sessionsQuery.data?.items.map((session) => (
+        {sessionsQuery.data?.pages.flatMap((page) => page.items).map((session) => (
           <div className="history-row" key={session.session_id}>
             <div>
               <strong>{session.session_id.slice(0, 8)}</strong>
@@ -43,6 +84,12 @@ export function HistoryPage() {
         ))}
       </div>
 
+      {sessionsQuery.hasNextPage ? (
+        <button type="button" disabled={sessionsQuery.isFetchingNextPage} onClick={() => sessionsQuery.fetchNextPage()}>
+          {sessionsQuery.isFetchingNextPage ? 'Loading...' : 'Load More'}
+        </button>
+      ) : null}
+
       {summaryQuery.isLoading ? <p>Loading summary...</p> : null}
       {summaryQuery.isError ? <p className="error-text">Could not load selected summary.</p> : null}
 
@@ -16,6 +16,7 @@ export function SetupPage({ onStart, isStarting, error }: SetupPageProps) {
   const [difficulty, setDifficulty] = useState<Difficulty>('medium')
   const [questionType, setQuestionType] = useState<QuestionType>('mixed')
   const [numQuestions, setNumQuestions] = useState<number>(5)
+  const [adaptive, setAdaptive] = useState<boolean>(false)
 
   function toggleTopic(topic: Topic) {
     setSelectedTopics((current) => {
@@ -33,6 +34,7 @@ export function SetupPage({ onStart, isStarting, error }: SetupPageProps) {
       difficulty,
       question_type: questionType,
       num_questions: numQuestions,
+      mode: adaptive ? 'adaptive' : 'standard',
     })
   }
 
@@ -90,6 +92,11 @@ export function SetupPage({ onStart, isStarting, error }: SetupPageProps) {
           />
         </label>
 
+        <label className="checkbox-card">
+          <input type="checkbox" checked={adaptive} onChange={(event) => setAdaptive(event.target.checked)} />
+          <span>Adaptive: review missed questions first and focus on weak topics</span>
+        </label>
+
         <button type="submit" disabled={isStarting}>
           {isStarting ? 'Starting...' : 'Start Quiz'}
         </button>
@@ -11,11 +11,14 @@ export type Topic =
 export type Difficulty = 'easy' | 'medium' | 'hard'
 export type QuestionType = 'mcq' | 'short-answer' | 'mixed'
 
+export type SessionMode = 'standard' | 'adaptive'
+
 export interface CreateQuizSessionRequest {
   topics: Topic[]
   difficulty: Difficulty
   question_type: QuestionType
   num_questions: number
+  mode?: SessionMode
 }
 
 export interface QuizQuestionPublic {
@@ -33,6 +36,7 @@ export interface CreateQuizSessionResponse {
   created_at: string
   config: CreateQuizSessionRequest
   questions: QuizQuestionPublic[]
+  reviewed_questions?: number
 }
 
 export interface SubmitAnswerRequest {
@@ -67,6 +71,14 @@ export interface SessionSummaryResponse {
   completed_at: string | null
 }
 
+// Server messages on the per-session WebSocket; `result` events may arrive in a different order than answers were sent.
+export type QuizChannelEvent =
+  | { type: 'session'; session_id: string; total: number; answered: number }
+  | { type: 'question'; question: QuizQuestionPublic }
+  | { type: 'result'; question_id: string; result: SubmitAnswerResponse }
+  | { type: 'error'; question_id: string | null; status: number; detail: string }
+  | { type: 'completed'; summary: SessionSummaryResponse }
+
 export interface SessionListItem {
   session_id: string
   created_at: string
@@ -79,6 +91,30 @@ export interface SessionListResponse {
   limit: number
   offset: number
   items: SessionListItem[]
+  next_cursor: string | null
+}
+
+export interface AccuracyStats {
+  answered: number
+  correct: number
+  accuracy: number | null
+}
+
+export interface TopicStats extends AccuracyStats {
+  topic: Topic
+}
+
+export interface DailyStats extends AccuracyStats {
+  day: string
+}
+
+export interface StatsResponse {
+  days: number
+  since: string
+  totals: AccuracyStats
+  by_topic: TopicStats[]
+  daily: DailyStats[]
+  weak_topics: Topic[]
 }
 
 export interface HealthResponse {
@@ -86,5 +122,7 @@ export interface HealthResponse {
   ollama: {
     reachable: boolean
     model: string
+    models: Record<'generation' | 'grading', string>
+    endpoints: { url: string; models: Record<string, boolean>; in_flight: number }[]
   }
 }
@@ -56,6 +56,21 @@ test.beforeEach(async ({ page }) => {
     })
   })
 
+  await page.route('**/api/v1/stats?*', async (route) => {
+    await route.fulfill({
+      status: 200,
+      contentType: 'application/json',
+      body: JSON.stringify({
+        days: 30,
+        since: '2026-01-20',
+        totals: { answered: 12, correct: 9, accuracy: 0.75 },
+        by_topic: [{ topic: 'Statistics', answered: 12, correct: 9, accuracy: 0.75 }],
+        daily: [{ day: '2026-02-19', answered: 12, correct: 9, accuracy: 0.75 }],
+        weak_topics: [],
+      }),
+    })
+  })
+
   await page.route('**/api/v1/quiz/sessions/session-e2e-1/summary', async (route) => {
     await route.fulfill({
       status: 200,
@@ -120,8 +135,46 @@ test('history page lists sessions', async ({ page }) => {
 
   await expect(page.getByTestId('history-page')).toBeVisible()
   await expect(page.getByText('session-')).toBeVisible()
+  await expect(page.getByLabel('Learner stats').getByText('75%').first()).toBeVisible()
 
   await page.click('button:has-text("Open Summary")')
   await expect(page.getByText('Session Summary')).toBeVisible()
   await expect(page.getByText('Machine Learning: 1/1')).toBeVisible()
 })
+
+test('history page loads older sessions with the cursor', async ({ page }) => {
+  const historyItem = (sessionId: string) => ({
+    session_id: sessionId,
+    created_at: '2026-02-19T00:00:00Z',
+    completed_at: '2026-02-19T00:05:00Z',
+    score: { correct: 1, total: 1 },
+    config: {
+      topics: ['Machine Learning technical concepts'],
+      difficulty: 'medium',
+      question_type: 'mcq',
+      num_questions: 1,
+    },
+  })
+  await page.route('**/api/v1/quiz/sessions?*', async (route) => {
+    const cursor = new URL(route.request().url()).searchParams.get('cursor')
+    await route.fulfill({
+      status: 200,
+      contentType: 'application/json',
+      body: JSON.stringify({
+        limit: 20,
+        offset: 0,
+        items: [historyItem(cursor === 'page-2' ? 'older-e2e-2' : 'newer-e2e-1')],
+        next_cursor: cursor === 'page-2' ? null : 'page-2',
+      }),
+    })
+  })
+
+  await page.goto('/')
+  await page.click('button:has-text("History")')
+  await expect(page.getByText('newer-e2')).toBeVisible()
+
+  await page.click('button:has-text("Load More")')
+  await expect(page.getByText('older-e2')).toBeVisible()
+  await expect(page.getByText('newer-e2')).toBeVisible()
+  await expect(page.getByRole('button', { name: 'Load More' })).toHaveCount(0)
+})